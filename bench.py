@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""Benchmarks for the hot paths of the PUBG Universal Tool.
+
+Measures save-file reads and writes, UserCustom.ini and CVar handling and
+temp cleaning against the bundled UE4Game fixture tree and synthetic
+directories. It also runs a full `apply` against an in-process fake adb
+server that serves the same fixture tree. Results are compared with a
+baseline recorded on the same machine:
+
+    python bench.py                       # run and compare with bench_baseline.json
+    python bench.py --save-baseline       # record the baseline
+    python bench.py --only cvar --json    # run matching cases, print JSON
+"""
+import os
+import sys
+import io
+import json
+import time
+import socket
+import struct
+import shutil
+import hashlib
+import tempfile
+import argparse
+import threading
+import contextlib
+import statistics
+from typing import Dict, List, Optional
+
+import index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_SAVED = os.path.join(ROOT, "UE4Game", "ShadowTrackerExtra", "ShadowTrackerExtra", "Saved")
+DEVICE_FILES = "/sdcard/Android/data/com.tencent.ig/files"
+DEFAULT_BASELINE = os.path.join(ROOT, "bench_baseline.json")
+
+BENCHMARKS = []
+
+def benchmark(name: str, number: int = 1, repeat: int = 7, traced: bool = False):
+    """Registers a case; the decorated setup returns the callable to time.
+
+    Setup runs once per repeat outside the timed section, so cases that
+    consume their input (e.g. deleting files) can rebuild it. The callable
+    of a traced case accepts an index.Tracer, used to count its adb work.
+    """
+    def register(setup):
+        BENCHMARKS.append({"name": name, "setup": setup, "number": number, "repeat": repeat, "traced": traced,
+                           "doc": (setup.__doc__ or "").strip()})
+        return setup
+    return register
+
+def fixture(*parts: str) -> bytes:
+    with open(os.path.join(FIXTURE_SAVED, *parts), 'rb') as file:
+        return file.read()
+
+def loaded_cli() -> index.PUBGGraphicsCLI:
+    """A CLI holding the fixture Active.sav, as after a successful pull"""
+    cli = index.PUBGGraphicsCLI()
+    cli.pubg_package = "com.tencent.ig"
+    cli.active_sav_content = fixture("SaveGames", "Active.sav")
+    return cli
+
+def make_tree(root: str, files: int, size: int = 512, age: float = 7 * 24 * 3600) -> str:
+    """Creates `files` old files spread over nested directories below root"""
+    payload = b"\0" * size
+    stamp = time.time() - age
+    for i in range(files):
+        directory = os.path.join(root, f"d{i % 16}", f"s{i % 5}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"f{i}.tmp")
+        with open(path, 'wb') as file:
+            file.write(payload)
+        os.utime(path, (stamp, stamp))
+    return root
+
+class FakeAdbServer:
+    """Minimal adb server: host services, shell commands and the sync protocol.
+
+    Serves an in-memory {device path: bytes} dict for one emulator, and
+    answers only the shell commands the tool sends during an apply. Sync
+    channels that end with QUIT are counted in sync_quits.
+    """
+
+    def __init__(self, files: Dict[str, bytes], serial: str = "emulator-5554",
+                 packages: List[str] = ("com.tencent.ig",)):
+        self.files = dict(files)
+        self.mtimes = {path: 1000 for path in self.files}
+        self.serial = serial
+        self.packages = list(packages)
+        self.sync_quits = 0
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.port = self.server.getsockname()[1]
+        self.running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def close(self):
+        self.running = False
+        self.server.close()
+
+    def _accept(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _recv(conn: socket.socket, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = conn.recv(size - len(buf))
+            if not chunk:
+                raise EOFError
+            buf += chunk
+        return bytes(buf)
+
+    def _request(self, conn: socket.socket) -> str:
+        return self._recv(conn, int(self._recv(conn, 4), 16)).decode("utf-8")
+
+    @staticmethod
+    def _reply(conn: socket.socket, text: str):
+        data = text.encode("utf-8")
+        conn.sendall(b"OKAY" + b"%04x" % len(data) + data)
+
+    def _handle(self, conn: socket.socket):
+        try:
+            request = self._request(conn)
+            if request == "host:version":
+                return self._reply(conn, "0029")
+            if request == "host:devices":
+                return self._reply(conn, f"{self.serial}\tdevice\n")
+            if request.startswith("host:transport:"):
+                if request.split(":", 2)[2] != self.serial:
+                    message = f"device '{request.split(':', 2)[2]}' not found".encode()
+                    conn.sendall(b"FAIL" + b"%04x" % len(message) + message)
+                    return
+                conn.sendall(b"OKAY")
+                service = self._request(conn)
+                conn.sendall(b"OKAY")
+                if service == "sync:":
+                    return self._sync(conn)
+                conn.sendall(self._shell(service.split(":", 1)[1]))
+                return
+            message = b"unsupported"
+            conn.sendall(b"FAIL" + b"%04x" % len(message) + message)
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def _shell(self, command: str) -> bytes:
+        if command.startswith("pm list packages"):
+            return "".join(f"package:{package}\n" for package in self.packages).encode()
+        if command.startswith("cat /proc/sys/kernel/random/boot_id"):
+            return b"bench-boot\n"
+        if command.startswith("md5sum "):
+            path = command.split(" ", 1)[1].strip("'\"")
+            if path in self.files:
+                return f"{hashlib.md5(self.files[path]).hexdigest()}  {path}\n".encode()
+            return f"md5sum: {path}: No such file or directory\n".encode()
+        # am start / am force-stop and anything else succeed silently
+        return b""
+
+    def _sync(self, conn: socket.socket):
+        while True:
+            header = self._recv(conn, 8)
+            command, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if command == b"QUIT":
+                self.sync_quits += 1
+                return
+            arg = self._recv(conn, length).decode("utf-8")
+            if command == b"STAT":
+                data = self.files.get(arg)
+                stat = (0o100660, len(data), self.mtimes[arg]) if data is not None else (0, 0, 0)
+                conn.sendall(b"STAT" + struct.pack("<III", *stat))
+            elif command == b"RECV":
+                data = self.files.get(arg)
+                if data is None:
+                    message = b"No such file or directory"
+                    conn.sendall(b"FAIL" + struct.pack("<I", len(message)) + message)
+                    continue
+                chunks = [b"DATA" + struct.pack("<I", len(data[i:i + 65536])) + data[i:i + 65536]
+                          for i in range(0, len(data), 65536)]
+                conn.sendall(b"".join(chunks) + b"DONE" + struct.pack("<I", 0))
+            elif command == b"SEND":
+                path = arg.rsplit(",", 1)[0]
+                received = []
+                while True:
+                    header = self._recv(conn, 8)
+                    kind, length = header[:4], struct.unpack("<I", header[4:])[0]
+                    if kind == b"DONE":
+                        break
+                    received.append(self._recv(conn, length))
+                self.files[path] = b"".join(received)
+                self.mtimes[path] = int(time.time())
+                conn.sendall(b"OKAY" + struct.pack("<I", 0))
+            else:
+                return
+
+def fixture_device_files() -> Dict[str, bytes]:
+    """The bundled UE4Game tree keyed by its path on the device"""
+    files = {}
+    for directory, _, names in os.walk(os.path.join(ROOT, "UE4Game")):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as file:
+                files[DEVICE_FILES + "/" + os.path.relpath(path, ROOT).replace(os.sep, "/")] = file.read()
+    return files
+
+# --- cases ---
+
+@benchmark("gvas_parse", number=200)
+def bench_gvas_parse():
+    """Parse the fixture Active.sav"""
+    content = fixture("SaveGames", "Active.sav")
+    return lambda: index.GvasFile(content)
+
+@benchmark("read_hex", number=5000)
+def bench_read_hex():
+    """read_hex of the three FPS properties"""
+    cli = loaded_cli()
+
+    def run():
+        cli.read_hex("FPSLevel")
+        cli.read_hex("BattleFPS")
+        cli.read_hex("LobbyFPS")
+    return run
+
+@benchmark("change_graphics_file", number=2000)
+def bench_change_graphics_file():
+    """One IntProperty patch through change_graphics_file"""
+    cli = loaded_cli()
+    values = [b"\x02", b"\x03"]
+
+    def run():
+        values.reverse()
+        cli.change_graphics_file("BattleRenderQuality", values[0])
+    return run
+
+@benchmark("set_fps", number=2000)
+def bench_set_fps():
+    """set_fps patching FPSLevel, BattleFPS and LobbyFPS"""
+    cli = loaded_cli()
+    levels = ["Extreme", "Ultra Extreme"]
+
+    def run():
+        levels.reverse()
+        cli.set_fps(levels[0])
+    return run
+
+@benchmark("ini_edit", number=1000)
+def bench_ini_edit():
+    """Parse UserCustom.ini, set a key and serialize it"""
+    content = fixture("Config", "Android", "UserCustom.ini")
+
+    def run():
+        doc = index.IniDocument.from_bytes(content)
+        doc.set("r.BenchKey", "1")
+        return doc.to_bytes()
+    return run
+
+@benchmark("cvar_decode", number=1000)
+def bench_cvar_decode():
+    """Decode every +CVars line of UserCustom.ini"""
+    doc = index.IniDocument.from_bytes(fixture("Config", "Android", "UserCustom.ini"))
+    return lambda: index.CVarModel(doc).items()
+
+@benchmark("cvar_edit", number=1000)
+def bench_cvar_edit():
+    """Re-encode one CVar and serialize the document"""
+    doc = index.IniDocument.from_bytes(fixture("Config", "Android", "UserCustom.ini"))
+    cvars = index.CVarModel(doc)
+    name = next(name for name, value in cvars.items() if value is not None)
+    values = ["0", "1"]
+
+    def run():
+        values.reverse()
+        cvars.set(name, values[0])
+        return doc.to_bytes()
+    return run
+
+@benchmark("temp_clean_plan", number=5)
+def bench_temp_clean_plan():
+    """Plan a clean of 2000 files in nested directories"""
+    root = make_tree(tempfile.mkdtemp(prefix="plan-", dir=os.getcwd()), 2000)
+    cleaner = index.TempCleaner([(root, True, index.CleanPolicy(min_age=3600))])
+    return cleaner.plan
+
+@benchmark("temp_clean_run", number=1)
+def bench_temp_clean_run():
+    """Delete 1000 files and their directories"""
+    root = make_tree(tempfile.mkdtemp(prefix="run-", dir=os.getcwd()), 1000)
+    cleaner = index.TempCleaner([(root, True, index.CleanPolicy(min_age=3600))])
+    return cleaner.run
+
+FAKE_SERVER = None
+
+@benchmark("apply_e2e", number=5, repeat=5, traced=True)
+def bench_apply_e2e():
+    """Connect, pull, apply a preset and a CVar, push and start on a fake adb"""
+    global FAKE_SERVER
+    files = fixture_device_files()
+    if FAKE_SERVER is None:
+        FAKE_SERVER = FakeAdbServer(files)
+    os.environ["ANDROID_ADB_SERVER_PORT"] = str(FAKE_SERVER.port)
+    args = index.build_arg_parser().parse_args(
+        ["apply", "--preset", "competitive", "--fps", "Extreme", "--cvar", "r.BenchKey=1"])
+
+    def run(tracer: index.Tracer = index.NULL_TRACER):
+        # Start from the fixture every time so each call pushes both files
+        FAKE_SERVER.files = dict(files)
+        FAKE_SERVER.mtimes = dict.fromkeys(files, 1000)
+        result = index.run_device_command(args, None, tracer)
+        if not result["ok"]:
+            raise RuntimeError(f"apply failed: {result.get('error')}")
+    return run
+
+# --- runner ---
+
+def measure(case: dict, repeat: Optional[int] = None) -> dict:
+    """Times a case; per-call times in milliseconds over `repeat` rounds"""
+    # One untimed call warms caches, lazy imports and the fake server's threads
+    case["setup"]()()
+    samples = []
+    for _ in range(repeat or case["repeat"]):
+        run = case["setup"]()
+        started = time.perf_counter()
+        for _ in range(case["number"]):
+            run()
+        samples.append((time.perf_counter() - started) * 1000 / case["number"])
+    return {"median_ms": round(statistics.median(samples), 4), "min_ms": round(min(samples), 4),
+            "stdev_ms": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+            "number": case["number"], "repeat": len(samples)}
+
+def count_operations(case: dict) -> Dict[str, int]:
+    """Counts adb connections, shell commands and bytes of one traced call"""
+    tracer = index.Tracer(enabled=True)
+    run = case["setup"]()
+    with tracer.span(case["name"]) as span:
+        run(tracer)
+    return dict(span["counters"])
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> Dict[str, str]:
+    """Marks each case ok, faster, new or REGRESSION against the baseline"""
+    verdicts = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            verdicts[name] = "new"
+            continue
+        # Noise only ever adds time, so the best round is the steadiest figure to compare
+        change = result["min_ms"] / base["min_ms"] - 1 if base["min_ms"] else 0.0
+        result["change"] = round(change, 4)
+        # Operation counts are deterministic, so any increase is a regression
+        more_io = [counter for counter, value in result.get("counters", {}).items()
+                   if value > base.get("counters", {}).get(counter, value)]
+        if change > threshold or more_io:
+            verdicts[name] = "REGRESSION" + (f" ({', '.join(more_io)})" if more_io else "")
+        elif change < -threshold:
+            verdicts[name] = "faster"
+        else:
+            verdicts[name] = "ok"
+    return verdicts
+
+def format_report(results: Dict[str, dict], verdicts: Dict[str, str], baseline: Dict[str, dict]) -> str:
+    lines = [f"{'case':<22}{'min':>12}{'median':>12}{'baseline':>12}{'change':>9}  status"]
+    for name, result in results.items():
+        base = baseline.get(name, {}).get("min_ms")
+        change = f"{result['change']:+.1%}" if "change" in result else "-"
+        lines.append(f"{name:<22}{result['min_ms']:>10.4f}ms{result['median_ms']:>10.4f}ms"
+                     f"{(f'{base:.4f}ms' if base is not None else '-'):>12}{change:>9}  {verdicts[name]}")
+        if result.get("counters"):
+            lines.append(f"{'':<22}" + ", ".join(f"{k}={v}" for k, v in sorted(result["counters"].items())))
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the PUBG Universal Tool hot paths")
+    parser.add_argument("--only", action="append", default=[], help="Run cases whose name contains this (repeatable)")
+    parser.add_argument("--repeat", type=int, help="Override the number of timed rounds per case")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file (default: bench_baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown of the best round that counts as a regression (default: 0.25)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in BENCHMARKS if not args.only or any(part in case["name"] for part in args.only)]
+    if args.list:
+        for case in cases:
+            print(f"{case['name']:<22}{case['doc']}")
+        return 0
+
+    try:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)["results"]
+    except (OSError, ValueError, KeyError):
+        baseline = {}
+
+    # Cases write assets/, snapshots and scratch trees; keep them out of the repo
+    cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix="pubg-bench-")
+    results = {}
+    try:
+        os.chdir(scratch)
+        for case in cases:
+            # The tool reports progress on stdout; keep it out of the timings' output
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[case["name"]] = measure(case, args.repeat)
+                if case["traced"]:
+                    results[case["name"]]["counters"] = count_operations(case)
+            print(f"{case['name']}: {results[case['name']]['min_ms']:.4f}ms", file=sys.stderr)
+
+        # A slowdown has to show up twice before it is reported; one busy moment on the machine is not enough
+        for case in cases:
+            verdict = compare({case["name"]: results[case["name"]]}, baseline, args.threshold)[case["name"]]
+            if verdict == "REGRESSION":
+                with contextlib.redirect_stdout(io.StringIO()):
+                    retry = measure(case, args.repeat)
+                result = results[case["name"]]
+                result["min_ms"] = min(result["min_ms"], retry["min_ms"])
+                result["retried"] = True
+                print(f"{case['name']}: re-measured, {result['min_ms']:.4f}ms", file=sys.stderr)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    verdicts = compare(results, baseline, args.threshold)
+    if args.json:
+        print(json.dumps({"results": results, "verdicts": verdicts}, indent=2))
+    else:
+        print(format_report(results, verdicts, baseline))
+
+    if args.save_baseline:
+        # Cases not run this time keep their previous baseline
+        merged = {**baseline, **results}
+        with open(args.baseline + ".tmp", 'w') as file:
+            json.dump({"python": sys.version.split()[0], "platform": sys.platform,
+                       "recorded": time.strftime("%Y-%m-%d %H:%M:%S"), "results": merged}, file, indent=2)
+        os.replace(args.baseline + ".tmp", args.baseline)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+        return 0
+    return 1 if any(verdict.startswith("REGRESSION") for verdict in verdicts.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
+import time
+STARTED_AT = time.perf_counter()
+
 import os
 import sys
 import subprocess
-import time
 import logging
 from typing import Dict, List, Optional, Tuple, Union
 import random
 import threading
 import itertools
+import socket
+import struct
+import json
+import hashlib
+import contextlib
+import functools
+import io
+import re
 
 # Setup logging
 def setup_logger(name, log_file, level=logging.ERROR):
@@ -65,17 +75,42 @@ AUTHOR_INFO = """
 \033[0m"""
 
 # Loading animation function
-def loading_animation(stop_event):
+def loading_animation(stop_event, stream=None):
+    stream = stream or sys.stdout
     spinner = itertools.cycle(['◐', '◓', '◑', '◒'])
     while not stop_event.is_set():
-        sys.stdout.write('\r\033[1;33mInitializing PUBG Universal Tool ' + next(spinner) + ' \033[0m')
-        sys.stdout.flush()
-        time.sleep(0.1)
+        stream.write('\r\033[1;33mInitializing PUBG Universal Tool ' + next(spinner) + ' \033[0m')
+        stream.flush()
+        stop_event.wait(0.1)
+
+def enable_ansi_colors() -> bool:
+    """Turns on ANSI escape handling in the Windows console; no-op elsewhere"""
+    if os.name != 'nt':
+        return True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except Exception:
+        return False
 
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if enable_ansi_colors():
+        sys.stdout.write('\033[2J\033[H')
+        sys.stdout.flush()
+    else:
+        os.system('cls' if os.name == 'nt' else 'clear')
 
-def display_loading_screen():
+def display_loading_screen(initialize=None):
+    """Shows the banner and spinner while initialize() runs; returns its result.
+
+    The spinner stays up exactly as long as the real startup work takes.
+    Anything initialize() prints is shown once the spinner is cleared.
+    """
     clear_screen()
     
     # Display the logo and author info
@@ -85,22 +120,2254 @@ def display_loading_screen():
     
     # Start loading animation in a separate thread
     stop_animation = threading.Event()
-    t = threading.Thread(target=loading_animation, args=(stop_animation,))
+    t = threading.Thread(target=loading_animation, args=(stop_animation, sys.stdout))
     t.start()
     
-    # Simulate loading time
-    time.sleep(2.5)
-    
-    # Stop the animation thread
-    stop_animation.set()
-    t.join()
-    
-    # Clear the loading spinner line
-    sys.stdout.write('\r' + ' ' * 50 + '\r')
-    sys.stdout.flush()
+    # Do the real startup work while the spinner runs
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            result = initialize() if initialize else None
+    finally:
+        # Stop the animation thread
+        stop_animation.set()
+        t.join()
+        
+        # Clear the loading spinner line
+        sys.stdout.write('\r' + ' ' * 50 + '\r')
+        sys.stdout.flush()
+        sys.stdout.write(output.getvalue())
     
     print("\n\033[1;32mPUBG Universal Tool ready! Let's enhance your gaming experience.\033[0m\n")
-    time.sleep(1)
+    return result
+
+def wait_until(predicate, timeout: float, interval: float = 0.05) -> bool:
+    """Polls predicate until it returns True or timeout seconds have passed."""
+    deadline = time.monotonic() + timeout
+    while True:
+        if predicate():
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+
+class Tracer:
+    """Records timing spans for device and file operations.
+
+    Spans nest per thread. Counters added while a span is open (bytes
+    transferred, adb services opened, subprocesses started) are added to
+    that span and every span around it, so an outer span carries the
+    totals of everything it did. A disabled tracer records nothing.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans = []
+        self.totals = {}
+        self.origin = time.perf_counter()
+        self.epoch = time.time()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[dict]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs):
+        """Times the enclosed block; yields the span record (None when disabled)"""
+        if not self.enabled:
+            yield None
+            return
+        stack = self._stack()
+        started = time.perf_counter()
+        record = {"name": name, "start_ms": round((started - self.origin) * 1000, 3),
+                  "thread": threading.current_thread().name, "depth": len(stack),
+                  "parent": stack[-1]["name"] if stack else None, "ok": True, "counters": {}, **attrs}
+        stack.append(record)
+        try:
+            yield record
+        except BaseException as e:
+            record["ok"] = False
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            stack.pop()
+            with self._lock:
+                self.spans.append(record)
+
+    def add(self, counter: str, amount: int = 1):
+        """Adds to a counter of every open span on this thread"""
+        if not self.enabled:
+            return
+        for record in self._stack():
+            record["counters"][counter] = record["counters"].get(counter, 0) + amount
+        with self._lock:
+            self.totals[counter] = self.totals.get(counter, 0) + amount
+
+    def records(self) -> List[dict]:
+        """Finished spans in start order"""
+        with self._lock:
+            return sorted(self.spans, key=lambda record: record["start_ms"])
+
+    def summary(self) -> Dict[str, dict]:
+        """Per span name: call count, total and max duration and summed counters"""
+        summary = {}
+        for record in self.records():
+            entry = summary.setdefault(record["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "failed": 0})
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + record["duration_ms"], 3)
+            entry["max_ms"] = max(entry["max_ms"], record["duration_ms"])
+            entry["failed"] += not record["ok"]
+            for counter, value in record["counters"].items():
+                entry[counter] = entry.get(counter, 0) + value
+        return summary
+
+    def write_jsonl(self, path: str):
+        """Writes one JSON object per span"""
+        with open(path, 'w', encoding='utf-8') as file:
+            for record in self.records():
+                file.write(json.dumps(record, default=str) + "\n")
+
+    def write_chrome(self, path: str):
+        """Writes the spans in Chrome trace event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        threads = {}
+        names = {}
+        events = []
+        for record in self.records():
+            tid = threads.setdefault(record["thread"], len(threads) + 1)
+            # Label per-device worker threads with the device they ran for
+            if record["depth"] == 0 and "serial" in record:
+                names[tid] = f"{record['serial']} ({record['thread']})"
+            args = {key: value for key, value in record.items()
+                    if key not in ("name", "start_ms", "duration_ms", "thread", "depth", "parent", "counters")}
+            args.update(record["counters"])
+            events.append({"name": record["name"], "cat": "pubg-tool", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": round(record["start_ms"] * 1000, 1), "dur": round(record["duration_ms"] * 1000, 1),
+                           "args": args})
+        events.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": names.get(tid, name)}}
+                      for name, tid in threads.items())
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.epoch))}},
+                      file, default=str)
+
+NULL_TRACER = Tracer()
+
+def write_trace(tracer: Tracer, path: str):
+    """Exports spans as JSON lines for a .jsonl path, otherwise as a Chrome trace"""
+    if path.lower().endswith(".jsonl"):
+        tracer.write_jsonl(path)
+    else:
+        tracer.write_chrome(path)
+
+class CountingReader:
+    """Binary file wrapper adding the bytes read to a tracer counter as they arrive"""
+
+    def __init__(self, source, tracer: Tracer, counter: str = "bytes_in"):
+        self.source = source
+        self.tracer = tracer
+        self.counter = counter
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        self.tracer.add(self.counter, len(data))
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+def traced(name: str):
+    """Method decorator recording a span on self.tracer; a False return marks the span failed"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name) as record:
+                result = func(self, *args, **kwargs)
+                if record is not None and result is False:
+                    record["ok"] = False
+                return result
+        return wrapper
+    return decorate
+
+class AdbError(Exception):
+    """Raised when the adb server or device rejects a request."""
+
+class AdbSession:
+    """Talks to the adb server over its smart-socket protocol (port 5037).
+
+    Every command reuses the already running adb server instead of spawning
+    a new adb.exe process, and file transfers share one persistent sync
+    channel for the lifetime of the session.
+    """
+
+    SYNC_CHUNK = 64 * 1024
+
+    def __init__(self, serial: str, host: str = "127.0.0.1", port: int = 5037, timeout: float = 10.0,
+                 tracer: Tracer = NULL_TRACER):
+        self.serial = serial
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.tracer = tracer
+        self._sync_sock = None
+        self._lock = threading.Lock()
+
+    # --- low level protocol helpers ---
+
+    def _open(self) -> socket.socket:
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise AdbError(f"Cannot reach adb server at {self.host}:{self.port}: {e}")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.tracer.add("adb_connections")
+        return sock
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = sock.recv(size - len(buf))
+            if not chunk:
+                raise AdbError("Connection closed by adb server")
+            buf += chunk
+        return bytes(buf)
+
+    @staticmethod
+    def _recv_all(sock: socket.socket) -> bytes:
+        chunks = []
+        while True:
+            chunk = sock.recv(AdbSession.SYNC_CHUNK)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _request(self, sock: socket.socket, payload: str):
+        data = payload.encode("utf-8")
+        sock.sendall(b"%04x" % len(data) + data)
+        status = self._recv_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise AdbError(self._read_string(sock))
+        raise AdbError(f"Unexpected adb server response: {status!r}")
+
+    def _read_string(self, sock: socket.socket) -> str:
+        length = int(self._recv_exact(sock, 4), 16)
+        return self._recv_exact(sock, length).decode("utf-8", errors="replace")
+
+    def _open_service(self, service: str) -> socket.socket:
+        sock = self._open()
+        try:
+            self._request(sock, f"host:transport:{self.serial}")
+            self._request(sock, service)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    # --- host and device services ---
+
+    def host_command(self, command: str) -> str:
+        """Runs a host service (e.g. "host:version") and returns its reply."""
+        sock = self._open()
+        try:
+            self._request(sock, command)
+            return self._read_string(sock)
+        finally:
+            sock.close()
+
+    def exec_out(self, command: str) -> bytes:
+        """Runs a command on the device and returns its raw stdout."""
+        sock = self._open_service(f"exec:{command}")
+        self.tracer.add("shell_commands")
+        try:
+            output = self._recv_all(sock)
+            self.tracer.add("bytes_in", len(output))
+            return output
+        finally:
+            sock.close()
+
+    @contextlib.contextmanager
+    def exec_stream(self, command: str):
+        """Runs a command on the device and yields its stdout as a binary file object.
+
+        The output is read as it arrives, so large outputs (e.g. a tar
+        stream) never have to be held in memory.
+        """
+        sock = self._open_service(f"exec:{command}")
+        self.tracer.add("shell_commands")
+        stream = sock.makefile("rb")
+        try:
+            yield CountingReader(stream, self.tracer) if self.tracer.enabled else stream
+        finally:
+            stream.close()
+            sock.close()
+
+    def shell(self, command: str) -> str:
+        """Runs a shell command on the device and returns its output."""
+        sock = self._open_service(f"shell:{command}")
+        self.tracer.add("shell_commands")
+        try:
+            output = self._recv_all(sock)
+            self.tracer.add("bytes_in", len(output))
+            return output.decode("utf-8", errors="replace")
+        finally:
+            sock.close()
+
+    # --- sync (file transfer) service ---
+
+    def _sync(self) -> socket.socket:
+        if self._sync_sock is None:
+            self._sync_sock = self._open_service("sync:")
+        return self._sync_sock
+
+    def _sync_send(self, sock: socket.socket, command: bytes, payload: bytes):
+        sock.sendall(command + struct.pack("<I", len(payload)) + payload)
+
+    def _sync_call(self, func):
+        with self._lock:
+            try:
+                return func(self._sync())
+            except (OSError, AdbError):
+                # A failed transfer leaves the channel in an unknown state
+                self._close_sync()
+                raise
+
+    def stat(self, remote_path: str) -> Tuple[int, int, int]:
+        """Returns (mode, size, mtime) of a remote file; mode is 0 if missing."""
+        def _stat(sock):
+            self._sync_send(sock, b"STAT", remote_path.encode("utf-8"))
+            header = self._recv_exact(sock, 16)
+            if header[:4] != b"STAT":
+                raise AdbError(f"Unexpected sync response: {header[:4]!r}")
+            return struct.unpack("<III", header[4:])
+        return self._sync_call(_stat)
+
+    def pull(self, remote_path: str, local_path: Optional[str] = None) -> bytes:
+        """Pulls a remote file, optionally writing it to local_path too."""
+        def _pull(sock):
+            self._sync_send(sock, b"RECV", remote_path.encode("utf-8"))
+            chunks = []
+            while True:
+                header = self._recv_exact(sock, 8)
+                command, length = header[:4], struct.unpack("<I", header[4:])[0]
+                if command == b"DATA":
+                    chunks.append(self._recv_exact(sock, length))
+                elif command == b"DONE":
+                    return b"".join(chunks)
+                elif command == b"FAIL":
+                    raise AdbError(self._recv_exact(sock, length).decode("utf-8", errors="replace"))
+                else:
+                    raise AdbError(f"Unexpected sync response: {command!r}")
+        data = self._sync_call(_pull)
+        self.tracer.add("bytes_in", len(data))
+        if local_path:
+            with open(local_path, 'wb') as file:
+                file.write(data)
+        return data
+
+    def push(self, data: Union[bytes, str], remote_path: str, mode: int = 0o100660) -> int:
+        """Pushes bytes (or a local file path, streamed in chunks) to the device."""
+        def chunks():
+            if isinstance(data, str):
+                with open(data, 'rb') as file:
+                    for chunk in iter(lambda: file.read(self.SYNC_CHUNK), b""):
+                        yield chunk
+            else:
+                view = memoryview(data)
+                for start in range(0, len(view), self.SYNC_CHUNK):
+                    yield view[start:start + self.SYNC_CHUNK]
+
+        def _push(sock):
+            self._sync_send(sock, b"SEND", f"{remote_path},{mode}".encode("utf-8"))
+            sent = 0
+            for chunk in chunks():
+                self._sync_send(sock, b"DATA", chunk)
+                sent += len(chunk)
+            sock.sendall(b"DONE" + struct.pack("<I", int(time.time())))
+            header = self._recv_exact(sock, 8)
+            command, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if command == b"FAIL":
+                raise AdbError(self._recv_exact(sock, length).decode("utf-8", errors="replace"))
+            if command != b"OKAY":
+                raise AdbError(f"Unexpected sync response: {command!r}")
+            return sent
+        sent = self._sync_call(_push)
+        self.tracer.add("bytes_out", sent)
+        return sent
+
+    def _close_sync(self):
+        if self._sync_sock is not None:
+            try:
+                self._sync_sock.close()
+            finally:
+                self._sync_sock = None
+
+    def close(self):
+        """Ends the sync channel."""
+        with self._lock:
+            if self._sync_sock is not None:
+                try:
+                    self._sync_send(self._sync_sock, b"QUIT", b"")
+                except OSError:
+                    pass
+                self._close_sync()
+
+class GvasError(Exception):
+    """Raised when a .sav file is not a GVAS save game we can parse."""
+
+class GvasProperty:
+    """One property of a GVAS save game.
+
+    Offsets point into the owning GvasFile buffer: `offset` is the start of
+    the property name, `value_offset` the start of its payload. BoolProperty
+    stores its value in the header, so its payload is the single value byte.
+    """
+
+    __slots__ = ("name", "type", "offset", "size_offset", "value_offset", "size", "end",
+                 "inner_type", "value_type", "struct_type")
+
+    def __init__(self, name, type, offset, size_offset, value_offset, size, end,
+                 inner_type=None, value_type=None, struct_type=None):
+        self.name = name
+        self.type = type
+        self.offset = offset
+        self.size_offset = size_offset
+        self.value_offset = value_offset
+        self.size = size
+        self.end = end
+        self.inner_type = inner_type
+        self.value_type = value_type
+        self.struct_type = struct_type
+
+    def __repr__(self):
+        return f"GvasProperty({self.name!r}, {self.type!r}, offset={self.offset}, size={self.size})"
+
+class GvasFile:
+    """Reader/writer for Unreal Engine 4 GVAS save games such as Active.sav.
+
+    The file is parsed once into a name -> GvasProperty table; reads decode
+    straight from the buffer and fixed-size writes patch it in place, so an
+    untouched file reserializes byte-identically.
+    """
+
+    # Fixed-size scalar payloads: struct format per property type
+    SCALAR_FORMATS = {
+        "IntProperty": "<i",
+        "UInt32Property": "<I",
+        "Int64Property": "<q",
+        "UInt64Property": "<Q",
+        "Int16Property": "<h",
+        "UInt16Property": "<H",
+        "Int8Property": "<b",
+        "FloatProperty": "<f",
+        "DoubleProperty": "<d",
+    }
+
+    # Structs that UE serializes natively instead of as a property list
+    NATIVE_STRUCTS = {
+        "Vector": "<3f",
+        "Vector2D": "<2f",
+        "Rotator": "<3f",
+        "Quat": "<4f",
+        "LinearColor": "<4f",
+        "Color": "<4B",
+        "IntPoint": "<2i",
+        "DateTime": "<q",
+        "Timespan": "<q",
+        "Guid": "<16s",
+    }
+
+    def __init__(self, content: Union[bytes, bytearray]):
+        self.data = bytearray(content)
+        self.properties: List[GvasProperty] = []
+        self.index: Dict[str, GvasProperty] = {}
+        self._parse()
+
+    @classmethod
+    def from_file(cls, path: str) -> "GvasFile":
+        with open(path, 'rb') as file:
+            return cls(file.read())
+
+    # --- primitive readers ---
+
+    def _read_int32(self, pos: int) -> Tuple[int, int]:
+        return struct.unpack_from("<i", self.data, pos)[0], pos + 4
+
+    def _read_fstring(self, pos: int) -> Tuple[str, int]:
+        length = struct.unpack_from("<i", self.data, pos)[0]
+        pos += 4
+        if length == 0:
+            return "", pos
+        # Decode straight from the buffer slice; this runs for every property header
+        end = pos + length if length > 0 else pos - length * 2
+        if end > len(self.data):
+            raise GvasError(f"String at offset {pos} runs past end of file")
+        if length > 0:
+            return self.data[pos:end - 1].decode("latin-1"), end
+        return self.data[pos:end - 2].decode("utf-16-le"), end
+
+    @staticmethod
+    def encode_fstring(value: str) -> bytes:
+        """Encodes a str the way UE4 serializes FString."""
+        if value == "":
+            return struct.pack("<i", 0)
+        try:
+            raw = value.encode("ascii") + b"\x00"
+            return struct.pack("<i", len(raw)) + raw
+        except UnicodeEncodeError:
+            raw = value.encode("utf-16-le") + b"\x00\x00"
+            return struct.pack("<i", -(len(raw) // 2)) + raw
+
+    # --- parsing ---
+
+    def _parse(self):
+        if self.data[:4] != b"GVAS":
+            raise GvasError("Not a GVAS save file")
+        try:
+            pos = 4
+            self.save_game_version, self.package_version = struct.unpack_from("<ii", self.data, pos)
+            pos += 8
+            self.engine_version = struct.unpack_from("<HHHI", self.data, pos)
+            pos += 10
+            self.engine_branch, pos = self._read_fstring(pos)
+            self.custom_version_format, count = struct.unpack_from("<ii", self.data, pos)
+            pos += 8 + count * 20
+            self.save_game_class, pos = self._read_fstring(pos)
+            self.header_end = pos
+            self.properties, pos = self._parse_properties(pos, len(self.data))
+        except (struct.error, IndexError) as e:
+            raise GvasError(f"Truncated GVAS file: {e}")
+        self.properties_end = pos
+        self.index = {}
+        for prop in self.properties:
+            self.index.setdefault(prop.name, prop)
+
+    def _parse_properties(self, pos: int, limit: int) -> Tuple[List[GvasProperty], int]:
+        """Parses a "None"-terminated property list; returns it and the offset after "None"."""
+        start = pos
+        properties = []
+        while pos < limit:
+            prop, pos = self._parse_property(pos)
+            if prop is None:
+                return properties, pos
+            properties.append(prop)
+        # A file cut off between two properties would otherwise parse as a shorter list
+        raise GvasError(f"Property list at offset {start} has no None terminator")
+
+    def _parse_property(self, pos: int) -> Tuple[Optional[GvasProperty], int]:
+        start = pos
+        name, pos = self._read_fstring(pos)
+        if name == "None":
+            return None, pos
+        prop_type, pos = self._read_fstring(pos)
+        size_offset = pos
+        size = struct.unpack_from("<q", self.data, pos)[0]
+        pos += 8
+        inner_type = value_type = struct_type = None
+
+        if prop_type == "BoolProperty":
+            # Value lives in the header, followed by the HasGuid flag
+            value_offset = pos
+            pos += 1
+            if self.data[pos]:
+                pos += 16
+            pos += 1
+            return GvasProperty(name, prop_type, start, size_offset, value_offset, 1, pos), pos
+        if prop_type == "StructProperty":
+            struct_type, pos = self._read_fstring(pos)
+            pos += 16
+        elif prop_type in ("ArrayProperty", "SetProperty"):
+            inner_type, pos = self._read_fstring(pos)
+        elif prop_type == "MapProperty":
+            inner_type, pos = self._read_fstring(pos)
+            value_type, pos = self._read_fstring(pos)
+        elif prop_type in ("ByteProperty", "EnumProperty"):
+            struct_type, pos = self._read_fstring(pos)
+
+        has_guid = self.data[pos]
+        pos += 1 + (16 if has_guid else 0)
+        end = pos + size
+        if end > len(self.data):
+            raise GvasError(f"Property {name} at offset {start} runs past end of file")
+        return GvasProperty(name, prop_type, start, size_offset, pos, size, end,
+                            inner_type, value_type, struct_type), end
+
+    # --- value decoding ---
+
+    def _decode_element(self, element_type: str, pos: int, struct_type: Optional[str] = None):
+        """Decodes one array/map element; returns (value, next offset)."""
+        fmt = self.SCALAR_FORMATS.get(element_type)
+        if fmt:
+            return struct.unpack_from(fmt, self.data, pos)[0], pos + struct.calcsize(fmt)
+        if element_type == "BoolProperty":
+            return bool(self.data[pos]), pos + 1
+        if element_type == "ByteProperty":
+            return self.data[pos], pos + 1
+        if element_type in ("StrProperty", "NameProperty", "EnumProperty", "ObjectProperty", "SoftObjectProperty"):
+            return self._read_fstring(pos)
+        if element_type == "StructProperty":
+            if struct_type in self.NATIVE_STRUCTS:
+                fmt = self.NATIVE_STRUCTS[struct_type]
+                return struct.unpack_from(fmt, self.data, pos), pos + struct.calcsize(fmt)
+            children, pos = self._parse_properties(pos, len(self.data))
+            return {child.name: self.value_of(child) for child in children}, pos
+        raise GvasError(f"Unsupported element type {element_type}")
+
+    def value_of(self, prop: GvasProperty):
+        """Decodes the value of a property from the buffer."""
+        pos = prop.value_offset
+        fmt = self.SCALAR_FORMATS.get(prop.type)
+        if fmt:
+            return struct.unpack_from(fmt, self.data, pos)[0]
+        if prop.type == "BoolProperty":
+            return bool(self.data[pos])
+        if prop.type in ("StrProperty", "NameProperty", "EnumProperty", "ObjectProperty", "SoftObjectProperty"):
+            return self._read_fstring(pos)[0]
+        if prop.type == "ByteProperty":
+            if prop.struct_type in (None, "None"):
+                return self.data[pos]
+            return self._read_fstring(pos)[0]
+        if prop.type == "StructProperty":
+            return self._decode_element("StructProperty", pos, prop.struct_type)[0]
+        if prop.type in ("ArrayProperty", "SetProperty"):
+            if prop.type == "SetProperty":
+                pos += 4  # removed-entries count
+            count, pos = self._read_int32(pos)
+            struct_type = None
+            if prop.inner_type == "StructProperty":
+                # Struct arrays carry one extra property header describing the element type
+                _, pos = self._read_fstring(pos)
+                _, pos = self._read_fstring(pos)
+                pos += 8
+                struct_type, pos = self._read_fstring(pos)
+                pos += 17
+            values = []
+            for _ in range(count):
+                value, pos = self._decode_element(prop.inner_type, pos, struct_type)
+                values.append(value)
+            return values
+        if prop.type == "MapProperty":
+            pos += 4  # removed-entries count
+            count, pos = self._read_int32(pos)
+            entries = {}
+            for _ in range(count):
+                key, pos = self._decode_element(prop.inner_type, pos, "Guid")
+                value, pos = self._decode_element(prop.value_type, pos)
+                entries[key] = value
+            return entries
+        return bytes(self.data[prop.value_offset:prop.end])
+
+    # --- public accessors ---
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def names(self) -> List[str]:
+        return list(self.index)
+
+    def property(self, name: str) -> Optional[GvasProperty]:
+        """Returns the first top-level property with this name."""
+        return self.index.get(name)
+
+    def get(self, name: str, default=None):
+        """Returns the decoded value of a property."""
+        prop = self.index.get(name)
+        return default if prop is None else self.value_of(prop)
+
+    def schema(self) -> Dict[str, Tuple[str, int, int]]:
+        """Returns name -> (type, value offset, size) for every top-level property."""
+        return {name: (prop.type, prop.value_offset, prop.size) for name, prop in self.index.items()}
+
+    def _typed(self, name: str, prop_type: str) -> GvasProperty:
+        prop = self.index.get(name)
+        if prop is None:
+            raise KeyError(name)
+        if prop.type != prop_type:
+            raise GvasError(f"{name} is {prop.type}, expected {prop_type}")
+        return prop
+
+    def get_int(self, name: str) -> int:
+        return self.value_of(self._typed(name, "IntProperty"))
+
+    def get_float(self, name: str) -> float:
+        return self.value_of(self._typed(name, "FloatProperty"))
+
+    def get_bool(self, name: str) -> bool:
+        return self.value_of(self._typed(name, "BoolProperty"))
+
+    def set_int(self, name: str, value: int):
+        self._typed(name, "IntProperty")
+        self.set(name, value)
+
+    def set_float(self, name: str, value: float):
+        self._typed(name, "FloatProperty")
+        self.set(name, value)
+
+    def set_bool(self, name: str, value: bool):
+        self._typed(name, "BoolProperty")
+        self.set(name, value)
+
+    def raw(self, name: str) -> Optional[memoryview]:
+        """Returns a view of the raw payload bytes of a property."""
+        prop = self.index.get(name)
+        if prop is None:
+            return None
+        return memoryview(self.data)[prop.value_offset:prop.value_offset + prop.size]
+
+    def encode_value(self, prop: GvasProperty, value) -> bytes:
+        """Serializes a value for a property's payload."""
+        fmt = self.SCALAR_FORMATS.get(prop.type)
+        if fmt:
+            if prop.type in ("FloatProperty", "DoubleProperty"):
+                return struct.pack(fmt, float(value))
+            return struct.pack(fmt, int(value))
+        if prop.type == "BoolProperty":
+            return b"\x01" if value else b"\x00"
+        if prop.type == "StructProperty" and prop.struct_type in self.NATIVE_STRUCTS:
+            return struct.pack(self.NATIVE_STRUCTS[prop.struct_type], *value)
+        if prop.type == "ByteProperty" and prop.struct_type in (None, "None"):
+            return bytes([int(value)])
+        if prop.type in ("StrProperty", "NameProperty", "EnumProperty") or prop.type == "ByteProperty":
+            return self.encode_fstring(str(value))
+        raise GvasError(f"Cannot write {prop.type} property {prop.name}")
+
+    def set(self, name: str, value) -> bool:
+        """Writes a property value; returns False if the property does not exist."""
+        prop = self.index.get(name)
+        if prop is None:
+            return False
+        payload = self.encode_value(prop, value)
+        if len(payload) == prop.size:
+            self.data[prop.value_offset:prop.value_offset + prop.size] = payload
+        else:
+            # Variable-size values (strings) change the layout, so splice and reindex
+            self.data[prop.value_offset:prop.end] = payload
+            struct.pack_into("<q", self.data, prop.size_offset, len(payload))
+            self._parse()
+        return True
+
+    def patch(self) -> "GvasPatch":
+        """Starts a batch of property writes against this file."""
+        return GvasPatch(self)
+
+    def apply_changes(self, changes: List[Tuple[int, bytes, bytes]], undo: bool = False):
+        """Replays (or with undo=True reverts) changes returned by GvasPatch.apply."""
+        view = memoryview(self.data)
+        for offset, old, new in (reversed(changes) if undo else changes):
+            value = old if undo else new
+            view[offset:offset + len(value)] = value
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.data)
+
+class GvasPatch:
+    """A batch of fixed-size property writes applied to a GvasFile in one pass.
+
+    Writes are queued with set(), resolved against the property index
+    together, and applied directly to the file's buffer. apply() returns the
+    minimal list of (offset, old, new) byte runs that actually changed, which
+    GvasFile.apply_changes can replay or undo.
+    """
+
+    def __init__(self, gvas: GvasFile):
+        self.gvas = gvas
+        self.writes: List[Tuple[str, object, Optional[str]]] = []
+        self.missing: List[str] = []
+        self.written: Dict[str, object] = {}
+
+    def set(self, name: str, value, expected_type: Optional[str] = None) -> "GvasPatch":
+        """Queues a write; expected_type skips properties stored as another type."""
+        self.writes.append((name, value, expected_type))
+        return self
+
+    def resolve(self) -> List[Tuple[int, bytes]]:
+        """Resolves all queued writes to (offset, payload) pairs."""
+        self.missing = []
+        self.written = {}
+        resolved = {}
+        for name, value, expected_type in self.writes:
+            prop = self.gvas.property(name)
+            if prop is None or (expected_type and prop.type != expected_type):
+                self.missing.append(name)
+                continue
+            payload = self.gvas.encode_value(prop, value)
+            if len(payload) != prop.size:
+                raise GvasError(f"Cannot patch {name} in place: size changes from {prop.size} to {len(payload)}")
+            # A later write to the same property wins
+            resolved[prop.value_offset] = payload
+            self.written[name] = value
+        return sorted(resolved.items())
+
+    def apply(self) -> List[Tuple[int, bytes, bytes]]:
+        """Applies the batch and returns the byte runs that changed."""
+        view = memoryview(self.gvas.data)
+        changes = []
+        for offset, payload in self.resolve():
+            old = view[offset:offset + len(payload)]
+            if old == payload:
+                continue
+            # Trim unchanged leading/trailing bytes so each change is minimal
+            start, end = 0, len(payload)
+            while old[start] == payload[start]:
+                start += 1
+            while old[end - 1] == payload[end - 1]:
+                end -= 1
+            changes.append((offset + start, bytes(old[start:end]), payload[start:end]))
+            view[offset + start:offset + end] = payload[start:end]
+        return changes
+
+# Blueprint struct members are saved as Name_<n>_<32 hex GUID>
+BLUEPRINT_FIELD_SUFFIX = re.compile(r"_\d+_[0-9A-F]{32}$")
+
+def diff_values(old, new, path: str, changes: List[dict]):
+    """Appends the differences between two decoded property values to changes"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() | new.keys():
+            name = BLUEPRINT_FIELD_SUFFIX.sub("", key) if isinstance(key, str) else key
+            child = f"{path}[{key!r}]" if not isinstance(key, str) else f"{path}.{name}"
+            if key not in new:
+                changes.append({"path": child, "change": "removed", "old": old[key], "new": None})
+            elif key not in old:
+                changes.append({"path": child, "change": "added", "old": None, "new": new[key]})
+            elif old[key] != new[key]:
+                diff_values(old[key], new[key], child, changes)
+    elif isinstance(old, list) and isinstance(new, list):
+        for i in range(max(len(old), len(new))):
+            if i >= len(new):
+                changes.append({"path": f"{path}[{i}]", "change": "removed", "old": old[i], "new": None})
+            elif i >= len(old):
+                changes.append({"path": f"{path}[{i}]", "change": "added", "old": None, "new": new[i]})
+            elif old[i] != new[i]:
+                diff_values(old[i], new[i], f"{path}[{i}]", changes)
+    elif old != new:
+        changes.append({"path": path, "change": "changed", "old": old, "new": new})
+
+def diff_gvas(old: GvasFile, new: GvasFile) -> List[dict]:
+    """Lists property-level differences between two GVAS files.
+
+    Payloads are compared as raw bytes first, so only properties that
+    actually differ get decoded; nested map/array/struct values are reported
+    down to the changed member.
+    """
+    changes = []
+    for field in ("save_game_class", "engine_version", "engine_branch", "save_game_version", "package_version"):
+        if getattr(old, field) != getattr(new, field):
+            changes.append({"path": f"<header>.{field}", "change": "changed", "type": None,
+                            "old": getattr(old, field), "new": getattr(new, field)})
+
+    def keyed(gvas):
+        # Repeated names (rare) are told apart by occurrence
+        seen = {}
+        result = {}
+        for prop in gvas.properties:
+            n = seen[prop.name] = seen.get(prop.name, 0) + 1
+            result[prop.name if n == 1 else f"{prop.name}#{n}"] = prop
+        return result
+
+    old_props, new_props = keyed(old), keyed(new)
+    old_view, new_view = memoryview(old.data), memoryview(new.data)
+    for name in list(old_props) + [n for n in new_props if n not in old_props]:
+        a, b = old_props.get(name), new_props.get(name)
+        if b is None:
+            changes.append({"path": name, "change": "removed", "type": a.type, "old": old.value_of(a), "new": None})
+        elif a is None:
+            changes.append({"path": name, "change": "added", "type": b.type, "old": None, "new": new.value_of(b)})
+        elif (a.type, a.inner_type, a.value_type, a.struct_type) != (b.type, b.inner_type, b.value_type, b.struct_type):
+            changes.append({"path": name, "change": "type", "type": f"{a.type} -> {b.type}",
+                            "old": old.value_of(a), "new": new.value_of(b)})
+        elif old_view[a.value_offset:a.end] != new_view[b.value_offset:b.end]:
+            nested = []
+            diff_values(old.value_of(a), new.value_of(b), name, nested)
+            for change in nested:
+                change["type"] = a.type
+            changes.extend(nested)
+    return changes
+
+class LazyGvasFile(GvasFile):
+    """GVAS reader over a memory-mapped file, for the large UIElemLayout_*.sav files.
+
+    Only top-level property headers are parsed on open. Map and array
+    elements are indexed on first use by walking headers and skipping
+    payloads, and entries are decoded one at a time on request. With
+    writable=True the file is mapped copy-on-write: fixed-size writes
+    (including fields inside a map entry's struct) stay in memory until
+    save() replaces the file in one step.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        import mmap
+
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY if writable else mmap.ACCESS_READ)
+        except ValueError as e:
+            self._file.close()
+            raise GvasError(f"Cannot map {path}: {e}")
+        self.writable = writable
+        self.properties = []
+        self.index = {}
+        self._elements: Dict[str, Dict[object, Tuple[int, Optional[str]]]] = {}
+        self._parse()
+
+    def close(self):
+        self.data.close()
+        self._file.close()
+
+    def save(self):
+        """Writes the edited mapping to a temp file, closes and swaps it in"""
+        if not self.writable:
+            raise GvasError(f"{self.path} was opened read-only")
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(self.data)
+        # The mapping must be released before the file can be replaced on Windows
+        self.close()
+        os.replace(temp_path, self.path)
+
+    def __enter__(self) -> "LazyGvasFile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def set(self, name: str, value) -> bool:
+        prop = self.index.get(name)
+        if prop is None:
+            return False
+        payload = self.encode_value(prop, value)
+        if len(payload) != prop.size:
+            raise GvasError(f"Cannot resize {name} in a mapped file")
+        self.data[prop.value_offset:prop.value_offset + prop.size] = payload
+        return True
+
+    def _skip_element(self, element_type: str, pos: int, struct_type: Optional[str] = None) -> int:
+        """Returns the offset after one element without decoding it"""
+        fmt = self.SCALAR_FORMATS.get(element_type)
+        if fmt:
+            return pos + struct.calcsize(fmt)
+        if element_type in ("BoolProperty", "ByteProperty"):
+            return pos + 1
+        if element_type == "StructProperty":
+            if struct_type in self.NATIVE_STRUCTS:
+                return pos + struct.calcsize(self.NATIVE_STRUCTS[struct_type])
+            # Property headers carry their payload size, so nested payloads are skipped
+            return self._parse_properties(pos, len(self.data))[1]
+        return self._read_fstring(pos)[1]
+
+    def elements(self, name: str) -> Dict[object, Tuple[int, Optional[str]]]:
+        """Returns key (map key or array index) -> (value offset, struct type) for a container property"""
+        if name in self._elements:
+            return self._elements[name]
+        prop = self.index.get(name)
+        if prop is None:
+            raise KeyError(name)
+        pos = prop.value_offset
+        spans = {}
+        if prop.type == "MapProperty":
+            count, pos = self._read_int32(pos + 4)
+            for _ in range(count):
+                key, pos = self._decode_element(prop.inner_type, pos, "Guid")
+                spans[key] = (pos, None)
+                pos = self._skip_element(prop.value_type, pos)
+        elif prop.type in ("ArrayProperty", "SetProperty"):
+            if prop.type == "SetProperty":
+                pos += 4
+            count, pos = self._read_int32(pos)
+            struct_type = None
+            if prop.inner_type == "StructProperty":
+                _, pos = self._read_fstring(pos)
+                _, pos = self._read_fstring(pos)
+                struct_type, pos = self._read_fstring(pos + 8)
+                pos += 17
+            for i in range(count):
+                spans[i] = (pos, struct_type)
+                pos = self._skip_element(prop.inner_type, pos, struct_type)
+        else:
+            raise GvasError(f"{name} is {prop.type}, not a container")
+        self._elements[name] = spans
+        return spans
+
+    def _element_type(self, prop: GvasProperty) -> str:
+        return prop.value_type if prop.type == "MapProperty" else prop.inner_type
+
+    def element(self, name: str, key):
+        """Decodes a single map entry or array element"""
+        pos, struct_type = self.elements(name)[key]
+        return self._decode_element(self._element_type(self.index[name]), pos, struct_type)[0]
+
+    def element_fields(self, name: str, key) -> List[GvasProperty]:
+        """Returns the property headers of a struct element without decoding their values"""
+        prop = self.index[name]
+        pos, struct_type = self.elements(name)[key]
+        if self._element_type(prop) != "StructProperty" or struct_type in self.NATIVE_STRUCTS:
+            raise GvasError(f"Elements of {name} are not property structs")
+        return self._parse_properties(pos, len(self.data))[0]
+
+    def set_element_field(self, name: str, key, field: str, value) -> bool:
+        """Writes one fixed-size field of a struct element in place.
+
+        field may be the full member name or the name without its
+        _<n>_<GUID> blueprint suffix. Returns False if there is no such field.
+        """
+        for child in self.element_fields(name, key):
+            if field in (child.name, BLUEPRINT_FIELD_SUFFIX.sub("", child.name)):
+                payload = self.encode_value(child, value)
+                if len(payload) != child.size:
+                    raise GvasError(f"Cannot resize {child.name} in a mapped file")
+                self.data[child.value_offset:child.value_offset + child.size] = payload
+                return True
+        return False
+
+class IniDocument:
+    """Line-preserving model of a UE4 config file such as UserCustom.ini.
+
+    Keeps the original lines (and line endings) so untouched content is
+    written back verbatim, with an index from key to the lines holding it.
+    `dirty` is set only when an edit actually changes the text.
+    """
+
+    def __init__(self, text: str = ""):
+        self.lines = text.splitlines(keepends=True)
+        self.newline = "\r\n" if self.lines and self.lines[0].endswith("\r\n") else "\n"
+        self.dirty = False
+        self._reindex()
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> "IniDocument":
+        return cls(content.decode("utf-8", errors="surrogateescape"))
+
+    @staticmethod
+    def split_line(line: str) -> Tuple[Optional[str], Optional[str]]:
+        """Splits "Key=Value" into (key, value); (None, None) for other lines."""
+        stripped = line.strip()
+        if not stripped or stripped[0] in ";#[" or "=" not in stripped:
+            return None, None
+        key, value = stripped.split("=", 1)
+        return key.strip(), value
+
+    def _reindex(self):
+        self.index: Dict[str, List[int]] = {}
+        for i, line in enumerate(self.lines):
+            key, _ = self.split_line(line)
+            if key is not None:
+                self.index.setdefault(key, []).append(i)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Returns the value of the last line setting key."""
+        positions = self.index.get(key)
+        if not positions:
+            return default
+        return self.split_line(self.lines[positions[-1]])[1]
+
+    def set(self, key: str, value) -> bool:
+        """Sets every line for key to value, appending the key if it is missing.
+
+        Returns True if the document changed.
+        """
+        value = str(value)
+        positions = self.index.get(key)
+        if not positions:
+            self.append(f"{key}={value}")
+            return True
+        changed = False
+        for i in positions:
+            line = self.lines[i]
+            ending = line[len(line.rstrip("\r\n")):] or self.newline
+            new_line = f"{key}={value}{ending}"
+            if new_line != line:
+                self.lines[i] = new_line
+                changed = True
+        self.dirty = self.dirty or changed
+        return changed
+
+    def replace_line(self, i: int, text: str) -> bool:
+        """Replaces the text of line i, keeping its line ending."""
+        line = self.lines[i]
+        ending = line[len(line.rstrip("\r\n")):] or self.newline
+        if line == text + ending:
+            return False
+        self.lines[i] = text + ending
+        self.dirty = True
+        self._reindex()
+        return True
+
+    def insert(self, i: int, line: str):
+        """Inserts a raw line before line i."""
+        if i >= len(self.lines):
+            return self.append(line)
+        self.lines.insert(i, line + self.newline)
+        self.dirty = True
+        self._reindex()
+
+    def append(self, line: str):
+        """Appends a raw line to the end of the document."""
+        if self.lines and not self.lines[-1].endswith(("\n", "\r")):
+            self.lines[-1] += self.newline
+        self.lines.append(line + self.newline)
+        key, _ = self.split_line(line)
+        if key is not None:
+            self.index.setdefault(key, []).append(len(self.lines) - 1)
+        self.dirty = True
+
+    def to_text(self) -> str:
+        return "".join(self.lines)
+
+    def to_bytes(self) -> bytes:
+        return self.to_text().encode("utf-8", errors="surrogateescape")
+
+# UserCustom.ini stores each console variable as hex of its text XOR'd with this key
+CVAR_XOR_KEY = 0x79
+CVAR_XOR_TABLE = bytes(b ^ CVAR_XOR_KEY for b in range(256))
+
+def decode_cvar(hex_text: str) -> str:
+    """Decodes one obfuscated +CVars value to "name=value" text."""
+    return bytes.fromhex(hex_text).translate(CVAR_XOR_TABLE).decode("latin-1")
+
+def encode_cvar(text: str) -> str:
+    """Encodes "name=value" text the way UserCustom.ini stores it."""
+    return text.encode("latin-1").translate(CVAR_XOR_TABLE).hex().upper()
+
+class CVarModel:
+    """Dictionary view of the obfuscated +CVars lines of an IniDocument.
+
+    All lines are decoded in one pass (a single fromhex/translate over the
+    concatenated values). Edits rewrite only the lines of the changed
+    variable, so every other line round-trips untouched.
+    """
+
+    KEY = "+CVars"
+
+    def __init__(self, doc: IniDocument):
+        self.doc = doc
+        self._load()
+
+    def _load(self):
+        self.lines: Dict[str, List[int]] = {}
+        self.values: Dict[str, Optional[str]] = {}
+        encoded = []
+        for i in self.doc.index.get(self.KEY, []):
+            value = self.doc.split_line(self.doc.lines[i])[1].strip()
+            # Lines that are not valid hex are left alone
+            if len(value) % 2 == 0 and not value.strip("0123456789abcdefABCDEF"):
+                encoded.append((i, value))
+        decoded = bytes.fromhex("".join(value for _, value in encoded)).translate(CVAR_XOR_TABLE)
+
+        start = 0
+        for i, value in encoded:
+            end = start + len(value) // 2
+            text = decoded[start:end].decode("latin-1")
+            start = end
+            # Entries without "=" (e.g. "sg.GLAPPLEClipDistance") are flags
+            name, separator, cvar_value = text.partition("=")
+            self.lines.setdefault(name, []).append(i)
+            self.values[name] = cvar_value if separator else None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    def items(self) -> List[Tuple[str, Optional[str]]]:
+        return list(self.values.items())
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.values.get(name, default)
+
+    def set(self, name: str, value) -> bool:
+        """Sets a console variable, adding it after the last +CVars line if new.
+
+        A name listed on several lines (e.g. r.OpenGL.StripExtensions) only
+        has its last line rewritten: that is the value get() reports and the
+        one the game applies last. Returns True if the document changed.
+        """
+        line = f"{self.KEY}={encode_cvar(f'{name}={value}')}"
+        changed = False
+        if name in self.lines:
+            changed = self.doc.replace_line(self.lines[name][-1], line)
+        else:
+            positions = self.doc.index.get(self.KEY)
+            if positions:
+                self.doc.insert(positions[-1] + 1, line)
+            else:
+                self.doc.append("[UserCustom DeviceProfile]")
+                self.doc.append(line)
+            changed = True
+        if changed:
+            # Line numbers shift when a line is inserted
+            self._load()
+        return changed
+
+# Numeric CVar values as stored in UserCustom.ini: "0.6", "4.0", or dotted forms like "0.0.45"
+CVAR_NUMBER = re.compile(r"-?\d+(\.\d+)*")
+
+# Console variables that trade visual quality for frame rate
+RENDER_CVARS = {
+    "r.MobileContentScaleFactor": "Render scale (lower = more FPS)",
+    "r.ShadowQuality": "Shadow quality (0 disables shadows)",
+    "r.Shadow.DistanceScale": "Shadow draw distance scale",
+    "r.StaticMeshLODDistanceScale": "Mesh LOD distance scale (higher = lower detail sooner)",
+    "foliage.LODDistanceScale": "Foliage LOD distance scale",
+    "r.MSAACount": "MSAA sample count",
+}
+
+# Named bundles of Active.sav values (FPS 2-8, quality 1-5, style 1-6 as in the
+# set_fps/set_graphics_quality/set_graphics_style tables) and render CVars.
+# Level CVars such as r.ShadowQuality use the game's own dotted form: a stock
+# UserCustom.ini stores level 0 as "0.0.45" and level 1 as "1.0.80" (see
+# r.ShadowQuality and r.ACESStyle there), so the presets write exactly those.
+PERFORMANCE_PRESETS = {
+    "competitive": {
+        "name": "Max FPS Competitive",
+        "description": "Ultra Extreme FPS, Smooth graphics, Classic style, no shadows",
+        "sav": {"FPSLevel": 8, "BattleFPS": 8, "LobbyFPS": 8, "ArtQuality": 1,
+                "LobbyRenderQuality": 1, "BattleRenderQuality": 1, "BattleRenderStyle": 1},
+        "cvars": {"r.MobileContentScaleFactor": "0.75", "r.ShadowQuality": "0.0.45",
+                  "r.Shadow.DistanceScale": "0.0", "r.StaticMeshLODDistanceScale": "1.5",
+                  "foliage.LODDistanceScale": "0.4", "r.MSAACount": "1.0"},
+    },
+    "balanced": {
+        "name": "Balanced",
+        "description": "Extreme FPS, Balanced graphics, Realistic style",
+        "sav": {"FPSLevel": 6, "BattleFPS": 6, "LobbyFPS": 6, "ArtQuality": 2,
+                "LobbyRenderQuality": 2, "BattleRenderQuality": 2, "BattleRenderStyle": 3},
+        "cvars": {"r.MobileContentScaleFactor": "1.0", "r.ShadowQuality": "1.0.80",
+                  "r.Shadow.DistanceScale": "0.5", "r.StaticMeshLODDistanceScale": "1.0",
+                  "foliage.LODDistanceScale": "0.8", "r.MSAACount": "2.0"},
+    },
+    "low-thermal": {
+        "name": "Low Thermal",
+        "description": "Medium FPS and low render load to keep the device cool",
+        "sav": {"FPSLevel": 3, "BattleFPS": 3, "LobbyFPS": 3, "ArtQuality": 1,
+                "LobbyRenderQuality": 1, "BattleRenderQuality": 1, "BattleRenderStyle": 4},
+        "cvars": {"r.MobileContentScaleFactor": "0.6", "r.ShadowQuality": "0.0.45",
+                  "r.Shadow.DistanceScale": "0.0", "r.StaticMeshLODDistanceScale": "2.0",
+                  "foliage.LODDistanceScale": "0.3", "r.MSAACount": "1.0"},
+    },
+}
+
+# Game default sensitivity (the 100% setting) per scope, for the camera
+# (CamLensSen*, also used for FireCamLensSen*) and gyroscope (GyroscopeSen*,
+# FireGyroscopeSen*) properties of Active.sav
+SENSITIVITY_DEFAULTS = {
+    "CamLensSen": {"NONESNIPER": 0.8, "REDDOTSNIPER": 0.4, "2XSNIPER": 0.24, "3XSNIPER": 0.17, "4XSNIPER": 0.11,
+                   "6XSNIPER": 0.09, "8XSNIPER": 0.08, "NONESNIPERFP": 0.7, "SHOULDERTPP": 0.8, "SHOULDERFPP": 0.8},
+    "GyroscopeSen": {"NONESNIPER": 0.8, "REDDOTSNIPER": 0.72, "2XSNIPER": 0.6, "3XSNIPER": 0.5, "4XSNIPER": 0.4,
+                     "6XSNIPER": 0.34, "8XSNIPER": 0.28, "NONESNIPERFP": 0.76, "SHOULDERTPP": 0.8, "SHOULDERFPP": 0.8},
+}
+
+# <Fire?><CamLensSen|GyroscopeSen><scope><_n layout copy?>
+SENSITIVITY_PROPERTY = re.compile(r"^(Fire)?(CamLensSen|GyroscopeSen)([A-Za-z0-9]+?)(_\d+)?$")
+
+# Recoil control profiles as percentages of the game defaults: camera is the
+# free-look camera, ads the camera while firing/aiming, gyro both gyroscope sets
+SENSITIVITY_PROFILES = {
+    "balanced": {"name": "Balanced Control", "camera": 120, "ads": 80, "gyro": 300},
+    "minimal-recoil": {"name": "Minimal Recoil", "camera": 100, "ads": 65, "gyro": 400},
+    "pro": {"name": "Pro Control", "camera": 140, "ads": 90, "gyro": 200},
+    "default": {"name": "Default", "camera": 100, "ads": 100, "gyro": 100},
+}
+
+def sensitivity_values(schema: Dict[str, Tuple[str, int, int]], profile: dict) -> Dict[str, float]:
+    """Maps every sensitivity FloatProperty in a save schema to its value under a profile"""
+    values = {}
+    for name, (prop_type, _, _) in schema.items():
+        match = SENSITIVITY_PROPERTY.match(name)
+        if not match or prop_type != "FloatProperty":
+            continue
+        fire, kind, scope = match.group(1), match.group(2), match.group(3).upper()
+        default = SENSITIVITY_DEFAULTS[kind].get(scope)
+        if default is None:
+            continue
+        percent = profile["gyro"] if kind == "GyroscopeSen" else profile["ads"] if fire else profile["camera"]
+        values[name] = round(default * percent / 100, 4)
+    return values
+
+def format_size(size: int) -> str:
+    """Formats a byte count as bytes/KB/MB/GB"""
+    if size < 1024:
+        return f"{size} bytes"
+    elif size < 1024 * 1024:
+        return f"{size / 1024:.2f} KB"
+    elif size < 1024 * 1024 * 1024:
+        return f"{size / (1024 * 1024):.2f} MB"
+    return f"{size / (1024 * 1024 * 1024):.2f} GB"
+
+class CleanPolicy:
+    """Rules deciding which files under a cleanup root may be deleted.
+
+    min_age is seconds since the file was last modified; min_size/max_size
+    bound the file size in bytes; include/exclude are fnmatch globs on the
+    file name. byte_budget turns the root into an LRU cache: only the least
+    recently used files beyond the budget are deleted.
+    """
+
+    def __init__(self, min_age: float = 0, min_size: int = 0, max_size: Optional[int] = None,
+                 include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 byte_budget: Optional[int] = None):
+        self.min_age = min_age
+        self.min_size = min_size
+        self.max_size = max_size
+        self.include = include or []
+        self.exclude = exclude or []
+        self.byte_budget = byte_budget
+
+    def allows(self, name: str, st: os.stat_result, now: float) -> bool:
+        import fnmatch
+
+        if now - st.st_mtime < self.min_age:
+            return False
+        if st.st_size < self.min_size or (self.max_size is not None and st.st_size > self.max_size):
+            return False
+        if self.include and not any(fnmatch.fnmatch(name, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude)
+
+    def select(self, files: List[Tuple[str, os.stat_result]], now: float) -> List[Tuple[str, os.stat_result]]:
+        """Returns the files to delete out of every file found under a root."""
+        allowed = [(path, st) for path, st in files if self.allows(os.path.basename(path), st, now)]
+        if self.byte_budget is None:
+            return allowed
+        # Keep the most recently used files; trim the oldest until under budget
+        excess = sum(st.st_size for _, st in files) - self.byte_budget
+        selected = []
+        for path, st in sorted(allowed, key=lambda item: max(item[1].st_atime, item[1].st_mtime)):
+            if excess <= 0:
+                break
+            selected.append((path, st))
+            excess -= st.st_size
+        return selected
+
+def default_clean_roots() -> List[Tuple[str, bool, CleanPolicy]]:
+    """Returns (directory, remove_subdirectories, policy) roots cleaned by the temp cleaner"""
+    import tempfile
+
+    roots = [
+        # Windows temp directory; recent files may still be in use
+        (os.environ.get('TEMP') or tempfile.gettempdir(), True, CleanPolicy(min_age=24 * 3600)),
+        # Windows Prefetch directory; only stale entries
+        (os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Prefetch'), False,
+         CleanPolicy(min_age=30 * 24 * 3600, include=["*.pf"])),
+    ]
+    # GameLoop shader cache if available. Wiping it makes the next match
+    # recompile shaders and stutter, so it is only trimmed to a budget.
+    try:
+        import winreg
+        key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r'SOFTWARE\WOW6432Node\Tencent\MobileGamePC\UI')
+        gameloop_path = winreg.QueryValueEx(key, 'InstallPath')[0]
+        winreg.CloseKey(key)
+        roots.append((os.path.join(gameloop_path, 'ShaderCache'), False, CleanPolicy(byte_budget=512 * 1024 * 1024)))
+    except Exception:
+        # Registry key not found or not on Windows, skip GameLoop cleaning
+        pass
+    return roots
+
+class TempCleaner:
+    """Deletes files under a set of directories according to a CleanPolicy.
+
+    plan() lists every root once with os.scandir, keeping each DirEntry's
+    stat result, and decides what would be deleted and how many bytes that
+    frees. run() executes a plan on a bounded thread pool (or, with
+    dry_run=True, only reports it). Roots are (path, remove_dirs) or
+    (path, remove_dirs, policy) tuples; without a policy everything goes.
+    """
+
+    BATCH_SIZE = 256
+
+    def __init__(self, roots: List[tuple], max_workers: int = 4):
+        self.roots = roots
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _is_junction(entry: os.DirEntry) -> bool:
+        """True for Windows directory junctions, which is_dir(follow_symlinks=False) does not exclude"""
+        if hasattr(entry, "is_junction"):
+            return entry.is_junction()
+        import stat
+
+        attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+        return bool(attributes & getattr(stat, "FILE_ATTRIBUTE_REPARSE_POINT", 0x400)) and not entry.is_symlink()
+
+    def _scan(self, path: str, files: List[Tuple[str, os.stat_result]], dirs: List[str], recurse: bool):
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if self._is_junction(entry):
+                            # Its target lies outside the root; neither follow nor remove it
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            if recurse:
+                                self._scan(entry.path, files, dirs, recurse)
+                                dirs.append(entry.path)
+                        else:
+                            files.append((entry.path, entry.stat(follow_symlinks=False)))
+                    except OSError:
+                        continue
+        except OSError:
+            # Missing or unreadable directory
+            pass
+
+    def plan(self) -> List[dict]:
+        """Returns, per root, the files and directories that would be removed"""
+        now = time.time()
+        plans = []
+        for root in self.roots:
+            path, remove_dirs = root[0], root[1]
+            policy = root[2] if len(root) > 2 and root[2] is not None else CleanPolicy()
+            files, dirs = [], []
+            self._scan(path, files, dirs, remove_dirs)
+            selected = policy.select(files, now)
+            plans.append({
+                "root": path,
+                "files": [(file_path, st.st_size) for file_path, st in selected],
+                # Collected post-order, so children are removed before their parents
+                "dirs": dirs,
+                "top_dirs": {d for d in dirs if os.path.dirname(d) == path.rstrip(os.sep)},
+                "bytes": sum(st.st_size for _, st in selected),
+                "found_files": len(files),
+            })
+        return plans
+
+    @staticmethod
+    def _remove_files(files: List[Tuple[str, int]]) -> Dict[str, int]:
+        stats = {"files": 0, "bytes": 0, "errors": 0}
+        for path, size in files:
+            try:
+                os.unlink(path)
+                stats["files"] += 1
+                stats["bytes"] += size
+            except OSError:
+                # Skip files that can't be removed (likely in use)
+                stats["errors"] += 1
+        return stats
+
+    def run(self, dry_run: bool = False, plans: Optional[List[dict]] = None) -> Dict[str, object]:
+        """Cleans every root (or only plans it) and returns the totals
+
+        Pass the result of plan() to delete exactly what was shown to the
+        user instead of scanning again.
+        """
+        import concurrent.futures
+
+        started = time.perf_counter()
+        plans = self.plan() if plans is None else plans
+        total = {"files": 0, "dirs": 0, "bytes": 0, "errors": 0,
+                 "planned_files": sum(len(p["files"]) for p in plans),
+                 "planned_bytes": sum(p["bytes"] for p in plans),
+                 "dry_run": dry_run,
+                 "roots": [{"root": p["root"], "files": len(p["files"]), "bytes": p["bytes"],
+                            "found_files": p["found_files"]} for p in plans]}
+        if not dry_run:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+                futures = [pool.submit(self._remove_files, p["files"][start:start + self.BATCH_SIZE])
+                           for p in plans for start in range(0, len(p["files"]), self.BATCH_SIZE)]
+                for future in concurrent.futures.as_completed(futures):
+                    for key, value in future.result().items():
+                        total[key] += value
+            # Remove directories the policy emptied; ones still holding kept files stay
+            for p in plans:
+                for path in p["dirs"]:
+                    try:
+                        os.rmdir(path)
+                        if path in p["top_dirs"]:
+                            total["dirs"] += 1
+                    except OSError:
+                        pass
+        total["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return total
+
+# PUBG Mobile server hosts probed by the ping optimizer, with their region
+PUBG_PING_SERVERS = {
+    "na.igamecj.com": "North America",
+    "eu.igamecj.com": "Europe",
+    "as.igamecj.com": "Asia",
+    "krjp.igamecj.com": "Korea/Japan",
+    "sa.igamecj.com": "South America",
+}
+
+class LatencyProbe:
+    """Measures round-trip latency to many targets concurrently with asyncio.
+
+    TCP probes time the connect handshake; UDP probes time a datagram echo
+    (so they need a target that answers, such as a local echo server).
+    Host names are resolved once up front so DNS time is not counted.
+    Every target gets `count` probes spaced `interval` seconds apart and
+    results report min/avg/p95/jitter in milliseconds and loss in percent.
+    """
+
+    def __init__(self, targets: List[Tuple[str, int]], count: int = 4, timeout: float = 1.0,
+                 interval: float = 0.05, protocol: str = "tcp", payload: bytes = b"pubg-ping"):
+        if protocol not in ("tcp", "udp"):
+            raise ValueError(f"Unknown probe protocol: {protocol}")
+        self.targets = targets
+        self.count = count
+        self.timeout = timeout
+        self.interval = interval
+        self.protocol = protocol
+        self.payload = payload
+
+    @staticmethod
+    def summarize(samples: List[float], sent: int) -> Dict[str, Optional[float]]:
+        """Returns min/avg/p95/jitter (ms) and loss (%) for a list of RTT samples"""
+        loss = round(100.0 * (sent - len(samples)) / sent, 1) if sent else 100.0
+        if not samples:
+            return {"min": None, "avg": None, "p95": None, "jitter": None, "loss": loss}
+        ordered = sorted(samples)
+        # Nearest-rank percentile
+        p95 = ordered[max(0, -(-95 * len(ordered) // 100) - 1)]
+        # Mean difference between consecutive probes, as in RFC 3550
+        jitter = (sum(abs(b - a) for a, b in zip(samples, samples[1:])) / (len(samples) - 1)
+                  if len(samples) > 1 else 0.0)
+        return {"min": round(ordered[0], 2), "avg": round(sum(samples) / len(samples), 2),
+                "p95": round(p95, 2), "jitter": round(jitter, 2), "loss": loss}
+
+    async def _tcp_once(self, address: tuple) -> float:
+        import asyncio
+
+        started = time.perf_counter()
+        _, writer = await asyncio.wait_for(asyncio.open_connection(address[0], address[1]), self.timeout)
+        elapsed = time.perf_counter() - started
+        writer.close()
+        return elapsed * 1000
+
+    async def _udp_once(self, address: tuple) -> float:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        reply = loop.create_future()
+
+        class EchoProtocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                if not reply.done():
+                    reply.set_result(data)
+
+            def error_received(self, exc):
+                if not reply.done():
+                    reply.set_exception(exc)
+
+        transport, _ = await loop.create_datagram_endpoint(EchoProtocol, remote_addr=address[:2])
+        try:
+            started = time.perf_counter()
+            transport.sendto(self.payload)
+            await asyncio.wait_for(reply, self.timeout)
+            return (time.perf_counter() - started) * 1000
+        finally:
+            transport.close()
+
+    async def _probe_target(self, host: str, port: int) -> dict:
+        import asyncio
+
+        result = {"host": host, "port": port, "protocol": self.protocol, "sent": self.count, "samples": []}
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM if self.protocol == "tcp" else socket.SOCK_DGRAM)
+            address = infos[0][4]
+        except OSError as e:
+            result.update(self.summarize([], self.count), error=f"resolve failed: {e}")
+            return result
+
+        probe_once = self._tcp_once if self.protocol == "tcp" else self._udp_once
+        for attempt in range(self.count):
+            if attempt:
+                await asyncio.sleep(self.interval)
+            try:
+                result["samples"].append(round(await probe_once(address), 3))
+            except (OSError, asyncio.TimeoutError) as e:
+                result["error"] = str(e) or type(e).__name__
+        result.update(self.summarize(result["samples"], self.count))
+        return result
+
+    async def probe_async(self) -> List[dict]:
+        import asyncio
+
+        return await asyncio.gather(*(self._probe_target(host, port) for host, port in self.targets))
+
+    def run(self) -> List[dict]:
+        """Probes every target and returns one result dict per target, in order"""
+        import asyncio
+
+        return asyncio.run(self.probe_async())
+
+def sample_stats(samples: List[float]) -> Dict[str, Optional[float]]:
+    """Returns count, mean, stdev, median, p95, min and max of latency samples"""
+    import statistics
+
+    if not samples:
+        return {"n": 0, "mean": None, "stdev": None, "median": None, "p95": None, "min": None, "max": None}
+    ordered = sorted(samples)
+    return {"n": len(samples), "mean": round(statistics.fmean(samples), 3),
+            "stdev": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+            "median": round(statistics.median(ordered), 3),
+            "p95": round(ordered[max(0, -(-95 * len(ordered) // 100) - 1)], 3),
+            "min": round(ordered[0], 3), "max": round(ordered[-1], 3)}
+
+class NetworkBenchmark:
+    """Measures latency before and after a change on a fixed probe schedule.
+
+    Each measurement is `rounds` LatencyProbe runs of `count` probes per
+    target, `pause` seconds apart, so short bursts of noise are spread out.
+    compare() reports mean/median/p95/jitter/loss deltas per target and a
+    Welch t statistic; |t| >= 1.96 (about 95% confidence) counts as a real
+    improvement or regression.
+    """
+
+    SIGNIFICANCE = 1.96
+
+    def __init__(self, targets: List[Tuple[str, int]], rounds: int = 3, count: int = 10, timeout: float = 1.0,
+                 interval: float = 0.1, pause: float = 1.0, protocol: str = "tcp"):
+        self.targets = targets
+        self.rounds = rounds
+        self.pause = pause
+        self.probe = LatencyProbe(targets, count=count, timeout=timeout, interval=interval, protocol=protocol)
+
+    def measure(self) -> Dict[str, dict]:
+        """Runs the probe schedule; returns samples, per-round jitter and loss per target"""
+        results = {f"{host}:{port}": {"samples": [], "jitter": [], "sent": 0, "lost": 0}
+                   for host, port in self.targets}
+        for round_index in range(self.rounds):
+            if round_index:
+                time.sleep(self.pause)
+            for result in self.probe.run():
+                target = results[f"{result['host']}:{result['port']}"]
+                target["samples"].extend(result["samples"])
+                target["sent"] += result["sent"]
+                target["lost"] += result["sent"] - len(result["samples"])
+                if result["jitter"] is not None:
+                    target["jitter"].append(result["jitter"])
+        return results
+
+    @classmethod
+    def compare(cls, before: Dict[str, dict], after: Dict[str, dict]) -> Dict[str, dict]:
+        """Compares two measure() results target by target"""
+        comparison = {}
+        for target, old in before.items():
+            new = after.get(target, {"samples": [], "jitter": [], "sent": 0, "lost": 0})
+            old_stats, new_stats = sample_stats(old["samples"]), sample_stats(new["samples"])
+            entry = {
+                "before": old_stats, "after": new_stats,
+                "jitter_before": round(sum(old["jitter"]) / len(old["jitter"]), 3) if old["jitter"] else None,
+                "jitter_after": round(sum(new["jitter"]) / len(new["jitter"]), 3) if new["jitter"] else None,
+                "loss_before": round(100.0 * old["lost"] / old["sent"], 1) if old["sent"] else None,
+                "loss_after": round(100.0 * new["lost"] / new["sent"], 1) if new["sent"] else None,
+                "mean_delta": None, "median_delta": None, "t": None, "verdict": "insufficient data",
+            }
+            if old_stats["n"] > 1 and new_stats["n"] > 1:
+                entry["mean_delta"] = round(new_stats["mean"] - old_stats["mean"], 3)
+                entry["median_delta"] = round(new_stats["median"] - old_stats["median"], 3)
+                error = (old_stats["stdev"] ** 2 / old_stats["n"] + new_stats["stdev"] ** 2 / new_stats["n"]) ** 0.5
+                if error:
+                    entry["t"] = round(entry["mean_delta"] / error, 2)
+                    significant = abs(entry["t"]) >= cls.SIGNIFICANCE
+                else:
+                    significant = entry["mean_delta"] != 0
+                entry["verdict"] = ("no significant change" if not significant
+                                    else "improved" if entry["mean_delta"] < 0 else "worse")
+            comparison[target] = entry
+        return comparison
+
+    def run(self, change) -> dict:
+        """Measures, calls change(), measures again and returns the full report"""
+        started = time.strftime("%Y-%m-%d %H:%M:%S")
+        before = self.measure()
+        change_result = change()
+        after = self.measure()
+        return {"created": started, "rounds": self.rounds, "count": self.probe.count,
+                "protocol": self.probe.protocol, "change": change_result,
+                "before": before, "after": after, "comparison": self.compare(before, after)}
+
+    @staticmethod
+    def save(report: dict, path: str):
+        """Appends a report to the JSON list stored at path"""
+        try:
+            with open(path) as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = []
+        history.append(report)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(history, f, indent=2, default=json_safe)
+        os.replace(temp_path, path)
+
+# Network tweaks applied by the ping optimizer. Tweaks run concurrently
+# within a stage; later stages wait for earlier ones.
+NETWORK_TWEAKS = [
+    {"name": "Setting DNS to faster gaming servers", "kind": "dns", "servers": ["1.1.1.1", "1.0.0.1"]},
+    {"name": "Optimizing TCP/IP settings", "kind": "tcp",
+     "settings": {"autotuninglevel": "normal", "ecncapability": "disabled", "heuristics": "disabled"}},
+    {"name": "Disabling network throttling", "kind": "registry",
+     "path": r"SYSTEM\CurrentControlSet\Services\Psched", "value": "NonBestEffortLimit", "data": 0, "type": "REG_DWORD"},
+    {"name": "Optimizing network adapter", "kind": "adapter",
+     "properties": {"Energy-Efficient Ethernet": "Disabled", "Power Saving Mode": "Disabled",
+                    "Interrupt Moderation": "Disabled"}},
+    {"name": "Optimizing Gameloop network settings", "kind": "registry",
+     "path": r"SOFTWARE\WOW6432Node\Tencent\MobileGamePC", "value": "AdbDisable", "data": 0, "type": "REG_DWORD"},
+    {"name": "Setting QoS for gaming priority", "kind": "qos", "policy": "Gaming Traffic", "dscp": 46,
+     "apps": ["AndroidEmulator.exe", "AndroidEmulatorEn.exe", "AndroidEmulatorEx.exe", "aow_exe.exe"]},
+    {"name": "Flushing DNS cache", "kind": "command", "stage": 1, "commands": [["ipconfig", "/flushdns"]]},
+]
+
+def select_tweaks(selectors: List[str], tweaks: Optional[List[dict]] = None) -> List[dict]:
+    """Picks tweaks by name, kind or single setting (e.g. "autotuninglevel" or "qos").
+
+    A setting selector narrows a multi-setting tweak down to that setting,
+    so its effect can be benchmarked on its own.
+    """
+    tweaks = NETWORK_TWEAKS if tweaks is None else tweaks
+    if not selectors:
+        return list(tweaks)
+    selected = []
+    for tweak in tweaks:
+        wanted = [s.lower() for s in selectors]
+        if tweak["kind"] in wanted or any(s in tweak["name"].lower() for s in wanted):
+            selected.append(tweak)
+            continue
+        for field in ("settings", "properties"):
+            keys = [key for key in tweak.get(field, {}) if key.lower() in wanted]
+            if keys:
+                selected.append({**tweak, field: {key: tweak[field][key] for key in keys},
+                                 "name": f"{tweak['name']} ({', '.join(keys)})"})
+    return selected
+
+REGISTRY_TYPES = ["REG_SZ", "REG_EXPAND_SZ", "REG_BINARY", "REG_DWORD", "REG_MULTI_SZ", "REG_QWORD"]
+
+def ps_quote(text: str) -> str:
+    """Quotes a string for a PowerShell command line"""
+    return "'" + str(text).replace("'", "''") + "'"
+
+class CommandExecutor:
+    """Runs the commands and registry edits of NetworkTweakRunner.
+
+    Every system change goes through this class, so a subclass can replace
+    the backend (for example to record actions instead of running them).
+    """
+
+    def __init__(self, timeout: float = 60.0):
+        self.timeout = timeout
+
+    def run(self, cmd: List[str]) -> Tuple[int, str]:
+        """Runs a command and returns (exit code, combined output)"""
+        try:
+            completed = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                       timeout=self.timeout, check=False)
+            return completed.returncode, completed.stdout.strip()
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return -1, str(e)
+
+    def powershell(self, script: str) -> Tuple[int, str]:
+        # Stop turns cmdlet errors into a non-zero exit code
+        return self.run(["powershell", "-NoProfile", "-NonInteractive", "-Command",
+                         "$ErrorActionPreference = 'Stop'; " + script])
+
+    def read_registry(self, path: str, name: str) -> Optional[Tuple[object, str]]:
+        """Returns (data, type name) of a HKLM value, or None if it does not exist"""
+        import winreg
+
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path) as key:
+                data, reg_type = winreg.QueryValueEx(key, name)
+        except FileNotFoundError:
+            return None
+        return data, next((t for t in REGISTRY_TYPES if getattr(winreg, t) == reg_type), str(reg_type))
+
+    def write_registry(self, path: str, name: str, data, type_name: str):
+        import winreg
+
+        with winreg.CreateKeyEx(winreg.HKEY_LOCAL_MACHINE, path, 0, winreg.KEY_WRITE) as key:
+            winreg.SetValueEx(key, name, 0, getattr(winreg, type_name), data)
+
+    def delete_registry(self, path: str, name: str):
+        """Deletes a HKLM value; a value that does not exist counts as deleted"""
+        import winreg
+
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path, 0, winreg.KEY_WRITE) as key:
+                winreg.DeleteValue(key, name)
+        except FileNotFoundError:
+            # Undoing a write that failed before it created the value
+            pass
+
+class NetworkTweakRunner:
+    """Applies network tweaks as one transaction with a rollback journal.
+
+    Each tweak is first snapshotted (read-only) and planned as a list of
+    (apply, rollback) action pairs; tweaks already in the desired state plan
+    nothing. The journal is written before anything changes. Tweaks then run
+    concurrently stage by stage, every action's exit status is checked, and
+    if any fails every action performed so far is rolled back. rollback()
+    restores the snapshot of a previous successful run from the journal.
+    """
+
+    def __init__(self, tweaks: Optional[List[dict]] = None, executor: Optional[CommandExecutor] = None,
+                 journal_path: str = os.path.join("assets", "network_journal.json"), max_workers: int = 4):
+        self.tweaks = NETWORK_TWEAKS if tweaks is None else tweaks
+        self.executor = executor or CommandExecutor()
+        self.journal_path = journal_path
+        self.max_workers = max_workers
+
+    def _map(self, func, items: list) -> list:
+        import concurrent.futures
+
+        if not items:
+            return []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(items)))) as pool:
+            return list(pool.map(func, items))
+
+    def _query(self, script: str) -> List[str]:
+        code, output = self.executor.powershell(script)
+        if code != 0:
+            raise RuntimeError(output or f"exit code {code}")
+        return [line.strip() for line in output.splitlines() if line.strip()]
+
+    def snapshot(self, tweak: dict):
+        """Reads the current state a tweak would change (JSON-serializable)"""
+        kind = tweak["kind"]
+        if kind == "dns":
+            # ServerAddresses also lists servers handed out by DHCP; only a NameServer
+            # value in the interface's registry key means they were set statically
+            lines = self._query("Get-NetAdapter | Where-Object Status -eq 'Up' | ForEach-Object { "
+                                "$servers = (Get-DnsClientServerAddress -InterfaceIndex $_.ifIndex -AddressFamily IPv4)"
+                                ".ServerAddresses -join ','; "
+                                "$static = (Get-ItemProperty ('HKLM:\\SYSTEM\\CurrentControlSet\\Services\\Tcpip\\"
+                                "Parameters\\Interfaces\\' + $_.InterfaceGuid) -ErrorAction SilentlyContinue).NameServer; "
+                                "$_.Name + '=' + $servers + '=' + [int][bool]$static }")
+            snapshot = {}
+            for line in lines:
+                alias, _, rest = line.partition("=")
+                servers, _, static = rest.rpartition("=")
+                snapshot[alias] = {"servers": [a for a in servers.split(",") if a], "static": static == "1"}
+            return snapshot
+        if kind == "tcp":
+            lines = self._query("$s = Get-NetTCPSetting -SettingName Internet; "
+                                "'autotuninglevel=' + $s.AutoTuningLevelLocal; 'ecncapability=' + $s.EcnCapability; "
+                                "'heuristics=' + $s.ScalingHeuristics")
+            return {key: value.lower() for key, _, value in (line.partition("=") for line in lines)}
+        if kind == "registry":
+            current = self.executor.read_registry(tweak["path"], tweak["value"])
+            return {"exists": False} if current is None else {"exists": True, "data": current[0], "type": current[1]}
+        if kind == "adapter":
+            names = ",".join(ps_quote(name) for name in tweak["properties"])
+            lines = self._query(f"Get-NetAdapterAdvancedProperty -Name '*' -DisplayName {names} "
+                                "-ErrorAction SilentlyContinue | "
+                                "ForEach-Object { $_.Name + \"`t\" + $_.DisplayName + \"`t\" + $_.DisplayValue }")
+            return [line.split("\t") for line in lines if line.count("\t") == 2]
+        if kind == "qos":
+            return self._query("Get-NetQosPolicy -ErrorAction SilentlyContinue | ForEach-Object { $_.Name }")
+        return None
+
+    def plan(self, tweak: dict, snapshot) -> List[dict]:
+        """Returns the {"apply", "rollback"} action pairs that move the snapshot to the tweak's target"""
+        kind = tweak["kind"]
+        actions = []
+        if kind == "dns":
+            servers = tweak["servers"]
+            for alias, old in snapshot.items():
+                if old["static"] and old["servers"] == servers:
+                    continue
+                # DHCP-assigned servers are restored by going back to DHCP, not pinned as static ones
+                restore = (f"-ServerAddresses {','.join(ps_quote(a) for a in old['servers'])}"
+                           if old["static"] and old["servers"] else "-ResetServerAddresses")
+                actions.append({
+                    "apply": ["powershell", f"Set-DnsClientServerAddress -InterfaceAlias {ps_quote(alias)} "
+                                            f"-ServerAddresses {','.join(ps_quote(a) for a in servers)}"],
+                    "rollback": ["powershell", f"Set-DnsClientServerAddress -InterfaceAlias {ps_quote(alias)} {restore}"]})
+        elif kind == "tcp":
+            def netsh(key, value):
+                if key == "heuristics":
+                    return ["run", ["netsh", "int", "tcp", "set", "heuristics", value]]
+                return ["run", ["netsh", "int", "tcp", "set", "global", f"{key}={value}"]]
+
+            for key, value in tweak["settings"].items():
+                old = snapshot.get(key)
+                if old != value:
+                    actions.append({"apply": netsh(key, value), "rollback": netsh(key, old) if old else None})
+        elif kind == "registry":
+            if not (snapshot["exists"] and snapshot["data"] == tweak["data"] and snapshot["type"] == tweak["type"]):
+                actions.append({
+                    "apply": ["reg_set", tweak["path"], tweak["value"], tweak["data"], tweak["type"]],
+                    "rollback": (["reg_set", tweak["path"], tweak["value"], snapshot["data"], snapshot["type"]]
+                                 if snapshot["exists"] else ["reg_delete", tweak["path"], tweak["value"]])})
+        elif kind == "adapter":
+            for adapter, display_name, old in snapshot:
+                value = tweak["properties"].get(display_name)
+                if value is None or old == value:
+                    continue
+                command = (f"Set-NetAdapterAdvancedProperty -Name {ps_quote(adapter)} "
+                           f"-DisplayName {ps_quote(display_name)} -DisplayValue ")
+                actions.append({"apply": ["powershell", command + ps_quote(value)],
+                                "rollback": ["powershell", command + ps_quote(old)]})
+        elif kind == "qos":
+            # A policy matches a single application path, so create one per emulator process
+            for app in tweak["apps"]:
+                name = f"{tweak['policy']} {app}"
+                if name in snapshot:
+                    continue
+                actions.append({
+                    "apply": ["powershell", f"New-NetQosPolicy -Name {ps_quote(name)} -AppPathNameMatchCondition "
+                                            f"{ps_quote(app)} -IPProtocolMatchCondition Both "
+                                            f"-DSCPAction {tweak['dscp']} -NetworkProfile All"],
+                    # Also undoes a failed New-NetQosPolicy, so tolerate a policy that was never created
+                    "rollback": ["powershell", f"Get-NetQosPolicy -Name {ps_quote(name)} -ErrorAction SilentlyContinue | "
+                                               "Remove-NetQosPolicy -Confirm:$false"]})
+        elif kind == "command":
+            actions = [{"apply": ["run", cmd], "rollback": None} for cmd in tweak["commands"]]
+        else:
+            raise ValueError(f"Unknown tweak kind: {kind}")
+        return actions
+
+    def perform(self, action: list) -> Tuple[bool, str]:
+        """Carries out one journal action and returns (succeeded, output)"""
+        try:
+            if action[0] == "run":
+                code, output = self.executor.run(action[1])
+            elif action[0] == "powershell":
+                code, output = self.executor.powershell(action[1])
+            elif action[0] == "reg_set":
+                self.executor.write_registry(*action[1:])
+                code, output = 0, ""
+            elif action[0] == "reg_delete":
+                self.executor.delete_registry(*action[1:])
+                code, output = 0, ""
+            else:
+                return False, f"Unknown action: {action[0]}"
+        except Exception as e:
+            # A failed action must not escape, or the actions before it would never be rolled back
+            return False, str(e)
+        return code == 0, output if code == 0 else (output or f"exit code {code}")
+
+    def _plan_step(self, tweak: dict) -> dict:
+        step = {"name": tweak["name"], "kind": tweak["kind"], "stage": tweak.get("stage", 0),
+                "snapshot": None, "actions": [], "done": 0, "status": "pending", "output": ""}
+        try:
+            step["snapshot"] = self.snapshot(tweak)
+            step["actions"] = self.plan(tweak, step["snapshot"])
+            if not step["actions"]:
+                step["status"] = "unchanged"
+        except Exception as e:
+            # Without a snapshot the tweak could not be undone, so it is not applied
+            step.update(status="skipped", output=f"snapshot failed: {e}")
+        return step
+
+    def _apply_step(self, step: dict) -> dict:
+        for action in step["actions"]:
+            ok, output = self.perform(action["apply"])
+            step["done"] += 1
+            step["output"] = output
+            if not ok:
+                step["status"] = "failed"
+                return step
+        step["status"] = "applied"
+        return step
+
+    def _rollback_step(self, step: dict) -> dict:
+        errors = []
+        # Undo in reverse, including a failed action that may have half-applied
+        for action in reversed(step["actions"][:step["done"]]):
+            if action["rollback"]:
+                ok, output = self.perform(action["rollback"])
+                if not ok:
+                    errors.append(output)
+        step["status"] = "rollback_failed" if errors else "rolled_back"
+        if errors:
+            step["output"] = "; ".join(errors)
+        return step
+
+    def save_journal(self, journal: dict):
+        directory = os.path.dirname(self.journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.journal_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(journal, f, indent=2, default=json_safe)
+        os.replace(temp_path, self.journal_path)
+
+    def load_journal(self) -> Optional[dict]:
+        try:
+            with open(self.journal_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _run_stages(self, steps: List[dict], func, statuses: Tuple[str, ...], reverse: bool = False,
+                    stop_on_failure: bool = False):
+        # reverse=True walks stages and the steps within them last to first, mirroring the apply order
+        ordered = list(reversed(steps)) if reverse else steps
+        for stage in sorted({step["stage"] for step in steps}, reverse=reverse):
+            self._map(func, [step for step in ordered if step["stage"] == stage and step["status"] in statuses])
+            if stop_on_failure and any(step["status"] == "failed" for step in steps):
+                break
+
+    def apply(self, dry_run: bool = False) -> dict:
+        """Snapshots, journals and applies every tweak; returns the journal
+
+        If an earlier run is still applied, its steps are kept in the new
+        journal ("inherited", newest first) so rollback() still gets back to
+        the settings from before the first run.
+        """
+        started = time.perf_counter()
+        journal = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "state": "planned",
+                   "steps": self._map(self._plan_step, self.tweaks)}
+        if dry_run:
+            return journal
+
+        previous = self.load_journal()
+        if previous and previous.get("state") == "applied":
+            journal["inherited"] = [previous["steps"]] + previous.get("inherited", [])
+        self.save_journal(journal)
+        # Later stages are not started once a stage fails; it is all rolled back anyway
+        self._run_stages(journal["steps"], self._apply_step, ("pending",), stop_on_failure=True)
+        if any(step["status"] == "failed" for step in journal["steps"]):
+            self._run_stages(journal["steps"], self._rollback_step, ("applied", "failed"), reverse=True)
+            failed = any(step["status"] == "rollback_failed" for step in journal["steps"])
+            journal["state"] = "rollback_failed" if failed else "rolled_back"
+            for step in journal["steps"]:
+                if step["status"] == "pending":
+                    step["status"] = "not_run"
+        else:
+            journal["state"] = "applied"
+        journal["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if journal["state"] == "rolled_back" and journal.get("inherited"):
+            # This run left nothing behind, so the earlier run's journal is still the one to undo
+            self.save_journal(previous)
+        else:
+            self.save_journal(journal)
+        return journal
+
+    def rollback(self) -> Optional[dict]:
+        """Restores the state recorded before the first applied run; None if there is nothing to undo"""
+        journal = self.load_journal()
+        if not journal or journal.get("state") != "applied":
+            return None
+        # Newest run first, so older snapshots are restored last
+        for steps in [journal["steps"]] + journal.get("inherited", []):
+            self._run_stages(steps, self._rollback_step, ("applied",), reverse=True)
+        failed = any(step["status"] == "rollback_failed"
+                     for steps in [journal["steps"]] + journal.get("inherited", []) for step in steps)
+        journal["state"] = "rollback_failed" if failed else "rolled_back"
+        self.save_journal(journal)
+        return journal
+
+# Serializes updates of the shared package cache when several devices run at once
+PACKAGE_CACHE_LOCK = threading.Lock()
+
+class TeeReader:
+    """File-like reader that copies everything read from source into sink and counts it"""
+
+    def __init__(self, source, sink):
+        self.source = source
+        self.sink = sink
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        if data:
+            self.sink.write(data)
+            self.count += len(data)
+        return data
+
+def safe_tar_member(member) -> bool:
+    """Accepts only regular files and directories that stay inside the extraction directory"""
+    parts = member.name.replace("\\", "/").split("/")
+    return (member.isfile() or member.isdir()) and not member.name.startswith("/") and ".." not in parts
+
+# Serializes updates of the snapshot index when several devices run at once
+SNAPSHOT_LOCK = threading.Lock()
+
+class SnapshotStore:
+    """Content-addressed history of pulled and pushed device files.
+
+    File contents are stored once per SHA-256 digest as zlib-compressed
+    objects under objects/<2 hex>/<digest>; index.json lists the snapshots
+    (device, package, file name, time, digest, sizes). Saving content that is
+    already stored only adds a small index entry, and not even that when it
+    matches the latest snapshot of the same file.
+    """
+
+    def __init__(self, root: str = os.path.join("assets", "snapshots")):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def load_index(self) -> List[dict]:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save_index(self, entries: List[dict]):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(entries, f, indent=1)
+        os.replace(temp_path, self.index_path)
+
+    def put(self, content: bytes, device: str, package: str, name: str, label: str = "") -> dict:
+        """Stores content as a snapshot of a device file and returns its index entry"""
+        import zlib
+
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temp_path = f"{object_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(zlib.compress(content, 6))
+            os.replace(temp_path, object_path)
+
+        with SNAPSHOT_LOCK:
+            entries = self.load_index()
+            latest = next((e for e in reversed(entries)
+                           if (e["device"], e["package"], e["name"]) == (device, package, name)), None)
+            if latest is not None and latest["digest"] == digest:
+                return latest
+            entry = {"digest": digest, "device": device, "package": package, "name": name,
+                     "time": round(time.time(), 3), "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                     "size": len(content), "stored_size": os.path.getsize(object_path), "label": label}
+            entries.append(entry)
+            self._save_index(entries)
+        return entry
+
+    def get(self, digest: str) -> bytes:
+        """Returns the content of a stored object, verifying its digest"""
+        import zlib
+
+        with open(self._object_path(digest), "rb") as f:
+            content = zlib.decompress(f.read())
+        if hashlib.sha256(content).hexdigest() != digest:
+            raise ValueError(f"Snapshot {digest[:12]} is corrupted")
+        return content
+
+    def history(self, device: Optional[str] = None, package: Optional[str] = None,
+                name: Optional[str] = None) -> List[dict]:
+        """Returns matching snapshots, newest first"""
+        return [e for e in reversed(self.load_index())
+                if (device is None or e["device"] == device)
+                and (package is None or e["package"] == package)
+                and (name is None or e["name"] == name)]
+
+    def find(self, ref: str, device: Optional[str] = None, package: Optional[str] = None) -> dict:
+        """Resolves a digest prefix (or a 1-based position in history()) to one snapshot"""
+        entries = self.history(device, package)
+        if ref.isdigit() and len(ref) < 4:
+            if not 1 <= int(ref) <= len(entries):
+                raise KeyError(f"No snapshot #{ref}")
+            return entries[int(ref) - 1]
+        matches = {e["digest"]: e for e in entries if e["digest"].startswith(ref.lower())}
+        if len(matches) != 1:
+            raise KeyError(f"{'Ambiguous' if matches else 'Unknown'} snapshot reference: {ref}")
+        return next(iter(matches.values()))
+
+# Active.sav values kept in place by the drift watcher when nothing was changed in the session
+DRIFT_DEFAULT_PROPERTIES = ["FPSLevel", "BattleFPS", "LobbyFPS", "ArtQuality", "LobbyRenderQuality",
+                            "BattleRenderQuality", "BattleRenderStyle"]
+
+class DriftWatcher:
+    """Re-applies desired Active.sav values when the game rewrites the file.
+
+    Each poll is one STAT over the session's open sync channel; the file is
+    only pulled when its size or mtime moved, and only pushed when one of
+    the desired properties actually differs. Only drifted properties are
+    patched, everything else the game wrote is kept. With stop_game=False
+    (the default) the game keeps running and picks the values up on its
+    next load of the file.
+    """
+
+    def __init__(self, cli: "PUBGGraphicsCLI", desired: Dict[str, object], interval: float = 5.0,
+                 stop_game: bool = False):
+        self.cli = cli
+        self.desired = dict(desired)
+        self.interval = interval
+        self.stop_game = stop_game
+        self.known_stat = None
+        self.known_md5 = None
+        self.stats = {"polls": 0, "pulls": 0, "pushes": 0, "poll_ms": 0.0}
+
+    def drifted(self, gvas: GvasFile) -> Dict[str, object]:
+        """Returns {name: device value} for desired properties that differ"""
+        drift = {}
+        for name, value in self.desired.items():
+            prop = gvas.property(name)
+            if prop is not None and gvas.raw(name) != gvas.encode_value(prop, value):
+                drift[name] = gvas.value_of(prop)
+        return drift
+
+    def check(self) -> Optional[dict]:
+        """Polls once; returns an event dict when the file drifted and was fixed"""
+        started = time.perf_counter()
+        session = self.cli.session
+        path = self.cli.active_sav_path()
+        self.stats["polls"] += 1
+        try:
+            mode, size, mtime = session.stat(path)
+            if not mode or (size, mtime) == self.known_stat:
+                return None
+
+            content = session.pull(path)
+            self.stats["pulls"] += 1
+            digest = hashlib.md5(content).hexdigest()
+            self.known_stat = (size, mtime)
+            if digest == self.known_md5:
+                return None
+
+            gvas = GvasFile(content)
+            drift = self.drifted(gvas)
+            if not drift:
+                self.known_md5 = digest
+                return None
+
+            self.cli.active_sav_content = content
+            plan = self.cli.active_sav.patch()
+            for name in drift:
+                plan.set(name, self.desired[name])
+            self.cli.apply_patch(plan)
+            self.cli.sav_targets.update(self.desired)
+            if self.stop_game:
+                self.cli.stop_app()
+            self.cli.upload_active_sav()
+            self.stats["pushes"] += 1
+            # Our own push moves size/mtime; remember it so it does not count as drift
+            self.known_stat = tuple(session.stat(path)[1:])
+            self.known_md5 = self.cli.synced_sav_md5
+            return {"time": time.strftime("%H:%M:%S"),
+                    "drifted": {name: [json_safe(old), json_safe(self.desired[name])] for name, old in drift.items()}}
+        finally:
+            self.stats["poll_ms"] += (time.perf_counter() - started) * 1000
+
+    def run(self, stop_event: Optional[threading.Event] = None, max_polls: Optional[int] = None,
+            on_event=None) -> dict:
+        """Polls until stop_event is set (or max_polls is reached); returns the counters"""
+        stop_event = stop_event or threading.Event()
+        events = []
+        while not stop_event.is_set():
+            try:
+                event = self.check()
+            except (AdbError, OSError, GvasError) as e:
+                # The game may be mid-write or the device briefly gone; retry next poll
+                logger.error(f"Drift check failed: {str(e)}", exc_info=True)
+                event = {"time": time.strftime("%H:%M:%S"), "error": str(e)}
+            if event:
+                events.append(event)
+                if on_event:
+                    on_event(event)
+            if max_polls is not None and self.stats["polls"] >= max_polls:
+                break
+            stop_event.wait(self.interval)
+        polls = self.stats["polls"] or 1
+        return {**self.stats, "poll_ms": round(self.stats["poll_ms"], 1),
+                "avg_poll_ms": round(self.stats["poll_ms"] / polls, 2), "events": events}
 
 class PUBGGraphicsCLI:
     def __init__(self):
@@ -112,93 +2379,202 @@ class PUBGGraphicsCLI:
             "com.pubg.imobile": "Battlegrounds Mobile India"
         }
         self.adb = None
+        self.adb_host = "127.0.0.1"
+        # Same override the adb client itself honours
+        self.adb_port = int(os.environ.get("ANDROID_ADB_SERVER_PORT") or 5037)
+        self.emulator_serials = ["emulator-5554", "127.0.0.1:5555"]
+        # Off when several devices share the server; a restart would cut their transfers
+        self.allow_server_restart = True
+        self.serial = "emulator-5554"
+        self.session = None
+        self.tracer = NULL_TRACER
+        self.connect_timings = {}
+        self.startup_timings = {}
         self.pubg_package = None
-        self.active_sav_content = None
+        self.active_sav = None
+        self.sav_changes = []
+        self.sav_targets = {}
+        self.synced_sav_md5 = None
+        # Bytes last pulled from or pushed to the device, used to undo a failed commit
+        self.synced_sav_content = None
+        self.user_custom_ini = None
+        self.user_cvars = None
+        self.last_push_skipped = False
+        self.last_commit = {}
+        self.stop_delay = 0.2
         self.PUBG_Found = []
+        self.assets_dir = "assets"
+        self.package_cache_path = os.path.join("assets", "package_cache.json")
+        self.snapshots = SnapshotStore()
         self.is_adb_working = False
 
+    @property
+    def active_sav_content(self) -> Optional[bytes]:
+        """Serialized Active.sav content"""
+        return self.active_sav.to_bytes() if self.active_sav is not None else None
+
+    @active_sav_content.setter
+    def active_sav_content(self, content: Optional[bytes]):
+        self.active_sav = GvasFile(content) if content is not None else None
+        self.sav_changes = []
+        self.sav_targets = {}
+
+    @traced("patch")
+    def apply_patch(self, plan: GvasPatch) -> GvasPatch:
+        """Applies a patch to Active.sav, recording its changes and target values."""
+        self.sav_changes.extend(plan.apply())
+        self.sav_targets.update(plan.written)
+        return plan
+
+    def undo_sav_changes(self):
+        """Reverts every Active.sav edit made since the file was loaded."""
+        self.active_sav.apply_changes(self.sav_changes, undo=True)
+        self.sav_changes = []
+        self.sav_targets = {}
+
     def kill_adb(self):
         """Kills the ADB (Android Debug Bridge) process if it is currently running."""
+        self.tracer.add("subprocesses")
         try:
             subprocess.run(["taskkill", "/F", "/IM", "adb.exe"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             return True
         except subprocess.CalledProcessError:
             return False
 
+    def find_adb_path(self):
+        """Locate Gameloop's adb.exe, falling back to adb on PATH"""
+        import shutil
+
+        # Set the exact path to Gameloop's ADB
+        adb_path = r"C:\Program Files\TxGameAssistant\ui\adb\adb.exe"  # Update this with the correct path
+
+        # If the direct path doesn't exist, try to find it
+        if not os.path.exists(adb_path):
+            possible_paths = [
+                r"C:\Program Files\TxGameAssistant\adb\adb.exe",
+                r"C:\Program Files\TxGameAssistant\ui\adb.exe",
+                r"C:\Program Files\TxGameAssistant\App\adb\adb.exe",
+                r"C:\Program Files\TxGameAssistant\AppMarket\adb\adb.exe",
+                # Add fallback to regular ADB if installed
+                shutil.which("adb") or "adb"
+            ]
+
+            for path in possible_paths:
+                if os.path.exists(path):
+                    adb_path = path
+                    print(f"Found ADB at: {adb_path}")
+                    break
+
+        return adb_path
+
+    def probe_adb_server(self) -> bool:
+        """Returns True if an adb server is already answering on its port"""
+        try:
+            AdbSession(self.serial, self.adb_host, self.adb_port, timeout=1.0, tracer=self.tracer).host_command("host:version")
+            return True
+        except AdbError:
+            return False
+
+    def server_version_mismatch(self) -> bool:
+        """Returns True if the running adb server is from a different adb release than self.adb_path"""
+        try:
+            server = int(AdbSession(self.serial, self.adb_host, self.adb_port, timeout=1.0,
+                                    tracer=self.tracer).host_command("host:version"), 16)
+            self.tracer.add("subprocesses")
+            output = subprocess.run([self.adb_path, "version"], check=False, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True, timeout=10).stdout
+        except (AdbError, ValueError, OSError, subprocess.TimeoutExpired):
+            return False
+        # "Android Debug Bridge version 1.0.41"; the server reports the last part in hex
+        match = re.search(r"version \d+\.\d+\.(\d+)", output)
+        return bool(match) and int(match.group(1)) != server
+
+    def list_devices(self) -> Dict[str, str]:
+        """Returns {serial: state} as reported by the adb server"""
+        output = AdbSession(self.serial, self.adb_host, self.adb_port, tracer=self.tracer).host_command("host:devices")
+        devices = {}
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                devices[parts[0]] = parts[1]
+        return devices
+
+    def find_emulator(self) -> Optional[str]:
+        """Returns the serial of the first known emulator that is online"""
+        try:
+            devices = self.list_devices()
+        except AdbError:
+            return None
+        for serial in self.emulator_serials:
+            if devices.get(serial) == "device":
+                return serial
+        return None
+
+    @traced("connect")
     def check_adb_connection(self):
-        """Check if ADB is connected to the emulator"""
+        """Check if ADB is connected to the emulator.
+
+        Reuses a healthy adb server and device when one is already running and
+        only falls back to starting (and, as a last resort, restarting) the
+        server, polling for readiness instead of sleeping for a fixed time.
+        Time spent in each phase is stored in self.connect_timings.
+        """
+        self.connect_timings = {}
+        started = time.perf_counter()
+
+        def mark(phase, since):
+            now = time.perf_counter()
+            self.connect_timings[phase] = round((now - since) * 1000, 1)
+            return now
+
+        def connected(serial):
+            self.serial = serial
+            self.session = AdbSession(self.serial, self.adb_host, self.adb_port, tracer=self.tracer)
+            self.is_adb_working = True
+            self.connect_timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+            phases = ", ".join(f"{k}: {v:.0f}ms" for k, v in self.connect_timings.items())
+            print(f"Successfully connected to ADB ({serial}) [{phases}]")
+            return True
+
         try:
-            # Set the exact path to Gameloop's ADB
-            adb_path = r"C:\Program Files\TxGameAssistant\ui\adb\adb.exe"  # Update this with the correct path
-
-            # If the direct path doesn't exist, try to find it
-            if not os.path.exists(adb_path):
-                possible_paths = [
-                    r"C:\Program Files\TxGameAssistant\adb\adb.exe",
-                    r"C:\Program Files\TxGameAssistant\ui\adb.exe",
-                    r"C:\Program Files\TxGameAssistant\App\adb\adb.exe",
-                    r"C:\Program Files\TxGameAssistant\AppMarket\adb\adb.exe",
-                    # Add fallback to regular ADB if installed
-                    "adb"
-                ]
-
-                for path in possible_paths:
-                    if os.path.exists(path):
-                        adb_path = path
-                        print(f"Found ADB at: {adb_path}")
-                        break
-
-            self.adb_path = adb_path
-
-            # Kill existing ADB server first to avoid conflicts
-            try:
-                print("Killing existing ADB server...")
-                subprocess.run([self.adb_path, "kill-server"],
-                                 check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                time.sleep(1)
-            except Exception as e:
-                print(f"Warning: Could not kill ADB server: {str(e)}")
+            self.adb_path = self.find_adb_path()
 
-            # Start ADB server
-            try:
+            # Fast path: reuse the running server and an already attached emulator
+            t = time.perf_counter()
+            server_up = self.probe_adb_server()
+            t = mark("probe", t)
+            if server_up:
+                serial = self.find_emulator()
+                t = mark("devices", t)
+                if serial:
+                    return connected(serial)
+
+            # Start the server only if nothing is listening yet
+            if not server_up and self.allow_server_restart:
                 print("Starting ADB server...")
-                subprocess.run([self.adb_path, "start-server"],
-                                 check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                time.sleep(1)
-            except Exception as e:
-                print(f"Warning: Could not start ADB server: {str(e)}")
+                if self.run_adb("start-server"):
+                    server_up = wait_until(self.probe_adb_server, timeout=5.0)
+                t = mark("start_server", t)
 
-            # Try to connect to the emulator
-            print("Connecting to emulator...")
-            try:
-                connect_cmd = [self.adb_path, "connect", "127.0.0.1:5555"]
-                print(f"Running: {' '.join(connect_cmd)}")
-                connect_result = subprocess.run(connect_cmd,
-                                                 check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                print(f"Connect result: {connect_result.stdout.decode('utf-8').strip()}")
-                print(f"Connect error: {connect_result.stderr.decode('utf-8').strip()}")
-            except Exception as e:
-                print(f"Error connecting to emulator: {str(e)}")
+            if server_up:
+                serial = self.connect_emulator()
+                t = mark("connect", t)
+                if serial:
+                    return connected(serial)
 
-            # Check if a device is available
-            print("Checking connected devices...")
-            try:
-                devices_cmd = [self.adb_path, "devices"]
-                print(f"Running: {' '.join(devices_cmd)}")
-                devices = subprocess.run(devices_cmd,
-                                             check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-                devices_output = devices.stdout.decode('utf-8')
-                devices_error = devices.stderr.decode('utf-8')
-                print(f"Devices output: {devices_output.strip()}")
-                print(f"Devices error: {devices_error.strip()}")
-
-                if "emulator-5554" in devices_output or "127.0.0.1:5555" in devices_output:
-                    self.is_adb_working = True
-                    print("Successfully connected to ADB")
-                    return True
-            except Exception as e:
-                print(f"Error checking devices: {str(e)}")
+            # Last resort: the server is wedged or from another adb version. A healthy
+            # server without the emulator is left alone, other adb clients depend on it.
+            if self.allow_server_restart and (not server_up or self.server_version_mismatch()):
+                print("Restarting ADB server...")
+                if self.run_adb("kill-server"):
+                    wait_until(lambda: not self.probe_adb_server(), timeout=3.0)
+                if self.run_adb("start-server") and wait_until(self.probe_adb_server, timeout=5.0):
+                    serial = self.connect_emulator()
+                    mark("restart", t)
+                    if serial:
+                        return connected(serial)
+                else:
+                    mark("restart", t)
 
             print("\nFailed to connect to ADB. Please ensure:")
             print("1. Gameloop is running")
@@ -210,15 +2586,97 @@ class PUBGGraphicsCLI:
             print(f"Error connecting to ADB: {str(e)}")
             return False
 
+    def connect_emulator(self, timeout: float = 3.0) -> Optional[str]:
+        """Asks the adb server to attach the emulator and waits for it to come online"""
+        serial = self.find_emulator()
+        if serial:
+            return serial
+        # Only network serials (host:port) can be attached; emulator-NNNN ones appear on their own
+        addresses = [candidate for candidate in self.emulator_serials if ":" in candidate]
+        if not addresses:
+            return None
+        print("Connecting to emulator...")
+        for address in addresses:
+            try:
+                result = AdbSession(self.serial, self.adb_host, self.adb_port,
+                                    tracer=self.tracer).host_command(f"host:connect:{address}")
+                print(f"Connect result: {result.strip()}")
+            except AdbError as e:
+                print(f"Error connecting to emulator {address}: {str(e)}")
+
+        def online():
+            nonlocal serial
+            serial = self.find_emulator()
+            return serial is not None
+
+        wait_until(online, timeout=timeout)
+        return serial
+
+    def run_adb(self, *args) -> bool:
+        """Runs the adb executable itself; only used to manage the server process"""
+        self.tracer.add("subprocesses")
+        try:
+            result = subprocess.run([self.adb_path, *args], check=False,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=10)
+            return result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"Warning: Could not run adb {' '.join(args)}: {str(e)}")
+            return False
+
+    def load_package_cache(self) -> Dict[str, dict]:
+        """Loads the per-device installed package cache"""
+        try:
+            with open(self.package_cache_path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def save_package_cache(self, cache: Dict[str, dict]):
+        """Writes the per-device installed package cache"""
+        try:
+            os.makedirs(os.path.dirname(self.package_cache_path), exist_ok=True)
+            with open(self.package_cache_path, 'w') as file:
+                json.dump(cache, file, indent=2)
+        except OSError as e:
+            logger.error(f"Error saving package cache: {str(e)}", exc_info=True)
+
+    def detect_installed_packages(self) -> List[str]:
+        """Returns the known PUBG packages installed on the device.
+
+        Runs a single `pm list packages` and filters it locally. The result is
+        cached per device serial and reused until the device reboots (boot_id
+        changes) or the list of known packages changes.
+        """
+        known = frozenset(self.pubg_versions)
+        known_hash = hashlib.sha1("\n".join(sorted(known)).encode("utf-8")).hexdigest()
+        boot_id = self.session.shell("cat /proc/sys/kernel/random/boot_id").strip()
+
+        with PACKAGE_CACHE_LOCK:
+            cache = self.load_package_cache()
+        entry = cache.get(self.serial)
+        # An empty result is never trusted so a fresh install is picked up right away
+        if entry and entry.get("packages") and entry.get("boot_id") == boot_id and entry.get("known") == known_hash:
+            return entry["packages"]
+
+        output = self.session.shell("pm list packages")
+        installed = sorted(known.intersection(
+            line[len("package:"):].strip() for line in output.splitlines() if line.startswith("package:")
+        ))
+        if boot_id:
+            with PACKAGE_CACHE_LOCK:
+                # Re-read so concurrent detections on other devices are kept
+                cache = self.load_package_cache()
+                cache[self.serial] = {"boot_id": boot_id, "known": known_hash, "packages": installed}
+                self.save_package_cache(cache)
+        return installed
+
+    @traced("detect_packages")
     def pubg_version_found(self):
         """Checks which PUBG versions are installed on the device."""
         try:
-            for package_name, version_name in self.pubg_versions.items():
-                result = subprocess.run([self.adb_path, "-s", "emulator-5554", "shell", f"pm list packages {package_name}"],
-                                        check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-                if result.stdout.strip():
-                    self.PUBG_Found.append(version_name)
+            installed = self.detect_installed_packages()
+            self.PUBG_Found = [version_name for package_name, version_name in self.pubg_versions.items()
+                               if package_name in installed]
 
             if self.PUBG_Found:
                 print("Found PUBG versions:")
@@ -233,32 +2691,34 @@ class PUBGGraphicsCLI:
             print(f"Error finding PUBG versions: {str(e)}")
             return False
 
+    @traced("pull_active_sav")
     def get_graphics_file(self, package: str):
         """Get the Active.sav file from the device"""
         try:
-            active_savegames_path = f"/sdcard/Android/data/{package}/files/UE4Game/ShadowTrackerExtra/ShadowTrackerExtra/Saved/SaveGames/Active.sav"
-            local_file_path = os.path.join("assets", "old.sav")
+            local_file_path = os.path.join(self.assets_dir, "old.sav")
 
             # Ensure assets directory exists
-            os.makedirs("assets", exist_ok=True)
+            os.makedirs(self.assets_dir, exist_ok=True)
 
+            if package != self.pubg_package:
+                self.user_custom_ini = None
             self.pubg_package = package
+            active_savegames_path = self.active_sav_path()
 
             print(f"Attempting to pull file from: {active_savegames_path}")
 
-            # Pull the file using ADB
-            result = subprocess.run([self.adb_path, "-s", "emulator-5554", "pull", active_savegames_path, local_file_path],
-                                     check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-            # Read the file content
-            with open(local_file_path, 'rb') as file:
-                self.active_sav_content = file.read()
+            # Pull the file over the ADB sync channel
+            content = self.session.pull(active_savegames_path, local_file_path)
+            self.active_sav_content = content
+            self.synced_sav_md5 = hashlib.md5(content).hexdigest()
+            self.synced_sav_content = content
+            self.record_snapshot(content, "Active.sav", "pulled")
 
             print(f"Successfully pulled Active.sav file from {package}")
             return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error getting graphics file (ADB pull failed): {e.stderr.decode('utf-8')}", exc_info=True)
-            print(f"Error getting graphics file (ADB pull failed): {e.stderr.decode('utf-8')}")
+        except AdbError as e:
+            logger.error(f"Error getting graphics file (ADB pull failed): {str(e)}", exc_info=True)
+            print(f"Error getting graphics file (ADB pull failed): {str(e)}")
             return False
         except FileNotFoundError as e:
             logger.error(f"Error getting graphics file (local file error): {str(e)}", exc_info=True)
@@ -269,10 +2729,11 @@ class PUBGGraphicsCLI:
             print(f"Error getting graphics file: {str(e)}")
             return False
 
+    @traced("save")
     def save_graphics_file(self):
         """Save the modified Active.sav file"""
         try:
-            file_path = os.path.join("assets", "new.sav")
+            file_path = os.path.join(self.assets_dir, "new.sav")
             with open(file_path, 'wb') as file:
                 file.write(self.active_sav_content)
             print("Graphics file saved successfully")
@@ -301,13 +2762,10 @@ class PUBGGraphicsCLI:
                 print(f"Valid values are: {', '.join(fps_mapping.keys())}")
                 return False
 
-            fps_properties = ["FPSLevel", "BattleFPS", "LobbyFPS"]
-            for prop in fps_properties:
-                header = prop.encode('utf-8') + b'\x00\x0c\x00\x00\x00IntProperty\x00\x04\x00\x00\x00\x00\x00\x00\x00\x00'
-                before, separator, after = self.active_sav_content.partition(header)
-                if separator:  # If the header was found
-                    after = after[:1].replace(after[:1], fps_value) + after[1:]
-                    self.active_sav_content = before + separator + after
+            plan = self.active_sav.patch()
+            for prop in ["FPSLevel", "BattleFPS", "LobbyFPS"]:
+                plan.set(prop, fps_value[0], "IntProperty")
+            self.apply_patch(plan)
 
             print(f"FPS set to {val}")
             return True
@@ -319,9 +2777,10 @@ class PUBGGraphicsCLI:
     def read_hex(self, name):
         """Reads the value of the specified property from the Active.sav file."""
         try:
-            header = name.encode('utf-8') + b'\x00\x0c\x00\x00\x00IntProperty\x00\x04\x00\x00\x00\x00\x00\x00\x00\x00'
-            _, _, content = self.active_sav_content.partition(header)
-            return content[:1] if content else None
+            prop = self.active_sav.property(name)
+            if prop is None or prop.type != "IntProperty":
+                return None
+            return bytes(self.active_sav.data[prop.value_offset:prop.value_offset + 1])
         except Exception as e:
             logger.error(f"Error reading hex: {str(e)}", exc_info=True)
             return None
@@ -329,13 +2788,9 @@ class PUBGGraphicsCLI:
     def change_graphics_file(self, name, val):
         """Updates the Active.sav file with the new graphics setting value."""
         try:
-            header = name.encode('utf-8') + b'\x00\x0c\x00\x00\x00IntProperty\x00\x04\x00\x00\x00\x00\x00\x00\x00\x00'
-            before, separator, after = self.active_sav_content.partition(header)
-            if separator:  # If the header was found
-                after = val + after[1:]
-                self.active_sav_content = before + separator + after
-                return True
-            return False
+            plan = self.active_sav.patch().set(name, val[0], "IntProperty")
+            self.apply_patch(plan)
+            return not plan.missing
         except Exception as e:
             logger.error(f"Error changing graphics file: {str(e)}", exc_info=True)
             return False
@@ -414,57 +2869,327 @@ class PUBGGraphicsCLI:
             print(f"Error setting graphics style: {str(e)}")
             return False
 
-    def set_graphics_quality(self, quality):
-        """Sets the graphics quality for different game modes."""
+    def set_graphics_quality(self, quality):
+        """Sets the graphics quality for different game modes."""
+        try:
+            graphics_setting_dict = {
+                "Smooth": b'\x01',
+                "Balanced": b'\x02',
+                "HD": b'\x03',
+                "HDR": b'\x04',
+                "Ultra HD": b'\x05'
+            }
+            
+            graphics_setting = graphics_setting_dict.get(quality)
+            if graphics_setting is None:
+                print(f"Invalid quality value: {quality}")
+                print(f"Valid values are: {', '.join(graphics_setting_dict.keys())}")
+                return False
+
+            # Set the graphics quality for every mode in one batch
+            plan = self.active_sav.patch()
+            for value in ["ArtQuality", "LobbyRenderQuality", "BattleRenderQuality"]:
+                plan.set(value, graphics_setting[0], "IntProperty")
+            self.apply_patch(plan)
+            success = not plan.missing
+            
+            if success:
+                print(f"Graphics quality set to {quality}")
+            else:
+                print("Some graphics settings could not be changed")
+                
+            return success
+        except Exception as e:
+            logger.error(f"Error setting graphics quality: {str(e)}", exc_info=True)
+            print(f"Error setting graphics quality: {str(e)}")
+            return False
+
+    @traced("remote_md5")
+    def remote_md5(self, remote_path: str) -> Optional[str]:
+        """Returns the md5 of a file on the device, or None if it can't be computed."""
+        try:
+            output = self.session.shell(f"md5sum '{remote_path}'").strip()
+        except AdbError:
+            return None
+        digest = output.split()[0] if output else ""
+        if len(digest) == 32 and all(c in "0123456789abcdef" for c in digest.lower()):
+            return digest.lower()
+        return None
+
+    def active_sav_path(self) -> str:
+        """Device path of Active.sav for the selected package"""
+        return f"/sdcard/Android/data/{self.pubg_package}/files/UE4Game/ShadowTrackerExtra/ShadowTrackerExtra/Saved/SaveGames/Active.sav"
+
+    def active_sav_needs_push(self) -> bool:
+        """Returns False when the device already holds exactly the pending Active.sav bytes."""
+        pending_md5 = hashlib.md5(self.active_sav_content).hexdigest()
+        device_md5 = self.remote_md5(self.active_sav_path())
+
+        if device_md5 is not None and self.synced_sav_md5 and device_md5 != self.synced_sav_md5:
+            print("Note: Active.sav changed on the device since it was pulled; it will be overwritten")
+
+        return pending_md5 != (device_md5 or self.synced_sav_md5)
+
+    @traced("force_stop")
+    def stop_app(self):
+        """Force-stops the game so it does not overwrite pushed settings."""
+        self.session.shell(f"am force-stop {self.pubg_package}")
+        time.sleep(self.stop_delay)
+
+    @traced("push_active_sav")
+    def upload_active_sav(self):
+        """Pushes the in-memory Active.sav to the device."""
+        content = self.active_sav_content
+        self.session.push(content, self.active_sav_path())
+        self.synced_sav_md5 = hashlib.md5(content).hexdigest()
+        self.synced_sav_content = content
+        self.record_snapshot(content, "Active.sav", "pushed")
+
+    def restore_previous_sav(self, content: bytes):
+        """Pushes back the Active.sav the device had before a failed commit."""
+        try:
+            self.session.push(content, self.active_sav_path())
+            self.synced_sav_md5 = hashlib.md5(content).hexdigest()
+            self.synced_sav_content = content
+            print("Restored the previous Active.sav on the device")
+        except (AdbError, OSError) as e:
+            logger.error(f"Error restoring Active.sav: {str(e)}", exc_info=True)
+            print(f"Error restoring Active.sav: {str(e)}")
+
+    @traced("snapshot")
+    def record_snapshot(self, content: bytes, name: str, label: str):
+        """Adds a file to the snapshot history; failures only get logged"""
+        try:
+            self.snapshots.put(content, self.serial, self.pubg_package, name, label)
+        except Exception as e:
+            logger.error(f"Error recording snapshot of {name}: {str(e)}", exc_info=True)
+
+    def restore_snapshot(self, ref: str) -> Optional[dict]:
+        """Pushes a stored Active.sav or UserCustom.ini back to the device with a single push"""
+        try:
+            entry = self.snapshots.find(ref, self.serial, self.pubg_package)
+            content = self.snapshots.get(entry["digest"])
+            if entry["name"] == "Active.sav":
+                self.active_sav_content = content
+                if not self.push_active_shadow_file():
+                    return None
+            else:
+                self.stop_app()
+                self.session.push(content, self.user_custom_ini_path())
+                self.user_custom_ini = IniDocument.from_bytes(content)
+                self.record_snapshot(content, entry["name"], "restored")
+            print(f"Restored {entry['name']} from {entry['created']} ({entry['digest'][:12]})")
+            return entry
+        except Exception as e:
+            logger.error(f"Error restoring snapshot: {str(e)}", exc_info=True)
+            print(f"Error restoring snapshot: {str(e)}")
+            return None
+
+    def saved_dir_path(self) -> str:
+        """Device path of the game's Saved directory (SaveGames, Config, Chat, ...)"""
+        return f"/sdcard/Android/data/{self.pubg_package}/files/UE4Game/ShadowTrackerExtra/ShadowTrackerExtra/Saved"
+
+    @traced("backup_saved")
+    def backup_saved(self, destination: Optional[str] = None, compress: bool = True) -> Optional[dict]:
+        """Backs up the whole Saved directory over one adb exec-out tar stream.
+
+        The archive is written to destination while it is unpacked there
+        member by member, so nothing waits for the full download.
+        """
+        import tarfile
+
+        try:
+            started = time.perf_counter()
+            if destination is None:
+                destination = os.path.join(self.assets_dir, "backups", self.pubg_package,
+                                           time.strftime("%Y%m%d-%H%M%S"))
+            os.makedirs(destination, exist_ok=True)
+            archive_path = os.path.join(destination, "Saved.tar.gz" if compress else "Saved.tar")
+            parent, _, name = self.saved_dir_path().rpartition("/")
+            files = size = 0
+            command = f"tar -c{'z' if compress else ''}f - -C '{parent}' {name} 2>/dev/null"
+            # Python's "data" extraction filter where available (3.12+, 3.11.4+),
+            # on top of the safe_tar_member check that older versions rely on alone
+            extract_options = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+            with self.session.exec_stream(command) as stream, open(archive_path, "wb") as archive:
+                tee = TeeReader(stream, archive)
+                with tarfile.open(fileobj=tee, mode="r|*") as tar:
+                    for member in tar:
+                        if not safe_tar_member(member):
+                            continue
+                        tar.extract(member, destination, set_attrs=False, **extract_options)
+                        if member.isfile():
+                            files += 1
+                            size += member.size
+                # Keep the archive complete (end-of-archive padding, gzip trailer) for restores
+                while tee.read(AdbSession.SYNC_CHUNK):
+                    pass
+            if not files:
+                raise AdbError("No files received; the Saved directory is missing or tar failed on the device")
+
+            result = {"path": destination, "archive": archive_path, "files": files, "bytes": size,
+                      "transferred": tee.count, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+            print(f"Backed up {files} files ({format_size(size)}, {format_size(tee.count)} transferred) "
+                  f"to {destination}")
+            return result
+        except (AdbError, OSError, tarfile.TarError) as e:
+            logger.error(f"Error backing up Saved directory: {str(e)}", exc_info=True)
+            print(f"Error backing up Saved directory: {str(e)}")
+            return None
+
+    @traced("restore_saved")
+    def restore_saved(self, archive_path: str) -> bool:
+        """Restores a backup_saved() archive with one streamed push and an on-device tar extract"""
+        try:
+            compressed = archive_path.endswith(".gz")
+            remote_archive = "/data/local/tmp/pubg_saved_restore.tar" + (".gz" if compressed else "")
+            parent = self.saved_dir_path().rpartition("/")[0]
+
+            self.stop_app()
+            self.session.push(archive_path, remote_archive)
+            output = self.session.shell(f"tar -x{'z' if compressed else ''}f {remote_archive} -C '{parent}'; "
+                                        f"echo EXIT:$?; rm -f {remote_archive}")
+            if "EXIT:0" not in output:
+                raise AdbError(f"tar extract failed on the device: {output.strip()}")
+
+            # The session copies are stale now
+            self.user_custom_ini = None
+            self.user_cvars = None
+            if not self.get_graphics_file(self.pubg_package):
+                return False
+            print(f"Restored Saved directory from {archive_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Error restoring Saved directory: {str(e)}", exc_info=True)
+            print(f"Error restoring Saved directory: {str(e)}")
+            return False
+
+    def benchmark_backup(self) -> Optional[dict]:
+        """Times a per-file pull of the Saved directory against one streamed tar backup"""
+        import tempfile
+
+        try:
+            saved = self.saved_dir_path()
+            paths = [line.strip() for line in self.session.shell(f"find '{saved}' -type f").splitlines()
+                     if line.strip().startswith(saved)]
+            started = time.perf_counter()
+            pulled = sum(len(self.session.pull(path)) for path in paths)
+            per_file_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            with tempfile.TemporaryDirectory() as destination:
+                streamed = self.backup_saved(destination)
+            if streamed is None:
+                return None
+            return {"files": len(paths), "bytes": pulled, "per_file_ms": per_file_ms,
+                    "stream_ms": streamed["elapsed_ms"], "stream_files": streamed["files"],
+                    "stream_transferred": streamed["transferred"]}
+        except Exception as e:
+            logger.error(f"Error benchmarking backup: {str(e)}", exc_info=True)
+            print(f"Error benchmarking backup: {str(e)}")
+            return None
+
+    def backup_menu(self):
+        """Back up or restore the game's whole Saved directory"""
+        backups_dir = os.path.join(self.assets_dir, "backups", self.pubg_package)
+        print("\n\033[1;33mSaved Data Backup:\033[0m")
+        print("\033[1;32m1.\033[0m Back up now")
+        print("\033[1;32m2.\033[0m Restore a backup")
+        selection = input("\n\033[1;36mSelect option (1-2): \033[0m").strip()
+        if selection == '1':
+            return self.backup_saved() is not None
+        if selection != '2':
+            print("\033[1;31mInvalid selection.\033[0m")
+            return False
+
+        # backup --plain writes Saved.tar instead of Saved.tar.gz
+        backups = []
+        for name in sorted(os.listdir(backups_dir) if os.path.isdir(backups_dir) else [], reverse=True):
+            for archive in ("Saved.tar.gz", "Saved.tar"):
+                if os.path.exists(os.path.join(backups_dir, name, archive)):
+                    backups.append((name, archive))
+                    break
+        if not backups:
+            print("\033[1;33mNo backups found.\033[0m")
+            return False
+        for i, (name, archive) in enumerate(backups[:15], 1):
+            print(f"\033[1;32m{i}.\033[0m {name} ({archive})")
+        choice = input(f"\n\033[1;36mRestore backup (1-{min(len(backups), 15)}): \033[0m").strip()
+        if not choice.isdigit() or not 1 <= int(choice) <= min(len(backups), 15):
+            print("\033[1;31mInvalid selection.\033[0m")
+            return False
+        name, archive = backups[int(choice) - 1]
+        return self.restore_saved(os.path.join(backups_dir, name, archive))
+
+    def watch_settings(self, interval: float = 5.0, stop_game: bool = False,
+                       stop_event: Optional[threading.Event] = None, max_polls: Optional[int] = None) -> dict:
+        """Watches Active.sav and re-applies this session's settings whenever the game resets them"""
+        desired = dict(self.sav_targets) or {
+            name: self.active_sav.get(name) for name in DRIFT_DEFAULT_PROPERTIES if name in self.active_sav}
+        watcher = DriftWatcher(self, desired, interval, stop_game)
+
+        def report(event):
+            if "error" in event:
+                print(f"[{event['time']}] \033[1;31mCheck failed: {event['error']}\033[0m")
+                return
+            changes = ", ".join(f"{name} {old}→{new}" for name, (old, new) in event["drifted"].items())
+            print(f"[{event['time']}] \033[1;33mSettings reset by the game, re-applied:\033[0m {changes}")
+
+        print(f"Watching {len(desired)} settings every {interval:g}s" + ("" if max_polls else " (Ctrl+C to stop)"))
+        return watcher.run(stop_event, max_polls, on_event=report)
+
+    def watch_menu(self):
+        """Keep the current settings applied while the game runs"""
+        interval = input("\n\033[1;36mCheck interval in seconds (Enter for 5): \033[0m").strip() or "5"
         try:
-            graphics_setting_dict = {
-                "Smooth": b'\x01',
-                "Balanced": b'\x02',
-                "HD": b'\x03',
-                "HDR": b'\x04',
-                "Ultra HD": b'\x05'
-            }
-            
-            graphics_setting = graphics_setting_dict.get(quality)
-            if graphics_setting is None:
-                print(f"Invalid quality value: {quality}")
-                print(f"Valid values are: {', '.join(graphics_setting_dict.keys())}")
-                return False
+            interval = max(0.5, float(interval))
+        except ValueError:
+            print("\033[1;31mInvalid interval.\033[0m")
+            return False
+        try:
+            self.watch_settings(interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        return True
 
-            # Set the graphics quality
-            success = True
-            graphics_files = ["ArtQuality", "LobbyRenderQuality", "BattleRenderQuality"]
-            for value in graphics_files:
-                success = success and self.change_graphics_file(value, graphics_setting)
-            
-            if success:
-                print(f"Graphics quality set to {quality}")
-            else:
-                print("Some graphics settings could not be changed")
-                
-            return success
-        except Exception as e:
-            logger.error(f"Error setting graphics quality: {str(e)}", exc_info=True)
-            print(f"Error setting graphics quality: {str(e)}")
+    def snapshot_menu(self):
+        """List saved versions of Active.sav and UserCustom.ini and restore one"""
+        entries = self.snapshots.history(self.serial, self.pubg_package)[:15]
+        if not entries:
+            print("\n\033[1;33mNo snapshots recorded for this device yet.\033[0m")
+            return False
+
+        print("\n\033[1;33mSnapshot History (newest first):\033[0m")
+        for i, entry in enumerate(entries, 1):
+            print(f"\033[1;32m{i}.\033[0m {entry['created']}  {entry['name']:<15} {entry['label']:<8} "
+                  f"{format_size(entry['size'])}  \033[1;36m{entry['digest'][:12]}\033[0m")
+
+        selection = input(f"\n\033[1;36mRestore snapshot (1-{len(entries)}, Enter to cancel): \033[0m").strip()
+        if not selection:
+            return False
+        if not selection.isdigit() or not 1 <= int(selection) <= len(entries):
+            print("\033[1;31mInvalid selection.\033[0m")
             return False
+        return self.restore_snapshot(entries[int(selection) - 1]["digest"]) is not None
 
     def push_active_shadow_file(self):
-        """Pushes the modified Active.sav file to the device and restarts the game."""
+        """Pushes the modified Active.sav file to the device and restarts the game.
+
+        The push (and the force-stop before it) is skipped when the device
+        already holds exactly these bytes; self.last_push_skipped records it.
+        """
         try:
-            # First stop the game
-            subprocess.run([self.adb_path, "-s", "emulator-5554", "shell", f"am force-stop {self.pubg_package}"],
-                             check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            time.sleep(0.2)
+            self.last_push_skipped = False
 
-            # Path to the SaveGames directory
-            data_dir = f"/sdcard/Android/data/{self.pubg_package}/files/UE4Game/ShadowTrackerExtra/ShadowTrackerExtra/Saved"
+            if not self.active_sav_needs_push():
+                self.last_push_skipped = True
+                print("Graphics settings already up to date on device, nothing to push")
+                return True
 
-            # Push the modified Active.sav file
-            new_sav_path = os.path.join("assets", "new.sav")
-            dest_path = f"{data_dir}/SaveGames/Active.sav"
+            # First stop the game
+            self.stop_app()
 
-            subprocess.run([self.adb_path, "-s", "emulator-5554", "push", new_sav_path, dest_path],
-                             check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            # Push the modified Active.sav file
+            self.upload_active_sav()
 
             print("Graphics settings pushed to device successfully")
             return True
@@ -473,12 +3198,105 @@ class PUBGGraphicsCLI:
             print(f"Error pushing Active.sav file: {str(e)}")
             return False
 
+    def stage_preset(self, key: str) -> bool:
+        """Applies a performance preset to the in-memory Active.sav and UserCustom.ini"""
+        preset = PERFORMANCE_PRESETS.get(key)
+        if preset is None:
+            print(f"Invalid preset: {key}")
+            print(f"Valid values are: {', '.join(PERFORMANCE_PRESETS.keys())}")
+            return False
+
+        plan = self.active_sav.patch()
+        for name, value in preset["sav"].items():
+            plan.set(name, value, "IntProperty")
+        self.apply_patch(plan)
+        if plan.missing:
+            print(f"Some settings were not found in Active.sav: {', '.join(plan.missing)}")
+
+        cvars = self.load_cvars()
+        for name, value in preset["cvars"].items():
+            cvars.set(name, value)
+        return True
+
+    @traced("commit")
+    def commit_changes(self, start_game: bool = False) -> bool:
+        """Pushes every pending Active.sav and UserCustom.ini change as one transaction.
+
+        Each file is pushed at most once and only if it changed, with a single
+        force-stop before the pushes and (optionally) one game start after them.
+        If UserCustom.ini can't be pushed after Active.sav was, the previous
+        Active.sav is pushed back so the device keeps a consistent pair.
+        self.last_commit records which files were pushed.
+        """
+        sav_dirty = self.active_sav_needs_push()
+        ini_dirty = self.user_custom_ini is not None and self.user_custom_ini.dirty
+        self.last_commit = {"active_sav": sav_dirty, "user_custom_ini": ini_dirty}
+        if sav_dirty or ini_dirty:
+            previous_sav = self.synced_sav_content
+            try:
+                self.stop_app()
+                if sav_dirty:
+                    self.upload_active_sav()
+            except (AdbError, OSError) as e:
+                logger.error(f"Error pushing Active.sav: {str(e)}", exc_info=True)
+                print(f"Error pushing Active.sav: {str(e)}")
+                self.last_commit = {"active_sav": False, "user_custom_ini": False}
+                return False
+            if ini_dirty and not self.commit_user_custom_ini():
+                if sav_dirty and previous_sav is not None:
+                    self.restore_previous_sav(previous_sav)
+                self.last_commit = {"active_sav": False, "user_custom_ini": False}
+                return False
+
+        if start_game:
+            return self.start_app()
+        return True
+
+    def apply_preset(self, key: str, start_game: bool = False) -> bool:
+        """Applies a performance preset as one transaction.
+
+        Active.sav and UserCustom.ini are each pulled at most once, patched in
+        a single batch and pushed at most once (see commit_changes).
+        """
+        try:
+            if not self.stage_preset(key):
+                return False
+
+            name = PERFORMANCE_PRESETS[key]["name"]
+            if not self.commit_changes(start_game):
+                return False
+            if any(self.last_commit.values()):
+                print(f"{name} preset pushed to device successfully")
+            else:
+                print(f"{name} preset already active on device, nothing to push")
+            return True
+        except Exception as e:
+            logger.error(f"Error applying preset: {str(e)}", exc_info=True)
+            print(f"Error applying preset: {str(e)}")
+            return False
+
+    def preset_menu(self):
+        """Choose and apply a performance preset"""
+        keys = list(PERFORMANCE_PRESETS)
+        print("\n\033[1;33mPerformance Presets:\033[0m")
+        for i, key in enumerate(keys, 1):
+            preset = PERFORMANCE_PRESETS[key]
+            print(f"\033[1;32m{i}.\033[0m {preset['name']} - {preset['description']}")
+
+        selection = input(f"\n\033[1;36mSelect preset (1-{len(keys)}): \033[0m")
+        if not selection.isdigit() or not 1 <= int(selection) <= len(keys):
+            print("\033[1;31mInvalid selection.\033[0m")
+            return False
+
+        start_game = input("\033[1;36mStart the game afterwards? (y/n): \033[0m").strip().lower() == 'y'
+        return self.apply_preset(keys[int(selection) - 1], start_game)
+
+    @traced("start")
     def start_app(self):
         """Starts the PUBG Mobile game."""
         try:
             package = f"{self.pubg_package}/com.epicgames.ue4.SplashActivity"
-            subprocess.run([self.adb_path, "-s", "emulator-5554", "shell", f"am start -n {package}"],
-                             check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.session.shell(f"am start -n {package}")
             print(f"Starting {self.pubg_versions.get(self.pubg_package, 'PUBG Mobile')}")
             return True
         except Exception as e:
@@ -499,33 +3317,48 @@ class PUBGGraphicsCLI:
         print(f"  \033[1;33mStyle:\033[0m {style}")
         print("")
 
+    def stage_sensitivity(self, key: str) -> bool:
+        """Writes a recoil control profile into the in-memory Active.sav sensitivity floats"""
+        profile = SENSITIVITY_PROFILES.get(key)
+        if profile is None:
+            print(f"Invalid sensitivity profile: {key}")
+            print(f"Valid values are: {', '.join(SENSITIVITY_PROFILES.keys())}")
+            return False
+
+        values = sensitivity_values(self.active_sav.schema(), profile)
+        if not values:
+            print("No sensitivity settings found in Active.sav")
+            return False
+        plan = self.active_sav.patch()
+        for name, value in values.items():
+            plan.set(name, value, "FloatProperty")
+        # Makes the game use the custom values instead of resetting them
+        plan.set("bInitedCustomSensitivity", True, "BoolProperty")
+        self.apply_patch(plan)
+        return True
+
     def add_recoil_control_menu(self):
         """Add recoil control settings via sensitivity and gyroscope settings"""
         print("\n\033[1;33mRecoil Control Settings:\033[0m")
         
         # Sensitivity settings for different scopes can affect recoil control
-        sensitivity_options = {
-            "1": {"name": "Balanced Control", "camera": 120, "ads": 80, "gyro": 300},
-            "2": {"name": "Minimal Recoil", "camera": 100, "ads": 65, "gyro": 400},
-            "3": {"name": "Pro Control", "camera": 140, "ads": 90, "gyro": 200},
-            "4": {"name": "Default", "camera": 100, "ads": 100, "gyro": 100}
-        }
+        keys = list(SENSITIVITY_PROFILES)
         
         # Display options
-        for key, settings in sensitivity_options.items():
-            print(f"\033[1;32m{key}.\033[0m {settings['name']}")
+        for i, key in enumerate(keys, 1):
+            print(f"\033[1;32m{i}.\033[0m {SENSITIVITY_PROFILES[key]['name']}")
         
-        selection = input("\n\033[1;36mSelect sensitivity profile (1-4): \033[0m")
+        selection = input(f"\n\033[1;36mSelect sensitivity profile (1-{len(keys)}): \033[0m")
         
-        if selection in sensitivity_options:
-            chosen_profile = sensitivity_options[selection]
+        if selection.isdigit() and 1 <= int(selection) <= len(keys):
+            chosen_profile = SENSITIVITY_PROFILES[keys[int(selection) - 1]]
             print(f"\n\033[1;32mApplying {chosen_profile['name']} sensitivity profile...\033[0m")
             
-            # Here you would modify the sensitivity settings in the game config
-            # Example (pseudocode):
-            self.change_sensitivity_settings("CameraVertSensitivity", chosen_profile['camera'])
-            self.change_sensitivity_settings("ADSSensitivity", chosen_profile['ads'])
-            self.change_sensitivity_settings("GyroscopeSensitivity", chosen_profile['gyro'])
+            # Per-scope camera, firing camera and gyroscope values live in Active.sav
+            if not self.stage_sensitivity(keys[int(selection) - 1]):
+                return False
+            if not self.push_active_shadow_file():
+                return False
             
             print("\033[1;32mSensitivity settings applied. This should help with recoil control.\033[0m")
             print("\033[1;33mTip: Enable gyroscope in game for best results!\033[0m")
@@ -534,146 +3367,114 @@ class PUBGGraphicsCLI:
             print("\033[1;31mInvalid selection.\033[0m")
             return False
 
-    def change_sensitivity_settings(self, setting_name, value):
-        """Modify sensitivity settings in UserCustom.ini file"""
+    def user_custom_ini_path(self) -> str:
+        """Device path of UserCustom.ini for the selected package"""
+        return f"/sdcard/Android/data/{self.pubg_package}/files/UE4Game/ShadowTrackerExtra/ShadowTrackerExtra/Saved/Config/Android/UserCustom.ini"
+
+    @traced("pull_user_custom_ini")
+    def load_user_custom_ini(self) -> IniDocument:
+        """Pulls UserCustom.ini once per session and returns the shared document"""
+        if self.user_custom_ini is None:
+            local_ini_path = os.path.join(self.assets_dir, "UserCustom.ini")
+            os.makedirs(self.assets_dir, exist_ok=True)
+            content = self.session.pull(self.user_custom_ini_path(), local_ini_path)
+            self.user_custom_ini = IniDocument.from_bytes(content)
+            self.record_snapshot(content, "UserCustom.ini", "pulled")
+        return self.user_custom_ini
+
+    def load_cvars(self) -> CVarModel:
+        """Returns the console variables of the session's UserCustom.ini"""
+        doc = self.load_user_custom_ini()
+        if self.user_cvars is None or self.user_cvars.doc is not doc:
+            self.user_cvars = CVarModel(doc)
+        return self.user_cvars
+
+    def render_settings_menu(self):
+        """Edit render scale, shadow and LOD console variables in UserCustom.ini"""
         try:
-            # Pull the UserCustom.ini file
-            user_custom_ini_path = f"/sdcard/Android/data/{self.pubg_package}/files/UE4Game/ShadowTrackerExtra/ShadowTrackerExtra/Saved/Config/Android/UserCustom.ini"
-            local_ini_path = os.path.join("assets", "UserCustom.ini")
-            
-            subprocess.run([self.adb_path, "-s", "emulator-5554", "pull", user_custom_ini_path, local_ini_path],
-                           check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            
-            # Read and modify the file
-            with open(local_ini_path, 'r') as file:
-                lines = file.readlines()
-            
-            modified = False
-            for i, line in enumerate(lines):
-                if setting_name in line:
-                    # Parse the line and modify the value
-                    parts = line.split('=')
-                    if len(parts) == 2:
-                        lines[i] = f"{parts[0]}={value}\n"
-                        modified = True
-            
-            # If setting not found, add it
-            if not modified:
-                lines.append(f"{setting_name}={value}\n")
-            
-            # Write back the modified file
-            with open(local_ini_path, 'w') as file:
-                file.writelines(lines)
-            
-            # Push the file back to the device
-            subprocess.run([self.adb_path, "-s", "emulator-5554", "push", local_ini_path, user_custom_ini_path],
-                           check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            
+            cvars = self.load_cvars()
+            names = list(RENDER_CVARS)
+
+            print("\n\033[1;33mAdvanced Render Settings:\033[0m")
+            for i, name in enumerate(names, 1):
+                print(f"\033[1;32m{i}.\033[0m {RENDER_CVARS[name]} \033[1;36m[{name} = {cvars.get(name, 'not set')}]\033[0m")
+
+            selection = input(f"\n\033[1;36mSelect setting (1-{len(names)}): \033[0m")
+            if not selection.isdigit() or not 1 <= int(selection) <= len(names):
+                print("\033[1;31mInvalid selection.\033[0m")
+                return False
+            name = names[int(selection) - 1]
+
+            value = input(f"\033[1;36mNew value for {name}: \033[0m").strip()
+            if not CVAR_NUMBER.fullmatch(value):
+                print("\033[1;31mInvalid value. Enter a number such as 0.6, or the file's own form such as 0.0.45.\033[0m")
+                return False
+
+            cvars.set(name, value)
+            if not self.commit_user_custom_ini():
+                return False
+            print(f"\033[1;32m{name} set to {value}.\033[0m")
+            return True
+        except Exception as e:
+            logger.error(f"Error changing render settings: {str(e)}", exc_info=True)
+            print(f"\033[1;31mError changing render settings: {str(e)}\033[0m")
+            return False
+
+    @traced("push_user_custom_ini")
+    def commit_user_custom_ini(self) -> bool:
+        """Pushes UserCustom.ini back to the device if it was modified"""
+        try:
+            if self.user_custom_ini is None or not self.user_custom_ini.dirty:
+                return True
+            content = self.user_custom_ini.to_bytes()
+            with open(os.path.join(self.assets_dir, "UserCustom.ini"), 'wb') as file:
+                file.write(content)
+            self.session.push(content, self.user_custom_ini_path())
+            self.user_custom_ini.dirty = False
+            self.record_snapshot(content, "UserCustom.ini", "pushed")
             return True
         except Exception as e:
-            logger.error(f"Error changing sensitivity settings: {str(e)}", exc_info=True)
-            print(f"Error changing sensitivity settings: {str(e)}")
+            logger.error(f"Error pushing UserCustom.ini: {str(e)}", exc_info=True)
+            print(f"Error pushing UserCustom.ini: {str(e)}")
             return False
 
     def temp_cleaner(self):
         """Cleans temporary files to improve system performance"""
         try:
-            import shutil
-            import tempfile
+            print("\n\033[1;33mScanning temporary files...\033[0m")
             
-            print("\n\033[1;33mCleaning temporary files...\033[0m")
+            cleaner = TempCleaner(default_clean_roots())
+            plans = cleaner.plan()
+            plan = cleaner.run(dry_run=True, plans=plans)
+            for root in plan["roots"]:
+                print(f"  • {root['root']}: \033[1;33m{root['files']}\033[0m of {root['found_files']} files, "
+                      f"\033[1;33m{format_size(root['bytes'])}\033[0m")
+            if not plan["planned_files"]:
+                print("\033[1;32mNothing to clean.\033[0m")
+                return True
             
-            # Track stats for reporting
-            cleaned_files = 0
-            cleaned_dirs = 0
-            freed_space = 0
+            confirm = input(f"\n\033[1;36mFree {format_size(plan['planned_bytes'])}? (y/n): \033[0m")
+            if confirm.strip().lower() != 'y':
+                print("\033[1;33mTemp cleaning cancelled.\033[0m")
+                return False
             
             # Start a spinner for the cleaning process
             stop_spinner = threading.Event()
             spinner_thread = threading.Thread(target=loading_animation, args=(stop_spinner,))
             spinner_thread.start()
             
-            # Clean Windows temp directory
-            temp_dir = os.environ.get('TEMP') or tempfile.gettempdir()
-            if os.path.exists(temp_dir):
-                for item in os.listdir(temp_dir):
-                    item_path = os.path.join(temp_dir, item)
-                    try:
-                        if os.path.isfile(item_path):
-                            item_size = os.path.getsize(item_path)
-                            os.unlink(item_path)
-                            cleaned_files += 1
-                            freed_space += item_size
-                        elif os.path.isdir(item_path):
-                            dir_size = sum(os.path.getsize(os.path.join(dirpath, filename))
-                                        for dirpath, dirnames, filenames in os.walk(item_path)
-                                        for filename in filenames if os.path.exists(os.path.join(dirpath, filename)))
-                            shutil.rmtree(item_path, ignore_errors=True)
-                            cleaned_dirs += 1
-                            freed_space += dir_size
-                    except Exception:
-                        # Skip files that can't be removed (likely in use)
-                        pass
-            
-            # Clean Windows Prefetch directory
-            prefetch_dir = os.path.join(os.environ.get('WINDIR', r'C:\Windows'), 'Prefetch')
-            if os.path.exists(prefetch_dir):
-                for item in os.listdir(prefetch_dir):
-                    item_path = os.path.join(prefetch_dir, item)
-                    try:
-                        if os.path.isfile(item_path):
-                            item_size = os.path.getsize(item_path)
-                            os.unlink(item_path)
-                            cleaned_files += 1
-                            freed_space += item_size
-                    except Exception:
-                        # Skip files that can't be removed (likely in use)
-                        pass
-            
-            # Clean GameLoop shader cache if available
             try:
-                # Get GameLoop path from registry
-                import winreg
-                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r'SOFTWARE\WOW6432Node\Tencent\MobileGamePC\UI')
-                gameloop_path = winreg.QueryValueEx(key, 'InstallPath')[0]
-                winreg.CloseKey(key)
-                
-                shader_cache_dir = os.path.join(gameloop_path, 'ShaderCache')
-                if os.path.exists(shader_cache_dir):
-                    for item in os.listdir(shader_cache_dir):
-                        item_path = os.path.join(shader_cache_dir, item)
-                        try:
-                            if os.path.isfile(item_path):
-                                item_size = os.path.getsize(item_path)
-                                os.unlink(item_path)
-                                cleaned_files += 1
-                                freed_space += item_size
-                        except Exception:
-                            # Skip files that can't be removed
-                            pass
-            except Exception:
-                # Registry key not found or other issue, skip GameLoop cleaning
-                pass
-            
-            # Stop the spinner
-            stop_spinner.set()
-            spinner_thread.join()
-            sys.stdout.write('\r' + ' ' * 50 + '\r')
-            
-            # Convert freed space to readable format
-            if freed_space < 1024:
-                freed_space_str = f"{freed_space} bytes"
-            elif freed_space < 1024 * 1024:
-                freed_space_str = f"{freed_space / 1024:.2f} KB"
-            elif freed_space < 1024 * 1024 * 1024:
-                freed_space_str = f"{freed_space / (1024 * 1024):.2f} MB"
-            else:
-                freed_space_str = f"{freed_space / (1024 * 1024 * 1024):.2f} GB"
+                stats = cleaner.run(plans=plans)
+            finally:
+                # Stop the spinner
+                stop_spinner.set()
+                spinner_thread.join()
+                sys.stdout.write('\r' + ' ' * 50 + '\r')
             
             print(f"\033[1;32mTemp cleaner complete!\033[0m")
-            print(f"  • Removed \033[1;33m{cleaned_files}\033[0m files")
-            print(f"  • Cleaned \033[1;33m{cleaned_dirs}\033[0m directories")
-            print(f"  • Freed approximately \033[1;33m{freed_space_str}\033[0m of disk space")
+            print(f"  • Removed \033[1;33m{stats['files']}\033[0m files")
+            print(f"  • Cleaned \033[1;33m{stats['dirs']}\033[0m directories")
+            print(f"  • Freed approximately \033[1;33m{format_size(stats['bytes'])}\033[0m of disk space")
             print(f"\n\033[1;32mSystem performance should now be improved.\033[0m")
             
             return True
@@ -686,7 +3487,6 @@ class PUBGGraphicsCLI:
         """Optimize network settings for better ping in PUBG Mobile on Gameloop"""
         try:
             import ctypes
-            import subprocess
             
             print("\n\033[1;33mPing Optimizer for PUBG Mobile\033[0m")
             print("This will optimize your network settings for lower ping...")
@@ -698,177 +3498,93 @@ class PUBGGraphicsCLI:
                 print("Please run this tool as administrator for network optimizations to work.")
                 return False
             
+            runner = NetworkTweakRunner(journal_path=os.path.join(self.assets_dir, "network_journal.json"))
+            previous = runner.load_journal()
+            if previous and previous.get("state") == "applied":
+                print(f"\nNetwork optimizations from {previous['created']} are active.")
+                choice = input("\033[1;36mRestore the settings from before them instead? (y/n): \033[0m")
+                if choice.strip().lower() == 'y':
+                    journal = runner.rollback()
+                    for step in journal["steps"]:
+                        if step["status"] == "rolled_back":
+                            print(f"  • Restored: {step['name']}")
+                        elif step["status"] == "rollback_failed":
+                            print(f"  • \033[1;31mCould not restore {step['name']}: {step['output']}\033[0m")
+                    return journal["state"] == "rolled_back"
+            
+            benchmark = None
+            if input("\033[1;36mBenchmark latency before and after the changes? (y/n): \033[0m").strip().lower() == 'y':
+                benchmark = NetworkBenchmark([(server, 443) for server in PUBG_PING_SERVERS])
+            
             # Start a spinner for the optimization process
             stop_spinner = threading.Event()
             spinner_thread = threading.Thread(target=loading_animation, args=(stop_spinner,))
             spinner_thread.start()
             
-            # List of optimizations to apply
-            optimizations = [
-                # DNS optimization
-                {
-                    "name": "Setting DNS to faster gaming servers",
-                    "commands": [
-                        ["netsh", "interface", "ip", "set", "dns", "name=all", "static", "1.1.1.1", "primary"],
-                        ["netsh", "interface", "ip", "add", "dns", "name=all", "1.0.0.1", "index=2"]
-                    ]
-                },
-                # TCP optimization
-                {
-                    "name": "Optimizing TCP/IP settings",
-                    "commands": [
-                        ["netsh", "int", "tcp", "set", "global", "autotuninglevel=normal"],
-                        ["netsh", "int", "tcp", "set", "global", "ecncapability=disabled"],
-                        ["netsh", "int", "tcp", "set", "heuristics", "disabled"]
-                    ]
-                },
-                # Network throttling index
-                {
-                    "name": "Disabling network throttling",
-                    "registry_path": r"SYSTEM\CurrentControlSet\Services\Psched",
-                    "registry_value": "NonBestEffortLimit",
-                    "registry_data": 0,
-                    "registry_type": "REG_DWORD"
-                },
-                # Network adapter settings
-                {
-                    "name": "Optimizing network adapter",
-                    "commands": [
-                        ["powershell", "-Command", "Set-NetAdapterAdvancedProperty -Name '*' -DisplayName 'Energy-Efficient Ethernet' -DisplayValue 'Disabled' -ErrorAction SilentlyContinue"],
-                        ["powershell", "-Command", "Set-NetAdapterAdvancedProperty -Name '*' -DisplayName 'Power Saving Mode' -DisplayValue 'Disabled' -ErrorAction SilentlyContinue"],
-                        ["powershell", "-Command", "Set-NetAdapterAdvancedProperty -Name '*' -DisplayName 'Interrupt Moderation' -DisplayValue 'Disabled' -ErrorAction SilentlyContinue"]
-                    ]
-                },
-                # Gameloop-specific settings
-                {
-                    "name": "Optimizing Gameloop network settings",
-                    "registry_path": r"SOFTWARE\WOW6432Node\Tencent\MobileGamePC",
-                    "registry_value": "AdbDisable",
-                    "registry_data": 0,
-                    "registry_type": "REG_DWORD"
-                },
-                # QoS settings for gaming
-                {
-                    "name": "Setting QoS for gaming priority",
-                    "commands": [
-                        ["powershell", "-Command", "New-NetQosPolicy -Name 'Gaming Traffic' -AppPathNameMatchCondition 'AndroidEmulator.exe','AndroidEmulatorEn.exe','AndroidEmulatorEx.exe','aow_exe.exe' -IPProtocolMatchCondition Both -DSCPAction 46 -NetworkProfile All -ErrorAction SilentlyContinue"]
-                    ]
-                },
-                # Flush DNS
-                {
-                    "name": "Flushing DNS cache",
-                    "commands": [
-                        ["ipconfig", "/flushdns"]
-                    ]
-                }
-            ]
-            
-            # Track successful optimizations
-            successful_optimizations = []
-            
-            # Apply each optimization
-            for opt in optimizations:
-                try:
-                    # Apply command-based optimizations
-                    if "commands" in opt:
-                        for cmd in opt["commands"]:
-                            subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
-                    
-                    # Apply registry-based optimizations
-                    if "registry_path" in opt:
-                        import winreg
-                        
-                        # Determine registry root
-                        if opt["registry_path"].startswith("SYSTEM"):
-                            reg_root = winreg.HKEY_LOCAL_MACHINE
-                        else:
-                            reg_root = winreg.HKEY_LOCAL_MACHINE
-                        
-                        # Create or open registry key
-                        try:
-                            reg_key = winreg.CreateKeyEx(reg_root, opt["registry_path"], 0, winreg.KEY_WRITE)
-                            
-                            # Determine registry type
-                            reg_type = winreg.REG_DWORD
-                            if "registry_type" in opt:
-                                if opt["registry_type"] == "REG_SZ":
-                                    reg_type = winreg.REG_SZ
-                            
-                            # Set registry value
-                            winreg.SetValueEx(reg_key, opt["registry_value"], 0, reg_type, opt["registry_data"])
-                            winreg.CloseKey(reg_key)
-                        except Exception:
-                            # Skip if registry operation fails
-                            pass
-                    
-                    successful_optimizations.append(opt["name"])
-                except Exception:
-                    # Skip failed optimizations
-                    pass
-            
-            # Stop the spinner
-            stop_spinner.set()
-            spinner_thread.join()
-            sys.stdout.write('\r' + ' ' * 50 + '\r')
-            
-            # Network interface reset for changes to take effect
             try:
-                print("\n\033[1;36mResetting network interfaces to apply changes...\033[0m")
-                subprocess.run(["netsh", "winsock", "reset", "catalog"], check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                subprocess.run(["netsh", "int", "ip", "reset"], check=False, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            except Exception:
-                pass
+                if benchmark:
+                    report = benchmark.run(runner.apply)
+                    journal = report["change"]
+                    report["change"] = {"state": journal["state"],
+                                        "tweaks": [step["name"] for step in journal["steps"] if step["status"] == "applied"]}
+                    NetworkBenchmark.save(report, os.path.join(self.assets_dir, "network_benchmarks.json"))
+                else:
+                    journal = runner.apply()
+            finally:
+                # Stop the spinner
+                stop_spinner.set()
+                spinner_thread.join()
+                sys.stdout.write('\r' + ' ' * 50 + '\r')
+            
+            # Report every tweak with its real outcome
+            print("\n\033[1;32mNetwork optimizations:\033[0m" if journal["state"] == "applied"
+                  else "\n\033[1;31mA network optimization failed; all changes were rolled back:\033[0m")
+            for step in journal["steps"]:
+                if step["status"] in ("applied", "unchanged"):
+                    note = "already set" if step["status"] == "unchanged" else f"{len(step['actions'])} change(s)"
+                    print(f"  • {step['name']} \033[1;32m✓\033[0m ({note})")
+                else:
+                    print(f"  • {step['name']} \033[1;31m{step['status']}\033[0m {step['output']}".rstrip())
             
             # Measure current ping
             try:
                 print("\n\033[1;36mMeasuring ping to PUBG servers...\033[0m")
                 
-                # List of PUBG Mobile servers to test
-                pubg_servers = [
-                    "na.igamecj.com",       # North America
-                    "eu.igamecj.com",       # Europe
-                    "as.igamecj.com",       # Asia
-                    "krjp.igamecj.com",     # Korea/Japan
-                    "sa.igamecj.com"        # South America
-                ]
+                # All servers are probed at once over TCP, so this takes about one
+                # round of timeouts instead of a ping run per server
+                results = LatencyProbe([(server, 443) for server in PUBG_PING_SERVERS]).run()
                 
-                best_ping = float('inf')
-                best_server = None
-                
-                for server in pubg_servers:
-                    try:
-                        ping_process = subprocess.run(["ping", "-n", "4", server], 
-                                                    stdout=subprocess.PIPE, 
-                                                    stderr=subprocess.PIPE,
-                                                    text=True,
-                                                    check=False)
-                        
-                        output = ping_process.stdout
-                        
-                        # Extract average ping time
-                        if "Average" in output:
-                            avg_line = [line for line in output.split('\n') if "Average" in line][0]
-                            avg_ping = int(''.join(filter(str.isdigit, avg_line.split("Average")[1].split(",")[0])))
-                            
-                            print(f"  • {server}: \033[1;33m{avg_ping}ms\033[0m")
-                            
-                            if avg_ping < best_ping:
-                                best_ping = avg_ping
-                                best_server = server
-                    except Exception:
-                        print(f"  • {server}: \033[1;31mFailed to measure\033[0m")
+                best = None
+                for result in results:
+                    if result["avg"] is None:
+                        print(f"  • {result['host']}: \033[1;31mFailed to measure\033[0m")
+                        continue
+                    print(f"  • {result['host']} ({PUBG_PING_SERVERS[result['host']]}): "
+                          f"\033[1;33m{result['avg']:.0f}ms\033[0m "
+                          f"(min {result['min']:.0f}, p95 {result['p95']:.0f}, jitter {result['jitter']:.1f}, "
+                          f"loss {result['loss']:.0f}%)")
+                    if best is None or result["avg"] < best["avg"]:
+                        best = result
                 
-                if best_server:
-                    print(f"\n\033[1;32mBest server: {best_server} with {best_ping}ms ping\033[0m")
+                if best:
+                    print(f"\n\033[1;32mBest server: {best['host']} with {best['avg']:.0f}ms ping\033[0m")
             except Exception as e:
                 print(f"\033[1;31mError measuring ping: {str(e)}\033[0m")
             
-            # Report successful optimizations
-            print("\n\033[1;32mCompleted network optimizations:\033[0m")
-            for opt in successful_optimizations:
-                print(f"  • {opt}")
+            if benchmark:
+                print("\n\033[1;36mLatency before → after (mean ms):\033[0m")
+                for target, entry in report["comparison"].items():
+                    if entry["mean_delta"] is None:
+                        print(f"  • {target}: \033[1;31m{entry['verdict']}\033[0m")
+                        continue
+                    color = {"improved": "32", "worse": "31"}.get(entry["verdict"], "33")
+                    print(f"  • {target}: {entry['before']['mean']:.1f} → {entry['after']['mean']:.1f} "
+                          f"(jitter {entry['jitter_before']} → {entry['jitter_after']}) "
+                          f"\033[1;{color}m{entry['verdict']}\033[0m")
             
-            print("\n\033[1;33mRecommendation:\033[0m Restart your computer for all changes to take effect.")
+            if journal["state"] != "applied":
+                return False
+            print(f"\nPrevious settings were saved to {runner.journal_path}; run this option again to restore them.")
             print("\033[1;32mYour ping should be optimized for PUBG Mobile on Gameloop!\033[0m")
             
             return True
@@ -906,22 +3622,517 @@ def display_menu():
     print("\033[1;32m║\033[0m 6. Optimize Ping                    \033[1;32m║\033[0m")
     print("\033[1;32m║\033[0m 7. Apply and Start Game             \033[1;32m║\033[0m")
     print("\033[1;32m║\033[0m 8. Apply Settings (Don't Start Game)\033[1;32m║\033[0m")
-    print("\033[1;32m║\033[0m 9. Exit                             \033[1;32m║\033[0m")
+    print("\033[1;32m║\033[0m 9. Advanced Render Settings         \033[1;32m║\033[0m")
+    print("\033[1;32m║\033[0m 10. Performance Presets             \033[1;32m║\033[0m")
+    print("\033[1;32m║\033[0m 11. Snapshot History                \033[1;32m║\033[0m")
+    print("\033[1;32m║\033[0m 12. Backup / Restore Saved Data     \033[1;32m║\033[0m")
+    print("\033[1;32m║\033[0m 13. Keep Settings Applied (Watch)   \033[1;32m║\033[0m")
+    print("\033[1;32m║\033[0m 14. Exit                            \033[1;32m║\033[0m")
     print("\033[1;32m╚═════════════════════════════════════╝\033[0m")
 
+def json_safe(value):
+    """Converts decoded save values (bytes, tuples, non-str keys) to JSON types"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): json_safe(v) for k, v in value.items()}
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+def build_arg_parser() -> "argparse.ArgumentParser":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="pubg-tool",
+        description="Non-interactive PUBG Universal Tool. Run without arguments for the interactive menu.")
+    parser.add_argument("--serial", action="append",
+                        help="ADB serial of an emulator; repeat to run on several (default: first emulator found)")
+    parser.add_argument("--all-devices", action="store_true", help="Run on every online device")
+    parser.add_argument("--jobs", type=int, default=4, help="Devices to work on at the same time (default: 4)")
+    parser.add_argument("--package", help="PUBG package name (default: first installed version)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Record operation timings to PATH (.jsonl for JSON lines, otherwise Chrome trace JSON)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    apply_parser = subparsers.add_parser("apply", help="Apply settings and push them in one transaction")
+    apply_parser.add_argument("--preset", choices=list(PERFORMANCE_PRESETS), help="Performance preset to apply first")
+    apply_parser.add_argument("--fps", help="FPS level, e.g. \"Ultra Extreme\"")
+    apply_parser.add_argument("--quality", help="Graphics quality, e.g. Smooth")
+    apply_parser.add_argument("--style", help="Graphics style, e.g. Classic")
+    apply_parser.add_argument("--sensitivity", choices=list(SENSITIVITY_PROFILES),
+                              help="Recoil control sensitivity profile written to Active.sav")
+    apply_parser.add_argument("--cvar", action="append", default=[], metavar="NAME=VALUE",
+                              help="Set a UserCustom.ini console variable (repeatable)")
+    apply_parser.add_argument("--no-start", action="store_true", help="Don't start the game afterwards")
+
+    watch_parser = subparsers.add_parser("watch", help="Apply settings, then re-apply them whenever the game resets them")
+    watch_parser.add_argument("--preset", choices=list(PERFORMANCE_PRESETS), help="Performance preset to apply first")
+    watch_parser.add_argument("--fps", help="FPS level, e.g. \"Ultra Extreme\"")
+    watch_parser.add_argument("--quality", help="Graphics quality, e.g. Smooth")
+    watch_parser.add_argument("--style", help="Graphics style, e.g. Classic")
+    watch_parser.add_argument("--sensitivity", choices=list(SENSITIVITY_PROFILES),
+                              help="Recoil control sensitivity profile written to Active.sav")
+    watch_parser.add_argument("--cvar", action="append", default=[], metavar="NAME=VALUE",
+                              help="Set a UserCustom.ini console variable (repeatable)")
+    watch_parser.add_argument("--no-start", action="store_true", help="Don't start the game after the first push")
+    watch_parser.add_argument("--interval", type=float, default=5.0, help="Seconds between checks (default 5)")
+    watch_parser.add_argument("--stop-game", action="store_true",
+                              help="Force-stop the game before re-applying, like a normal push")
+    watch_parser.add_argument("--max-polls", type=int, help="Stop after this many checks (default: until Ctrl+C)")
+
+    get_parser = subparsers.add_parser("get", help="Print the current settings as JSON")
+    get_parser.add_argument("--cvars", action="store_true", help="Include render console variables")
+
+    dump_parser = subparsers.add_parser("dump", help="Print every Active.sav property as JSON")
+    dump_parser.add_argument("--cvars", action="store_true", help="Include all UserCustom.ini console variables")
+
+    snapshots_parser = subparsers.add_parser("snapshots", help="List stored file snapshots (no device needed)")
+    snapshots_parser.add_argument("--file", choices=["Active.sav", "UserCustom.ini"], help="Only list this file")
+
+    diff_parser = subparsers.add_parser("diff", help="Compare two .sav files property by property (no device needed)")
+    diff_parser.add_argument("old", help="Local .sav path or snapshot digest prefix")
+    diff_parser.add_argument("new", help="Local .sav path or snapshot digest prefix")
+
+    backup_parser = subparsers.add_parser("backup", help="Back up the game's whole Saved directory in one stream")
+    backup_parser.add_argument("--dest", help="Directory for the archive and unpacked files")
+    backup_parser.add_argument("--plain", action="store_true", help="Do not gzip the stream on the device")
+    backup_parser.add_argument("--compare", action="store_true",
+                               help="Also time a per-file pull of the same tree for comparison")
+
+    restore_backup_parser = subparsers.add_parser("restore-backup", help="Restore a Saved directory backup archive")
+    restore_backup_parser.add_argument("archive", help="Saved.tar.gz (or Saved.tar) written by the backup command")
+    restore_backup_parser.add_argument("--no-start", action="store_true", help="Do not start the game afterwards")
+
+    layout_parser = subparsers.add_parser("layout", help="Inspect or patch a UIElemLayout_*.sav HUD layout file (no device needed)")
+    layout_parser.add_argument("file", help="Local UIElemLayout_*.sav path")
+    layout_parser.add_argument("--map", default="LayoutDetailDict1", help="Layout map property to read")
+    layout_parser.add_argument("--slot", type=int, help="Only show (or patch) this HUD element slot")
+    layout_parser.add_argument("--set", action="append", default=[], metavar="FIELD=VALUE",
+                               help="Set a slot field, e.g. Scale=1.2,1.2 or Opacity=0.8 (repeatable)")
+
+    restore_parser = subparsers.add_parser("restore", help="Push a stored snapshot back to the device")
+    restore_parser.add_argument("snapshot", help="Digest prefix, or position in the device's history (1 = newest)")
+    restore_parser.add_argument("--no-start", action="store_true", help="Do not start the game afterwards")
+
+    ping_parser = subparsers.add_parser("ping", help="Measure latency to the PUBG servers (no device needed)")
+    ping_parser.add_argument("--target", action="append", default=[],
+                             help="host[:port] to probe instead of the PUBG servers (repeatable)")
+    ping_parser.add_argument("--count", type=int, default=4, help="Probes per target")
+    ping_parser.add_argument("--timeout", type=float, default=1.0, help="Seconds to wait for each probe")
+    ping_parser.add_argument("--udp", action="store_true", help="Time UDP echoes instead of TCP connects")
+
+    network_parser = subparsers.add_parser("network", help="Apply or roll back the network tweaks (no device needed)")
+    network_parser.add_argument("--dry-run", action="store_true", help="Only snapshot and list the planned changes")
+    network_parser.add_argument("--rollback", action="store_true", help="Restore the settings saved by the last run")
+    network_parser.add_argument("--tweak", action="append", default=[],
+                                help="Only apply tweaks matching this name, kind or setting (repeatable)")
+    network_parser.add_argument("--benchmark", action="store_true",
+                                help="Measure latency before and after applying and save the comparison")
+    network_parser.add_argument("--revert", action="store_true", help="Roll the tweaks back after benchmarking")
+    network_parser.add_argument("--target", action="append", default=[],
+                                help="host[:port] to benchmark instead of the PUBG servers (repeatable)")
+    network_parser.add_argument("--rounds", type=int, default=3, help="Probe rounds per benchmark measurement")
+    network_parser.add_argument("--count", type=int, default=10, help="Probes per target in each round")
+    network_parser.add_argument("--results", default=os.path.join("assets", "network_benchmarks.json"),
+                                help="JSON file the benchmark history is appended to")
+
+    clean_parser = subparsers.add_parser("clean", help="Clean temporary files (no device needed)")
+    clean_parser.add_argument("--dry-run", action="store_true", help="Only report what would be freed")
+    clean_parser.add_argument("--root", action="append", default=[],
+                              help="Directory to clean instead of the default locations (repeatable)")
+    clean_parser.add_argument("--min-age-hours", type=float,
+                              help="Only delete files older than this (default: 24 with --root)")
+    clean_parser.add_argument("--min-size", type=int, help="Only delete files of at least this many bytes")
+    clean_parser.add_argument("--include", action="append", help="Only delete files matching this glob")
+    clean_parser.add_argument("--exclude", action="append", help="Never delete files matching this glob")
+    clean_parser.add_argument("--budget-mb", type=float,
+                              help="Keep the most recently used files up to this size per root (LRU trim)")
+    return parser
+
+def connect_cli(args, serial: Optional[str] = None, pull_settings: bool = True,
+                tracer: Tracer = NULL_TRACER, allow_server_restart: bool = True) -> PUBGGraphicsCLI:
+    """Connects, selects the package and (unless pull_settings is False) pulls Active.sav without prompting"""
+    cli = PUBGGraphicsCLI()
+    cli.stop_delay = 0
+    cli.tracer = tracer
+    cli.allow_server_restart = allow_server_restart
+    if serial:
+        cli.emulator_serials = [serial]
+        # Keep local copies of each device's files apart
+        cli.assets_dir = os.path.join("assets", re.sub(r"[^A-Za-z0-9._-]", "_", serial))
+    if not cli.check_adb_connection():
+        raise RuntimeError("Cannot connect to ADB")
+    if args.package:
+        package_name = args.package
+    else:
+        if not cli.pubg_version_found():
+            raise RuntimeError("No PUBG Mobile versions found on the device")
+        package_name = next(k for k, v in cli.pubg_versions.items() if v == cli.PUBG_Found[0])
+    if not pull_settings:
+        cli.pubg_package = package_name
+    elif not cli.get_graphics_file(package_name):
+        raise RuntimeError(f"Failed to get graphics file for {package_name}")
+    return cli
+
+def ensure_adb_server() -> PUBGGraphicsCLI:
+    """Starts the adb server if nothing answers yet; no particular emulator is required"""
+    cli = PUBGGraphicsCLI()
+    if not cli.probe_adb_server():
+        cli.adb_path = cli.find_adb_path()
+        if not (cli.run_adb("start-server") and wait_until(cli.probe_adb_server, timeout=5.0)):
+            raise RuntimeError("Cannot connect to ADB")
+    return cli
+
+def list_online_devices() -> List[str]:
+    """Returns the serials of every device the adb server reports as online"""
+    cli = ensure_adb_server()
+    return [serial for serial, state in cli.list_devices().items() if state == "device"]
+
+def current_settings(cli: PUBGGraphicsCLI) -> dict:
+    return {
+        "serial": cli.serial,
+        "package": cli.pubg_package,
+        "version": cli.pubg_versions.get(cli.pubg_package, "Unknown"),
+        "graphics": cli.get_graphics_setting(),
+        "fps": cli.get_fps(),
+        "style": cli.get_graphics_style(),
+    }
+
+def run_device_command(args, serial: Optional[str] = None, tracer: Tracer = NULL_TRACER,
+                       allow_server_restart: bool = True, stop_event: Optional[threading.Event] = None) -> dict:
+    """Runs one subcommand against one device and returns its JSON result"""
+    started = time.perf_counter()
+    result = {"serial": serial}
+    cli = None
+    with tracer.span(args.command, serial=serial or "default") as span:
+        try:
+            # Whole-directory backups work without (and may replace) a readable Active.sav
+            cli = connect_cli(args, serial, pull_settings=args.command not in ("backup", "restore-backup"),
+                              tracer=tracer, allow_server_restart=allow_server_restart)
+            result["serial"] = cli.serial
+            result["connect_ms"] = cli.connect_timings.get("total")
+
+            if args.command in ("apply", "watch"):
+                if args.preset and not cli.stage_preset(args.preset):
+                    raise ValueError(f"Invalid preset: {args.preset}")
+                if args.fps and not cli.set_fps(args.fps):
+                    raise ValueError(f"Invalid FPS value: {args.fps}")
+                if args.quality and not cli.set_graphics_quality(args.quality):
+                    raise ValueError(f"Invalid quality value: {args.quality}")
+                if args.style and not cli.set_graphics_style(args.style):
+                    raise ValueError(f"Invalid style value: {args.style}")
+                if args.sensitivity and not cli.stage_sensitivity(args.sensitivity):
+                    raise ValueError(f"Invalid sensitivity profile: {args.sensitivity}")
+                for assignment in args.cvar:
+                    name, separator, value = assignment.partition("=")
+                    if not separator:
+                        raise ValueError(f"Invalid --cvar {assignment!r}, expected NAME=VALUE")
+                    cli.load_cvars().set(name.strip(), value.strip())
+                if not cli.commit_changes(start_game=not args.no_start):
+                    raise RuntimeError("Failed to push settings to device")
+                result["pushed"] = cli.last_commit
+                if args.command == "watch":
+                    try:
+                        result["watch"] = cli.watch_settings(args.interval, args.stop_game, stop_event,
+                                                             max_polls=args.max_polls)
+                    except KeyboardInterrupt:
+                        result["watch"] = "interrupted"
+                result["settings"] = current_settings(cli)
+            elif args.command == "get":
+                result["settings"] = current_settings(cli)
+                if args.cvars:
+                    cvars = cli.load_cvars()
+                    result["cvars"] = {name: cvars.get(name) for name in RENDER_CVARS}
+            elif args.command == "dump":
+                result["settings"] = current_settings(cli)
+                result["properties"] = {
+                    prop.name: {"type": prop.type, "value": json_safe(cli.active_sav.value_of(prop))}
+                    for prop in cli.active_sav.properties
+                }
+                if args.cvars:
+                    result["cvars"] = dict(cli.load_cvars().items())
+            elif args.command == "backup":
+                if args.compare:
+                    result["benchmark"] = cli.benchmark_backup()
+                    if result["benchmark"] is None:
+                        raise RuntimeError("Backup benchmark failed")
+                else:
+                    result["backup"] = cli.backup_saved(args.dest, compress=not args.plain)
+                    if result["backup"] is None:
+                        raise RuntimeError("Backup failed")
+            elif args.command == "restore-backup":
+                if not cli.restore_saved(args.archive):
+                    raise RuntimeError(f"Failed to restore {args.archive}")
+                if not args.no_start and not cli.start_app():
+                    raise RuntimeError("Failed to start the game")
+            elif args.command == "restore":
+                entry = cli.restore_snapshot(args.snapshot)
+                if entry is None:
+                    raise RuntimeError(f"Failed to restore snapshot {args.snapshot}")
+                result["restored"] = entry
+                if not args.no_start and not cli.start_app():
+                    raise RuntimeError("Failed to start the game")
+            result["ok"] = True
+        except Exception as e:
+            logger.error(f"Command {args.command} failed on {serial or 'default device'}: {str(e)}", exc_info=True)
+            result["ok"] = False
+            result["error"] = str(e)
+        finally:
+            # End the sync channel on failures too, or pooled workers leak its socket
+            if cli is not None and cli.session is not None:
+                cli.session.close()
+        if span is not None:
+            span["ok"] = result["ok"]
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+def run_on_devices(args, serials: List[str], tracer: Tracer = NULL_TRACER) -> List[dict]:
+    """Runs one subcommand on many devices concurrently, at most args.jobs at a time
+
+    The adb server must already be running (see ensure_adb_server); workers
+    never restart it, since that would break the other workers' transfers.
+    Ctrl+C only reaches the main thread, so it stops long-running workers
+    (watch) through a shared event and cancels the ones not started yet.
+    """
+    import concurrent.futures
+
+    stop_event = threading.Event()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(run_device_command, args, serial, tracer, False, stop_event) for serial in serials]
+        try:
+            concurrent.futures.wait(futures)
+        except KeyboardInterrupt:
+            stop_event.set()
+            for future in futures:
+                future.cancel()
+            concurrent.futures.wait(futures)
+    return [{"serial": serial, "ok": False, "error": "cancelled"} if future.cancelled() else future.result()
+            for serial, future in zip(serials, futures)]
+
+def parse_ping_target(text: str, default_port: int = 443) -> Tuple[str, int]:
+    """Splits "host[:port]" into a (host, port) tuple"""
+    host, sep, port = text.rpartition(":")
+    if sep and port.isdigit() and not host.endswith(":"):
+        return host.strip("[]"), int(port)
+    return text.strip("[]"), default_port
+
+def load_sav_argument(ref: str) -> Tuple[GvasFile, str]:
+    """Loads a .sav from a local path or, failing that, from a snapshot digest prefix"""
+    if os.path.exists(ref):
+        return GvasFile.from_file(ref), ref
+    store = SnapshotStore()
+    entry = store.find(ref)
+    return GvasFile(store.get(entry["digest"])), f"{entry['name']} {entry['digest'][:12]} ({entry['created']})"
+
+def run_diff_command(args) -> dict:
+    """Compares two save files and returns their property-level changes"""
+    try:
+        old, old_label = load_sav_argument(args.old)
+        new, new_label = load_sav_argument(args.new)
+        started = time.perf_counter()
+        changes = diff_gvas(old, new)
+        return {"ok": True, "old": old_label, "new": new_label, "diff_ms": round((time.perf_counter() - started) * 1000, 2),
+                "count": len(changes), "changes": json_safe(changes)}
+    except Exception as e:
+        logger.error(f"Diff failed: {str(e)}", exc_info=True)
+        return {"ok": False, "error": str(e)}
+
+def friendly_fields(value):
+    """Drops blueprint _<n>_<GUID> suffixes from decoded struct member names"""
+    if isinstance(value, dict):
+        return {BLUEPRINT_FIELD_SUFFIX.sub("", k) if isinstance(k, str) else k: friendly_fields(v)
+                for k, v in value.items()}
+    return value
+
+def run_layout_command(args) -> dict:
+    """Lists, shows or patches HUD layout slots of a UIElemLayout file"""
+    try:
+        if args.set and args.slot is None:
+            raise ValueError("--set needs --slot")
+        with LazyGvasFile(args.file, writable=bool(args.set)) as layout:
+            result = {"ok": True, "file": args.file, "map": args.map}
+            if args.set:
+                for assignment in args.set:
+                    field, separator, text = assignment.partition("=")
+                    if not separator:
+                        raise ValueError(f"Invalid --set {assignment!r}, expected FIELD=VALUE")
+                    parts = [float(v) for v in text.split(",")]
+                    value = parts[0] if len(parts) == 1 else tuple(parts)
+                    if not layout.set_element_field(args.map, args.slot, field.strip(), value):
+                        raise KeyError(f"Slot {args.slot} has no field {field.strip()}")
+            if args.slot is not None:
+                result["slot"] = args.slot
+                result["value"] = json_safe(friendly_fields(layout.element(args.map, args.slot)))
+            else:
+                result["properties"] = {name: {"type": prop_type, "size": size}
+                                        for name, (prop_type, _, size) in layout.schema().items()}
+                result["slots"] = list(layout.elements(args.map))
+            if args.set:
+                # Every assignment is applied in memory first, so a bad one leaves the file untouched
+                layout.save()
+        return result
+    except Exception as e:
+        logger.error(f"Layout command failed: {str(e)}", exc_info=True)
+        return {"ok": False, "error": str(e)}
+
+def run_ping_command(args) -> dict:
+    """Probes the requested targets and returns per-target latency statistics"""
+    try:
+        targets = [parse_ping_target(t) for t in args.target] or [(host, 443) for host in PUBG_PING_SERVERS]
+        probe = LatencyProbe(targets, count=args.count, timeout=args.timeout, protocol="udp" if args.udp else "tcp")
+        results = probe.run()
+        return {"ok": any(r["avg"] is not None for r in results), "targets": results}
+    except Exception as e:
+        logger.error(f"Latency probe failed: {str(e)}", exc_info=True)
+        return {"ok": False, "error": str(e)}
+
+def run_network_command(args, runner: Optional[NetworkTweakRunner] = None) -> dict:
+    """Applies, plans or rolls back the network tweaks"""
+    runner = runner or NetworkTweakRunner(tweaks=select_tweaks(args.tweak))
+    try:
+        if args.benchmark:
+            targets = [parse_ping_target(t) for t in args.target] or [(host, 443) for host in PUBG_PING_SERVERS]
+            benchmark = NetworkBenchmark(targets, rounds=args.rounds, count=args.count)
+            report = benchmark.run(runner.apply)
+            journal = report["change"]
+            report["change"] = {"state": journal["state"],
+                                "tweaks": [step["name"] for step in journal["steps"] if step["status"] == "applied"]}
+            if args.revert and journal["state"] == "applied":
+                reverted = runner.rollback()
+                report["change"]["reverted"] = bool(reverted) and reverted["state"] == "rolled_back"
+            NetworkBenchmark.save(report, args.results)
+            return {"ok": journal["state"] == "applied", "results": args.results,
+                    **{key: report[key] for key in ("created", "change", "comparison")}}
+        if args.rollback:
+            journal = runner.rollback()
+            if journal is None:
+                return {"ok": False, "error": "No applied network optimizations to roll back"}
+            return {"ok": journal["state"] == "rolled_back", **journal}
+        journal = runner.apply(dry_run=args.dry_run)
+        ok = journal["state"] in ("planned", "applied")
+        return {"ok": ok, **journal}
+    except Exception as e:
+        logger.error(f"Network optimization failed: {str(e)}", exc_info=True)
+        return {"ok": False, "error": str(e)}
+
+def run_clean_command(args) -> dict:
+    """Runs the temp cleaner with the policy given on the command line"""
+    try:
+        overrides = {
+            "min_age": args.min_age_hours * 3600 if args.min_age_hours is not None else None,
+            "min_size": args.min_size,
+            "include": args.include,
+            "exclude": args.exclude,
+            "byte_budget": int(args.budget_mb * 1024 * 1024) if args.budget_mb is not None else None,
+        }
+        overrides = {key: value for key, value in overrides.items() if value is not None}
+        if args.root:
+            policy = CleanPolicy(**{"min_age": 24 * 3600, **overrides})
+            roots = [(root, True, policy) for root in args.root]
+        else:
+            # Default locations keep their own rules; only the options given replace them
+            roots = [(path, remove_dirs, CleanPolicy(**{**vars(policy), **overrides}))
+                     for path, remove_dirs, policy in default_clean_roots()]
+        stats = TempCleaner(roots).run(dry_run=args.dry_run)
+        return {"ok": stats["errors"] == 0, **stats}
+    except Exception as e:
+        logger.error(f"Temp cleaning failed: {str(e)}", exc_info=True)
+        return {"ok": False, "error": str(e)}
+
+def run_cli(argv: List[str]) -> int:
+    """Entry point for scripted use; prints one JSON document on stdout"""
+    args = build_arg_parser().parse_args(argv)
+    started = time.perf_counter()
+    result = {"command": args.command}
+    tracer = Tracer(enabled=bool(args.trace))
+    # Progress messages go to stderr so stdout stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        serials = None
+        if args.command == "clean":
+            result.update(run_clean_command(args))
+        elif args.command == "ping":
+            result.update(run_ping_command(args))
+        elif args.command == "network":
+            result.update(run_network_command(args))
+        elif args.command == "diff":
+            result.update(run_diff_command(args))
+        elif args.command == "layout":
+            result.update(run_layout_command(args))
+        elif args.command == "snapshots":
+            devices = args.serial or [None]
+            result["snapshots"] = [entry for device in devices
+                                   for entry in SnapshotStore().history(device, args.package, args.file)]
+            result["ok"] = True
+        else:
+            try:
+                if args.all_devices:
+                    serials = list_online_devices()
+                else:
+                    serials = args.serial or []
+                    if len(serials) > 1:
+                        # Once, before the workers start; they are not allowed to (re)start it
+                        ensure_adb_server()
+            except Exception as e:
+                logger.error(f"Device enumeration failed: {str(e)}", exc_info=True)
+                result.update(ok=False, error=str(e))
+
+        if serials is None:
+            pass
+        elif len(serials) <= 1 and not args.all_devices:
+            result.update(run_device_command(args, serials[0] if serials else None, tracer))
+        else:
+            result["devices"] = run_on_devices(args, serials, tracer)
+            result["ok"] = bool(serials) and all(device["ok"] for device in result["devices"])
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    if args.trace:
+        result["trace"] = tracer.summary()
+        try:
+            write_trace(tracer, args.trace)
+        except OSError as e:
+            logger.error(f"Error writing trace: {str(e)}", exc_info=True)
+            result["trace_error"] = str(e)
+    print(json.dumps(result, indent=2))
+    return 0 if result["ok"] else 1
+
 def main():
-    display_loading_screen()
-    
     cli = PUBGGraphicsCLI()
+    trace_path = os.environ.get("PUBG_TOOL_TRACE")
+    if trace_path:
+        import atexit
 
-    print("\033[1;36mConnecting to Gameloop...\033[0m")
-    if not cli.check_adb_connection():
+        # Same export as the --trace option of the scripted interface
+        cli.tracer = Tracer(enabled=True)
+        atexit.register(write_trace, cli.tracer, trace_path)
+    cli.startup_timings["imports"] = round((time.perf_counter() - STARTED_AT) * 1000, 1)
+
+    def initialize():
+        # ADB connection and package detection run while the banner is shown
+        t = time.perf_counter()
+        print("\033[1;36mConnecting to Gameloop...\033[0m")
+        connected = cli.check_adb_connection()
+        cli.startup_timings["connect"] = round((time.perf_counter() - t) * 1000, 1)
+        if not connected:
+            return False, False
+
+        t = time.perf_counter()
+        print("\033[1;36mSearching for PUBG Mobile versions...\033[0m")
+        found = cli.pubg_version_found()
+        cli.startup_timings["packages"] = round((time.perf_counter() - t) * 1000, 1)
+        return connected, found
+
+    connected, found = display_loading_screen(initialize)
+    cli.startup_timings["ready"] = round((time.perf_counter() - STARTED_AT) * 1000, 1)
+    print("Startup: " + ", ".join(f"{k} {v:.0f}ms" for k, v in cli.startup_timings.items()))
+
+    if not connected:
         print("\033[1;31mError: Cannot connect to ADB. Make sure Gameloop is running and ADB is enabled.\033[0m")
         input("\nPress Enter to exit...")
         return
 
-    print("\033[1;36mSearching for PUBG Mobile versions...\033[0m")
-    if not cli.pubg_version_found():
+    if not found:
         input("\nPress Enter to exit...")
         return
 
@@ -964,7 +4175,7 @@ def main():
     while True:
         display_menu()
 
-        choice = input("\n\033[1;36mEnter your choice (1-9): \033[0m")
+        choice = input("\n\033[1;36mEnter your choice (1-14): \033[0m")
 
         if choice == '1':
             print("\n\033[1;33mSelect Graphics Quality:\033[0m")
@@ -1087,70 +4298,51 @@ def main():
             cli.temp_cleaner()
         elif choice == '6':
             cli.optimize_ping()
-        elif choice == '7':
-            print("\n\033[1;36mApplying settings and starting game...\033[0m")
-            
-            # Show a spinner while processing
-            stop_spinner = threading.Event()
-            spinner_thread = threading.Thread(target=loading_animation, args=(stop_spinner,))
-            spinner_thread.start()
-            
-            success = cli.save_graphics_file()
-            if success:
-                success = cli.push_active_shadow_file()
-                if success:
-                    # Stop spinner
-                    stop_spinner.set()
-                    spinner_thread.join()
-                    sys.stdout.write('\r' + ' ' * 50 + '\r')
-                    
-                    print("\033[1;32mSettings applied successfully. Starting game...\033[0m")
-                    cli.start_app()
-                else:
-                    # Stop spinner
-                    stop_spinner.set()
-                    spinner_thread.join()
-                    sys.stdout.write('\r' + ' ' * 50 + '\r')
-                    
-                    print("\033[1;31mFailed to push settings to device.\033[0m")
+        elif choice in ('7', '8'):
+            start_game = choice == '7'
+            if start_game:
+                print("\n\033[1;36mApplying settings and starting game...\033[0m")
             else:
-                # Stop spinner
-                stop_spinner.set()
-                spinner_thread.join()
-                sys.stdout.write('\r' + ' ' * 50 + '\r')
-                
-                print("\033[1;31mFailed to save settings.\033[0m")
-                
-        elif choice == '8':
-            print("\n\033[1;36mApplying settings without starting game...\033[0m")
-            
+                print("\n\033[1;36mApplying settings without starting game...\033[0m")
+
             # Show a spinner while processing
             stop_spinner = threading.Event()
             spinner_thread = threading.Thread(target=loading_animation, args=(stop_spinner,))
             spinner_thread.start()
-            
-            success = cli.save_graphics_file()
-            if success:
-                success = cli.push_active_shadow_file()
-                
-                # Stop spinner
-                stop_spinner.set()
-                spinner_thread.join()
-                sys.stdout.write('\r' + ' ' * 50 + '\r')
-                
-                if success:
-                    print("\033[1;32mSettings applied successfully. Start the game manually.\033[0m")
-                else:
-                    print("\033[1;31mFailed to push settings to device.\033[0m")
-            else:
-                # Stop spinner
-                stop_spinner.set()
-                spinner_thread.join()
-                sys.stdout.write('\r' + ' ' * 50 + '\r')
-                
+
+            # Active.sav and UserCustom.ini go out through one commit, which rolls
+            # Active.sav back if the UserCustom.ini push fails
+            saved = cli.save_graphics_file()
+            success = saved and cli.commit_changes(start_game=start_game)
+
+            # Stop spinner
+            stop_spinner.set()
+            spinner_thread.join()
+            sys.stdout.write('\r' + ' ' * 50 + '\r')
+
+            if not saved:
                 print("\033[1;31mFailed to save settings.\033[0m")
-                
+            elif not success:
+                print("\033[1;31mFailed to push settings to device.\033[0m")
+            else:
+                if not any(cli.last_commit.values()):
+                    print("\033[1;33mSettings already up to date on device, nothing to push.\033[0m")
+                if start_game:
+                    print("\033[1;32mSettings applied successfully. Game started.\033[0m")
+                else:
+                    print("\033[1;32mSettings applied successfully. Start the game manually.\033[0m")
+
         elif choice == '9':
+            cli.render_settings_menu()
+        elif choice == '10':
+            cli.preset_menu()
+        elif choice == '11':
+            cli.snapshot_menu()
+        elif choice == '12':
+            cli.backup_menu()
+        elif choice == '13':
+            cli.watch_menu()
+        elif choice == '14':
             print("\n\033[1;33mExiting PUBG Universal Tool...\033[0m")
             
             # Final message with author info
@@ -1161,9 +4353,11 @@ def main():
             time.sleep(1.5)
             break
         else:
-            print("\033[1;31mInvalid choice. Please enter a number between 1 and 9.\033[0m")
+            print("\033[1;31mInvalid choice. Please enter a number between 1 and 14.\033[0m")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     try:
         main()
     except KeyboardInterrupt:
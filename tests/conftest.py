@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import index
+
+@pytest.fixture(autouse=True)
+def quiet_error_log():
+    """Keeps expected failures out of the tracked pubg_cli_interactive.log"""
+    index.logger.disabled = True
+    yield
+    index.logger.disabled = False
@@ -0,0 +1,94 @@
+import pytest
+
+import index
+from bench import FakeAdbServer
+
+SAV_PATH = "/sdcard/Android/data/com.tencent.ig/files/Active.sav"
+
+@pytest.fixture
+def server():
+    fake = FakeAdbServer({SAV_PATH: b"GVAS" + bytes(range(256)) * 600})
+    yield fake
+    fake.close()
+
+@pytest.fixture
+def session(server):
+    session = index.AdbSession(server.serial, port=server.port, timeout=5.0)
+    yield session
+    session.close()
+
+def test_host_command(session):
+    assert session.host_command("host:version") == "0029"
+    assert session.host_command("host:devices") == "emulator-5554\tdevice\n"
+
+def test_pull_push_round_trip(server, session):
+    original = session.pull(SAV_PATH)
+    assert original == server.files[SAV_PATH]
+
+    changed = original[::-1]
+    assert session.push(changed, "/sdcard/copy.sav") == len(changed)
+    assert server.files["/sdcard/copy.sav"] == changed
+    assert session.pull("/sdcard/copy.sav") == changed
+
+def test_push_local_file(server, session, tmp_path):
+    local = tmp_path / "UserCustom.ini"
+    local.write_bytes(b"[UserCustom DeviceProfile]\r\n" * 5000)
+    session.push(str(local), "/sdcard/UserCustom.ini")
+    assert server.files["/sdcard/UserCustom.ini"] == local.read_bytes()
+
+def test_stat_after_push(session):
+    assert session.stat("/sdcard/new.sav") == (0, 0, 0)
+    session.push(b"abc", "/sdcard/new.sav")
+    mode, size, mtime = session.stat("/sdcard/new.sav")
+    assert mode & 0o170000 == 0o100000
+    assert size == 3
+    assert mtime > 0
+
+def test_pull_missing_file_keeps_session_usable(session):
+    with pytest.raises(index.AdbError, match="No such file"):
+        session.pull("/sdcard/missing.sav")
+    assert session.stat(SAV_PATH)[1] > 0
+
+def test_failed_transport(server):
+    session = index.AdbSession("emulator-5556", port=server.port, timeout=5.0)
+    with pytest.raises(index.AdbError, match="not found"):
+        session.shell("echo hi")
+    with pytest.raises(index.AdbError, match="not found"):
+        session.pull(SAV_PATH)
+    assert session._sync_sock is None
+
+def test_unreachable_server():
+    session = index.AdbSession("emulator-5554", port=1, timeout=1.0)
+    with pytest.raises(index.AdbError, match="Cannot reach adb server"):
+        session.host_command("host:version")
+
+def test_shell_and_exec(server, session):
+    assert session.shell("pm list packages com.tencent") == "package:com.tencent.ig\n"
+    assert session.exec_out(f"md5sum '{SAV_PATH}'").split()[1].decode() == SAV_PATH
+
+def test_close_sends_quit_once(server, session):
+    session.stat(SAV_PATH)
+    session.stat(SAV_PATH)
+    session.close()
+    assert session._sync_sock is None
+    assert index.wait_until(lambda: server.sync_quits == 1, 2.0)
+
+    session.close()
+    # A later transfer opens a fresh sync channel
+    session.pull(SAV_PATH)
+    session.close()
+    assert index.wait_until(lambda: server.sync_quits == 2, 2.0)
+
+def test_close_without_sync_channel(server, session):
+    session.shell("echo hi")
+    session.close()
+    assert server.sync_quits == 0
+
+def test_sync_frames(session, monkeypatch):
+    sent = []
+    real = session._sync_send
+    monkeypatch.setattr(session, "_sync_send", lambda sock, command, payload: (
+        sent.append((command, bytes(payload))), real(sock, command, payload))[1])
+    session.push(b"x" * (index.AdbSession.SYNC_CHUNK + 1), "/sdcard/big.bin", mode=0o100644)
+    assert sent[0] == (b"SEND", b"/sdcard/big.bin,33188")
+    assert [len(payload) for command, payload in sent[1:]] == [index.AdbSession.SYNC_CHUNK, 1]
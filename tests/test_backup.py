@@ -0,0 +1,73 @@
+import contextlib
+import io
+import tarfile
+import warnings
+
+import pytest
+
+import index
+
+def make_tar(compress: bool) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz" if compress else "w") as tar:
+        def add(name, data=b"", kind=tarfile.REGTYPE, linkname=""):
+            info = tarfile.TarInfo(name)
+            info.type = kind
+            info.size = len(data) if kind == tarfile.REGTYPE else 0
+            info.linkname = linkname
+            info.mode = 0o755 if kind == tarfile.DIRTYPE else 0o644
+            tar.addfile(info, io.BytesIO(data) if kind == tarfile.REGTYPE else None)
+        add("Saved", kind=tarfile.DIRTYPE)
+        add("Saved/SaveGames/Active.sav", b"GVAS" + b"\0" * 100)
+        add("Saved/Config/Android/UserCustom.ini", b"[UserCustom DeviceProfile]\r\n")
+        add("../outside.txt", b"escape")
+        add("/absolute.txt", b"escape")
+        add("Saved/passwd", kind=tarfile.SYMTYPE, linkname="/etc/passwd")
+    return buffer.getvalue()
+
+class TarSession:
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.commands = []
+
+    @contextlib.contextmanager
+    def exec_stream(self, command):
+        self.commands.append(command)
+        yield io.BytesIO(self.payload)
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_backup_extracts_only_safe_members(tmp_path, compress):
+    payload = make_tar(compress)
+    cli = index.PUBGGraphicsCLI()
+    cli.pubg_package = "com.tencent.ig"
+    cli.session = TarSession(payload)
+    destination = tmp_path / "backup"
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        result = cli.backup_saved(str(destination), compress=compress)
+
+    assert result["files"] == 2
+    assert (destination / "Saved" / "SaveGames" / "Active.sav").read_bytes() == b"GVAS" + b"\0" * 100
+    assert not (destination / "Saved" / "passwd").exists()
+    assert not (tmp_path / "outside.txt").exists()
+    # The archive is kept byte for byte for restore-backup
+    archive = destination / ("Saved.tar.gz" if compress else "Saved.tar")
+    assert archive.read_bytes() == payload
+
+def test_backup_menu_lists_plain_and_compressed(tmp_path, monkeypatch):
+    cli = index.PUBGGraphicsCLI()
+    cli.pubg_package = "com.tencent.ig"
+    cli.assets_dir = str(tmp_path)
+    backups = tmp_path / "backups" / "com.tencent.ig"
+    for name, archive in [("20260101-000000", "Saved.tar.gz"), ("20260102-000000", "Saved.tar"),
+                          ("20260103-000000", "notes.txt")]:
+        (backups / name).mkdir(parents=True)
+        (backups / name / archive).write_bytes(b"")
+    restored = []
+    monkeypatch.setattr(cli, "restore_saved", lambda path: restored.append(path) or True)
+    answers = iter(["2", "1"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    assert cli.backup_menu()
+    assert restored == [str(backups / "20260102-000000" / "Saved.tar")]
@@ -0,0 +1,37 @@
+import pytest
+
+import bench
+import index
+
+PACKAGE = "com.tencent.ig"
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    fake = bench.FakeAdbServer(bench.fixture_device_files())
+    monkeypatch.setenv("ANDROID_ADB_SERVER_PORT", str(fake.port))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "assets").mkdir()
+    yield fake
+    fake.close()
+
+def run(*argv) -> dict:
+    args = index.build_arg_parser().parse_args(["--package", PACKAGE, *argv])
+    return index.run_device_command(args)
+
+def test_apply_closes_sync_channel(server):
+    result = run("apply", "--fps", "Low", "--no-start")
+    assert result["ok"], result
+    assert result["pushed"]["active_sav"]
+    assert index.wait_until(lambda: server.sync_quits == 1, 2.0)
+
+def test_failed_command_closes_sync_channel(server):
+    result = run("apply", "--fps", "Turbo", "--no-start")
+    assert not result["ok"]
+    assert "Invalid FPS value" in result["error"]
+    assert index.wait_until(lambda: server.sync_quits == 1, 2.0)
+
+def test_failed_connect_reports_error(server):
+    args = index.build_arg_parser().parse_args(["--package", PACKAGE, "get"])
+    result = index.run_device_command(args, serial="emulator-5556", allow_server_restart=False)
+    assert not result["ok"]
+    assert server.sync_quits == 0
@@ -0,0 +1,67 @@
+import types
+
+import pytest
+
+import bench
+import index
+
+PACKAGE = "com.tencent.ig"
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    fake = bench.FakeAdbServer(bench.fixture_device_files())
+    monkeypatch.setenv("ANDROID_ADB_SERVER_PORT", str(fake.port))
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "assets").mkdir()
+    yield fake
+    fake.close()
+
+@pytest.fixture
+def cli(server):
+    cli = index.connect_cli(types.SimpleNamespace(package=PACKAGE))
+    yield cli
+    cli.session.close()
+
+def fail_push_to(cli, monkeypatch, failing_path):
+    real_push = cli.session.push
+
+    def push(data, remote_path, *args):
+        if remote_path == failing_path:
+            raise index.AdbError("remote write failed")
+        return real_push(data, remote_path, *args)
+    monkeypatch.setattr(cli.session, "push", push)
+
+def test_commit_pushes_both_files(server, cli):
+    cli.set_fps("Low")
+    cli.load_cvars().set("r.PUBGDeviceFPSDef", "60")
+    assert cli.commit_changes()
+    assert cli.last_commit == {"active_sav": True, "user_custom_ini": True}
+    assert server.files[cli.active_sav_path()] == cli.active_sav_content
+    assert index.GvasFile(server.files[cli.active_sav_path()]).get("BattleFPS") == 2
+
+    # Nothing left to push
+    assert cli.commit_changes()
+    assert cli.last_commit == {"active_sav": False, "user_custom_ini": False}
+
+def test_failed_ini_push_restores_active_sav(server, cli, monkeypatch):
+    original = server.files[cli.active_sav_path()]
+    original_ini = server.files[cli.user_custom_ini_path()]
+    cli.set_fps("Low")
+    cli.load_cvars().set("r.PUBGDeviceFPSDef", "60")
+    fail_push_to(cli, monkeypatch, cli.user_custom_ini_path())
+
+    assert not cli.commit_changes()
+    assert server.files[cli.active_sav_path()] == original
+    assert server.files[cli.user_custom_ini_path()] == original_ini
+    assert cli.last_commit == {"active_sav": False, "user_custom_ini": False}
+    # The edit is still pending, so the next commit pushes it again
+    assert cli.active_sav_needs_push()
+
+def test_failed_active_sav_push_returns_false(server, cli, monkeypatch):
+    original = server.files[cli.active_sav_path()]
+    cli.set_fps("Low")
+    fail_push_to(cli, monkeypatch, cli.active_sav_path())
+
+    assert not cli.commit_changes()
+    assert server.files[cli.active_sav_path()] == original
+    assert cli.last_commit == {"active_sav": False, "user_custom_ini": False}
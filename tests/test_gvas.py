@@ -0,0 +1,174 @@
+import glob
+import os
+import struct
+
+import pytest
+
+import index
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAVE_GAMES = os.path.join(ROOT, "UE4Game", "ShadowTrackerExtra", "ShadowTrackerExtra", "Saved", "SaveGames")
+ACTIVE_SAVS = [os.path.join(ROOT, "assets", "old.sav"), os.path.join(ROOT, "assets", "new.sav"),
+               os.path.join(SAVE_GAMES, "Active.sav")]
+LAYOUT_SAVS = sorted(glob.glob(os.path.join(SAVE_GAMES, "UIElemLayout_*.sav")))
+ALL_SAVS = ACTIVE_SAVS[:2] + sorted(glob.glob(os.path.join(SAVE_GAMES, "*.sav")))
+
+def read(path: str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
+
+def fixture_id(path: str) -> str:
+    return os.path.relpath(path, ROOT)
+
+def loaded_cli(path: str) -> index.PUBGGraphicsCLI:
+    cli = index.PUBGGraphicsCLI()
+    cli.pubg_package = "com.tencent.ig"
+    cli.active_sav_content = read(path)
+    return cli
+
+def changed_offsets(old: bytes, new: bytes) -> set:
+    assert len(old) == len(new)
+    return {i for i, (a, b) in enumerate(zip(old, new)) if a != b}
+
+def assert_only_changed(path: str, cli: index.PUBGGraphicsCLI, expected: dict):
+    """Checks that exactly the expected properties hold new values and no other byte moved"""
+    before = index.GvasFile(read(path))
+    after = cli.active_sav
+    changed = {change["path"].split(".")[0].split("[")[0] for change in index.diff_gvas(before, after)}
+    assert changed == {name for name, value in expected.items() if before.get(name) != value}
+    for name, value in expected.items():
+        assert after.get(name) == value
+    allowed = set()
+    for name in expected:
+        prop = after.property(name)
+        allowed.update(range(prop.value_offset, prop.value_offset + prop.size))
+    assert changed_offsets(before.to_bytes(), after.to_bytes()) <= allowed
+
+@pytest.mark.parametrize("path", ALL_SAVS, ids=fixture_id)
+def test_round_trip_is_byte_identical(path):
+    data = read(path)
+    gvas = index.GvasFile(data)
+    assert gvas.to_bytes() == data
+    # Writing every fixed-size value back unchanged leaves the bytes alone
+    plan = gvas.patch()
+    for name, (prop_type, _, _) in gvas.schema().items():
+        if prop_type in index.GvasFile.SCALAR_FORMATS or prop_type == "BoolProperty":
+            plan.set(name, gvas.get(name))
+    assert plan.apply() == []
+    assert gvas.to_bytes() == data
+
+@pytest.mark.parametrize("path", LAYOUT_SAVS, ids=fixture_id)
+def test_lazy_reader_matches_full_parse(path):
+    gvas = index.GvasFile(read(path))
+    with index.LazyGvasFile(path) as layout:
+        assert layout.schema() == gvas.schema()
+        assert layout.header_end == gvas.header_end
+        for name, prop in layout.index.items():
+            if prop.type == "MapProperty":
+                entries = gvas.get(name)
+                assert list(layout.elements(name)) == list(entries)
+                first = next(iter(entries), None)
+                if first is not None:
+                    assert layout.element(name, first) == entries[first]
+
+@pytest.mark.parametrize("path", ACTIVE_SAVS, ids=fixture_id)
+@pytest.mark.parametrize("level, value", [("Low", 2), ("Extreme", 6), ("Ultra Extreme", 8)])
+def test_set_fps_changes_only_fps(path, level, value):
+    cli = loaded_cli(path)
+    assert cli.set_fps(level)
+    assert_only_changed(path, cli, {"FPSLevel": value, "BattleFPS": value, "LobbyFPS": value})
+    assert cli.get_fps() == level
+
+@pytest.mark.parametrize("path", ACTIVE_SAVS, ids=fixture_id)
+@pytest.mark.parametrize("quality, value", [("Smooth", 1), ("HDR", 4), ("Ultra HD", 5)])
+def test_set_graphics_quality_changes_only_quality(path, quality, value):
+    cli = loaded_cli(path)
+    assert cli.set_graphics_quality(quality)
+    assert_only_changed(path, cli, {"ArtQuality": value, "LobbyRenderQuality": value, "BattleRenderQuality": value})
+    assert cli.get_graphics_setting() == quality
+
+@pytest.mark.parametrize("path", ACTIVE_SAVS, ids=fixture_id)
+@pytest.mark.parametrize("style, value", [("Classic", 1), ("Realistic", 3), ("Movie", 6)])
+def test_set_graphics_style_changes_only_battle_style(path, style, value):
+    cli = loaded_cli(path)
+    assert cli.set_graphics_style(style)
+    assert_only_changed(path, cli, {"BattleRenderStyle": value})
+    assert cli.get_graphics_style() == style
+
+def test_invalid_values_leave_file_untouched():
+    path = ACTIVE_SAVS[0]
+    cli = loaded_cli(path)
+    assert not cli.set_fps("Turbo")
+    assert not cli.set_graphics_quality("4K")
+    assert not cli.set_graphics_style("Neon")
+    assert cli.active_sav_content == read(path)
+    assert cli.sav_changes == []
+
+def test_patch_undo_restores_original():
+    path = ACTIVE_SAVS[0]
+    cli = loaded_cli(path)
+    cli.set_fps("Low")
+    cli.set_graphics_quality("Smooth")
+    assert cli.active_sav_content != read(path)
+    cli.undo_sav_changes()
+    assert cli.active_sav_content == read(path)
+
+def test_patch_rejects_size_change():
+    gvas = index.GvasFile(read(ACTIVE_SAVS[0]))
+    name = next(name for name, (prop_type, _, _) in gvas.schema().items() if prop_type == "StrProperty")
+    with pytest.raises(index.GvasError, match="in place"):
+        gvas.patch().set(name, gvas.get(name) + "x").apply()
+    assert gvas.to_bytes() == read(ACTIVE_SAVS[0])
+
+def test_typed_accessors_check_type():
+    gvas = index.GvasFile(read(ACTIVE_SAVS[0]))
+    with pytest.raises(index.GvasError):
+        gvas.set_float("FPSLevel", 1.0)
+    with pytest.raises(KeyError):
+        gvas.get_int("NoSuchProperty")
+
+@pytest.mark.parametrize("path", [ACTIVE_SAVS[0], LAYOUT_SAVS[0]], ids=fixture_id)
+def test_truncated_file_raises(path):
+    data = read(path)
+    header_end = index.GvasFile(data).header_end
+    cuts = list(range(0, header_end + 64)) + list(range(header_end + 64, len(data) - 4, 257))
+    for cut in cuts:
+        with pytest.raises(index.GvasError):
+            index.GvasFile(data[:cut])
+
+def custom_version_count_offset(data: bytes) -> int:
+    # magic, save game and package version, engine version, then the branch FString
+    branch_length = struct.unpack_from("<i", data, 22)[0]
+    return 26 + branch_length + 4
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: b"GVAZ" + data[4:],
+    # Engine branch FString length pointing far past the end of the file
+    lambda data: data[:22] + struct.pack("<i", 1 << 30) + data[26:],
+    # Custom version count larger than the file
+    lambda data: (data[:custom_version_count_offset(data)] + struct.pack("<i", 1 << 20)
+                  + data[custom_version_count_offset(data) + 4:]),
+    # Size of FPSLevel pointing past the end of the file
+    lambda data: (data[:index.GvasFile(data).property("FPSLevel").size_offset] + struct.pack("<q", 1 << 40)
+                  + data[index.GvasFile(data).property("FPSLevel").size_offset + 8:]),
+], ids=["magic", "branch-length", "custom-versions", "property-size"])
+def test_malformed_header_raises(corrupt):
+    with pytest.raises(index.GvasError):
+        index.GvasFile(corrupt(read(ACTIVE_SAVS[0])))
+
+def test_failed_load_keeps_current_file():
+    cli = loaded_cli(ACTIVE_SAVS[0])
+    cli.set_fps("Low")
+    edited = cli.active_sav_content
+    with pytest.raises(index.GvasError):
+        cli.active_sav_content = read(ACTIVE_SAVS[1])[:500]
+    assert cli.active_sav_content == edited
+
+def test_truncated_layout_file_is_not_written(tmp_path):
+    path = tmp_path / "UIElemLayout_Slot01.sav"
+    data = read(LAYOUT_SAVS[0])[:100000]
+    path.write_bytes(data)
+    with pytest.raises(index.GvasError):
+        index.LazyGvasFile(str(path), writable=True)
+    assert path.read_bytes() == data
+    assert not (tmp_path / "UIElemLayout_Slot01.sav.tmp").exists()
@@ -0,0 +1,235 @@
+import copy
+import json
+import re
+
+import pytest
+
+import index
+
+QUOTED = re.compile(r"'((?:[^']|'')*)'")
+
+def quoted(script: str) -> list:
+    return [value.replace("''", "'") for value in QUOTED.findall(script)]
+
+class FakeSystem(index.CommandExecutor):
+    """In-memory Windows network settings driven by the runner's commands"""
+
+    def __init__(self, fail=lambda text: False):
+        super().__init__()
+        self.fail = fail
+        self.state = {
+            "dns": {"Ethernet": {"servers": ["192.168.1.1"], "static": False, "dhcp": ["192.168.1.1"]},
+                    "Wi-Fi": {"servers": ["8.8.8.8", "8.8.4.4"], "static": True, "dhcp": ["10.0.0.1"]}},
+            "tcp": {"autotuninglevel": "disabled", "ecncapability": "enabled", "heuristics": "default"},
+            "registry": {(r"SYSTEM\CurrentControlSet\Services\Psched", "NonBestEffortLimit"): (20, "REG_DWORD")},
+            "adapter": {("Ethernet", "Energy-Efficient Ethernet"): "Enabled",
+                        ("Ethernet", "Power Saving Mode"): "Enabled",
+                        ("Ethernet", "Interrupt Moderation"): "Enabled"},
+            "qos": ["Other Policy"],
+        }
+
+    def _check(self, text: str):
+        if self.fail(text):
+            raise PermissionError(f"Access is denied: {text}")
+
+    def run(self, cmd):
+        try:
+            self._check(" ".join(cmd))
+        except PermissionError as e:
+            return 1, str(e)
+        if cmd[:4] == ["netsh", "int", "tcp", "set"]:
+            if cmd[4] == "heuristics":
+                self.state["tcp"]["heuristics"] = cmd[5]
+            else:
+                key, _, value = cmd[5].partition("=")
+                self.state["tcp"][key] = value
+            return 0, "Ok."
+        if cmd == ["ipconfig", "/flushdns"]:
+            return 0, "Successfully flushed the DNS Resolver Cache."
+        return 1, f"unknown command {cmd}"
+
+    def powershell(self, script):
+        try:
+            self._check(script)
+        except PermissionError as e:
+            return 1, str(e)
+        state = self.state
+        if script.startswith("Get-NetAdapter |"):
+            return 0, "\n".join(f"{alias}={','.join(dns['servers'])}={int(dns['static'])}"
+                                for alias, dns in state["dns"].items())
+        if "Get-NetTCPSetting" in script:
+            return 0, "\n".join(f"{key}={value}" for key, value in state["tcp"].items())
+        if script.startswith("Get-NetAdapterAdvancedProperty"):
+            names = quoted(script)
+            return 0, "\n".join(f"{adapter}\t{name}\t{value}" for (adapter, name), value in state["adapter"].items()
+                                if name in names)
+        if script.startswith("Get-NetQosPolicy -Name"):
+            # Removal that tolerates a policy that was never created
+            name = quoted(script)[0]
+            if name in state["qos"]:
+                state["qos"].remove(name)
+            return 0, ""
+        if script.startswith("Get-NetQosPolicy"):
+            return 0, "\n".join(state["qos"])
+        if script.startswith("Set-DnsClientServerAddress"):
+            alias, *servers = quoted(script)
+            dns = state["dns"][alias]
+            if "-ResetServerAddresses" in script:
+                dns.update(servers=list(dns["dhcp"]), static=False)
+            else:
+                dns.update(servers=servers, static=True)
+            return 0, ""
+        if script.startswith("Set-NetAdapterAdvancedProperty"):
+            adapter, name, value = quoted(script)
+            state["adapter"][(adapter, name)] = value
+            return 0, ""
+        if script.startswith("New-NetQosPolicy"):
+            name = quoted(script)[0]
+            if name in state["qos"]:
+                return 1, f"{name} already exists"
+            state["qos"].append(name)
+            return 0, ""
+        return 1, f"unknown script {script}"
+
+    def read_registry(self, path, name):
+        return self.state["registry"].get((path, name))
+
+    def write_registry(self, path, name, data, type_name):
+        self._check(f"reg_set {path} {name}")
+        self.state["registry"][(path, name)] = (data, type_name)
+
+    def delete_registry(self, path, name):
+        self._check(f"reg_delete {path} {name}")
+        self.state["registry"].pop((path, name), None)
+
+def fail_once(marker: str):
+    """Fails the first change whose command mentions marker; its undo succeeds"""
+    calls = []
+
+    def fail(text: str) -> bool:
+        # Only changes fail, never the snapshot queries
+        if marker not in text or text.startswith(("Get-", "$s = Get-")) or calls:
+            return False
+        calls.append(text)
+        return True
+    return fail
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "network_journal.json")
+
+def make_runner(system, journal_path, tweaks=None):
+    runner = index.NetworkTweakRunner(tweaks=tweaks, executor=system, journal_path=journal_path, max_workers=1)
+    performed = []
+    perform = runner.perform
+    runner.perform = lambda action: performed.append(action) or perform(action)
+    return runner, performed
+
+def expected_rollbacks(journal: dict, applied: list) -> list:
+    rollback_of = {json.dumps(action["apply"]): action["rollback"]
+                   for step in journal["steps"] for action in step["actions"]}
+    return [rollback_of[json.dumps(action)] for action in reversed(applied) if rollback_of[json.dumps(action)]]
+
+def test_apply_and_rollback_restore_original_state(journal_path):
+    system = FakeSystem()
+    original = copy.deepcopy(system.state)
+    runner, _ = make_runner(system, journal_path)
+
+    journal = runner.apply()
+    assert journal["state"] == "applied"
+    assert system.state["dns"]["Ethernet"] == {"servers": ["1.1.1.1", "1.0.0.1"], "static": True,
+                                               "dhcp": ["192.168.1.1"]}
+    assert system.state["tcp"] == {"autotuninglevel": "normal", "ecncapability": "disabled",
+                                   "heuristics": "disabled"}
+    assert system.state["registry"][(r"SOFTWARE\WOW6432Node\Tencent\MobileGamePC", "AdbDisable")] == (0, "REG_DWORD")
+
+    reverted = runner.rollback()
+    assert reverted["state"] == "rolled_back"
+    assert system.state == original
+    assert runner.rollback() is None
+
+@pytest.mark.parametrize("failing", ["Power Saving Mode", "AndroidEmulatorEx.exe", "ecncapability", "AdbDisable"])
+def test_failure_mid_plan_undoes_every_earlier_action_in_reverse(journal_path, failing):
+    system = FakeSystem(fail=fail_once(failing))
+    original = copy.deepcopy(system.state)
+    runner, performed = make_runner(system, journal_path)
+
+    journal = runner.apply()
+    assert journal["state"] == "rolled_back", journal
+    assert system.state == original
+    assert any(step["status"] == "rolled_back" and step["output"] for step in journal["steps"])
+
+    applied_count = sum(step["done"] for step in journal["steps"])
+    applied, undone = performed[:applied_count], performed[applied_count:]
+    assert undone == expected_rollbacks(journal, applied)
+    # Stage 1 (DNS flush) never starts once stage 0 failed
+    assert ["run", ["ipconfig", "/flushdns"]] not in applied
+    assert journal["steps"][-1]["status"] == "not_run"
+    # Nothing is left for a later rollback
+    assert runner.rollback() is None
+
+def test_rollback_restores_dhcp_dns(journal_path):
+    system = FakeSystem()
+    runner, performed = make_runner(system, journal_path, index.select_tweaks(["dns"]))
+
+    assert runner.apply()["state"] == "applied"
+    assert all(dns["static"] and dns["servers"] == ["1.1.1.1", "1.0.0.1"] for dns in system.state["dns"].values())
+
+    assert runner.rollback()["state"] == "rolled_back"
+    # DHCP adapter goes back to DHCP instead of having its lease's servers pinned
+    assert system.state["dns"]["Ethernet"] == {"servers": ["192.168.1.1"], "static": False, "dhcp": ["192.168.1.1"]}
+    assert system.state["dns"]["Wi-Fi"] == {"servers": ["8.8.8.8", "8.8.4.4"], "static": True, "dhcp": ["10.0.0.1"]}
+    assert ["powershell", "Set-DnsClientServerAddress -InterfaceAlias 'Ethernet' -ResetServerAddresses"] in performed
+
+def test_second_run_keeps_first_snapshot(journal_path):
+    system = FakeSystem()
+    original = copy.deepcopy(system.state)
+    runner, _ = make_runner(system, journal_path, index.select_tweaks(["autotuninglevel"]))
+    assert runner.apply()["state"] == "applied"
+
+    runner, _ = make_runner(system, journal_path, index.select_tweaks(["tcp", "dns"]))
+    journal = runner.apply()
+    assert journal["state"] == "applied"
+    assert len(journal["inherited"]) == 1
+
+    assert runner.rollback()["state"] == "rolled_back"
+    assert system.state == original
+
+def test_failed_second_run_keeps_first_journal(journal_path):
+    system = FakeSystem(fail=fail_once("Interrupt Moderation"))
+    original = copy.deepcopy(system.state)
+    runner, _ = make_runner(system, journal_path, index.select_tweaks(["dns"]))
+    assert runner.apply()["state"] == "applied"
+
+    runner, _ = make_runner(system, journal_path, index.select_tweaks(["adapter"]))
+    assert runner.apply()["state"] == "rolled_back"
+    assert runner.load_journal()["state"] == "applied"
+
+    assert runner.rollback()["state"] == "rolled_back"
+    assert system.state == original
+
+def test_failed_snapshot_skips_tweak(journal_path):
+    system = FakeSystem(fail=lambda text: "Get-NetTCPSetting" in text)
+    runner, _ = make_runner(system, journal_path, index.select_tweaks(["tcp", "registry"]))
+    journal = runner.apply()
+    assert journal["state"] == "applied"
+    assert [step["status"] for step in journal["steps"]] == ["skipped", "applied", "applied"]
+    assert system.state["tcp"]["autotuninglevel"] == "disabled"
+
+def test_dry_run_changes_nothing(journal_path):
+    system = FakeSystem()
+    original = copy.deepcopy(system.state)
+    runner, performed = make_runner(system, journal_path)
+    journal = runner.apply(dry_run=True)
+    assert journal["state"] == "planned"
+    assert performed == []
+    assert system.state == original
+    assert runner.load_journal() is None
+
+def test_unchanged_tweaks_plan_nothing(journal_path):
+    system = FakeSystem()
+    runner, _ = make_runner(system, journal_path)
+    runner.apply()
+    journal = runner.apply(dry_run=True)
+    assert {step["status"] for step in journal["steps"]} == {"unchanged", "pending"}
+    assert [step["kind"] for step in journal["steps"] if step["status"] == "pending"] == ["command"]
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+import index
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_CUSTOM_INI = os.path.join(ROOT, "UE4Game", "ShadowTrackerExtra", "ShadowTrackerExtra", "Saved",
+                               "Config", "Android", "UserCustom.ini")
+
+@pytest.fixture(scope="module")
+def stock_cvars() -> index.CVarModel:
+    with open(USER_CUSTOM_INI, 'rb') as file:
+        return index.CVarModel(index.IniDocument.from_bytes(file.read()))
+
+@pytest.mark.parametrize("key", list(index.PERFORMANCE_PRESETS))
+def test_preset_cvars_use_the_file_value_form(stock_cvars, key):
+    for name, value in index.PERFORMANCE_PRESETS[key]["cvars"].items():
+        stock = stock_cvars.get(name)
+        assert stock is not None, name
+        assert index.CVAR_NUMBER.fullmatch(value), (name, value)
+        # Dotted level values ("0.0.45") stay dotted, plain floats stay plain
+        assert value.count(".") == stock.count("."), (name, value, stock)
+
+@pytest.mark.parametrize("key", list(index.PERFORMANCE_PRESETS))
+def test_stage_preset_edits_only_preset_cvars(stock_cvars, key):
+    cli = index.PUBGGraphicsCLI()
+    with open(os.path.join(ROOT, "assets", "old.sav"), 'rb') as file:
+        cli.active_sav_content = file.read()
+    with open(USER_CUSTOM_INI, 'rb') as file:
+        cli.user_custom_ini = index.IniDocument.from_bytes(file.read())
+    assert cli.stage_preset(key)
+    cvars = cli.load_cvars()
+    preset = index.PERFORMANCE_PRESETS[key]
+    for name, value in stock_cvars.items():
+        assert cvars.get(name) == preset["cvars"].get(name, value)